@@ -0,0 +1,265 @@
+"""Wine Sommelier AI - Command Line Interface
+
+One-shot:
+    python app/cli.py --name "John" --dish "Grilled salmon" --persona professional
+
+Batch (JSONL or CSV rows with name/dish/persona columns, from a file or stdin):
+    python app/cli.py --batch menu.jsonl --workers 8 --output results.jsonl
+
+Compare every persona, one call each (fanout), in a single call (fused), or time both:
+    python app/cli.py --dish "Grilled salmon" --compare both
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, TextIO, Union
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.personas import PERSONAS
+from src.sommelier import BatchResult, InvalidRequest, RecommendationRequest, WineSommelier
+
+
+def build_client(args):
+    """Create the LLM client selected on the command line."""
+    if args.backend == "groq":
+        from src.cloud_client import CloudLLMClient
+        return CloudLLMClient(model=args.model, pool_size=max(args.workers, 1))
+    if args.host and "," in args.host:
+        from src.ollama_pool import MultiHostLLMClient
+        hosts = [h.strip() for h in args.host.split(",") if h.strip()]
+        return MultiHostLLMClient(hosts, model=args.model, pool_size=max(args.workers, 1))
+    from src.llm_client import LLMClient
+    return LLMClient(model=args.model, host=args.host, pool_size=max(args.workers, 1))
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Union[Dict[str, str], InvalidRequest]]:
+    """Lazily parse request rows so huge inputs are never loaded whole.
+
+    A line that isn't a JSON object is yielded as an InvalidRequest, so it
+    is reported in its place and the rest of the batch still runs.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield InvalidRequest(f"line {number}: {e}")
+            continue
+        if isinstance(row, dict):
+            yield row
+        else:
+            yield InvalidRequest(f"line {number}: expected a JSON object, got {type(row).__name__}")
+
+
+def load_checkpoint(path: Optional[Path]) -> Set[int]:
+    """Indices of rows a previous run answered successfully."""
+    if path is None or not path.exists():
+        return set()
+    done = set()
+    with path.open() as f:
+        for line in f:
+            line = line.strip()
+            if line.isdigit():
+                done.add(int(line))
+    return done
+
+
+def to_request(index: int, row: Dict[str, str], args) -> RecommendationRequest:
+    """Turn an input row into a request, filling gaps from the command line."""
+    return RecommendationRequest(
+        customer_name=row.get("name") or args.name or "Guest",
+        dish_description=row.get("dish") or "",
+        persona=row.get("persona") or args.persona,
+        include_bottles=args.bottles,
+        tag=(index, row.get("id")),
+    )
+
+
+def to_record(sommelier: WineSommelier, result: BatchResult) -> Dict:
+    """Package a batch result as an output record."""
+    request = result.request
+    index, row_id = request.tag
+    if result.error is not None:
+        error = f"{type(result.error).__name__}: {result.error}"
+    elif sommelier.is_error_response(result.response):
+        error = result.response
+    else:
+        error = None
+    return {
+        "index": index,
+        "id": row_id,
+        "name": request.customer_name,
+        "dish": request.dish_description,
+        "persona": request.persona,
+        "response": result.response,
+        "error": error,
+        "latency": round(result.latency, 4),
+    }
+
+
+def run_batch(sommelier: WineSommelier, args) -> int:
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "csv" if str(args.batch).lower().endswith(".csv") else "jsonl"
+
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else (
+        Path(args.output + ".ckpt") if args.output != "-" else None
+    )
+    if args.resume and checkpoint_path is None:
+        print("Error: --resume needs --checkpoint when writing to stdout", file=sys.stderr)
+        return 2
+    done = load_checkpoint(checkpoint_path) if args.resume else set()
+
+    source = sys.stdin if args.batch == "-" else open(args.batch, newline="")
+    mode = "a" if args.resume else "w"
+    out = sys.stdout if args.output == "-" else open(args.output, mode)
+    checkpoint = open(checkpoint_path, mode) if checkpoint_path else None
+
+    latencies = []
+    errors = 0
+    skipped = 0
+
+    def pending_requests() -> Iterator[RecommendationRequest]:
+        nonlocal skipped
+        for index, row in enumerate(read_rows(source, fmt)):
+            if index in done:
+                skipped += 1
+                continue
+            if isinstance(row, InvalidRequest):
+                row.tag = (index, None)
+                yield row
+            else:
+                yield to_request(index, row, args)
+
+    start = time.perf_counter()
+    try:
+        for result in sommelier.iter_recommend_many(
+            pending_requests(),
+            max_concurrency=args.workers,
+            return_exceptions=True,
+            ordered=args.order == "input"
+        ):
+            record = to_record(sommelier, result)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            # Only mark a row done once its result is safely written; failed
+            # rows stay pending so --resume retries them
+            if checkpoint and not record["error"]:
+                checkpoint.write(f"{record['index']}\n")
+                checkpoint.flush()
+            latencies.append(record["latency"])
+            if record["error"]:
+                errors += 1
+    finally:
+        for handle in (source, out, checkpoint):
+            if handle not in (None, sys.stdin, sys.stdout):
+                handle.close()
+
+    print_summary(len(latencies), skipped, errors, time.perf_counter() - start, latencies)
+    return 1 if errors else 0
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[position]
+
+
+def print_summary(completed: int, skipped: int, errors: int, elapsed: float, latencies) -> None:
+    ordered = sorted(latencies)
+    throughput = completed / elapsed if elapsed > 0 else 0.0
+    print(
+        f"\n🍷 Batch complete: {completed} rows ({errors} errors, {skipped} skipped from checkpoint) "
+        f"in {elapsed:.1f}s\n"
+        f"   Throughput: {throughput:.2f} rows/s\n"
+        f"   Latency: p50 {percentile(ordered, 0.5):.2f}s · p95 {percentile(ordered, 0.95):.2f}s · "
+        f"max {ordered[-1] if ordered else 0:.2f}s",
+        file=sys.stderr
+    )
+
+
+def run_single(sommelier: WineSommelier, args) -> int:
+    if not args.dish:
+        print("Error: --dish is required (or use --batch)", file=sys.stderr)
+        return 2
+    stream = sommelier.recommend_stream(
+        args.name or "Guest", args.dish, args.persona,
+        save_response=False, include_bottles=args.bottles
+    )
+    for chunk in stream:
+        print(chunk, end="", flush=True)
+    print()
+    return 0
+
+
+def run_compare(sommelier: WineSommelier, args) -> int:
+    if not args.dish:
+        print("Error: --dish is required for --compare", file=sys.stderr)
+        return 2
+    modes = ["fanout", "fused"] if args.compare == "both" else [args.compare]
+    timings = {}
+    for mode in modes:
+        start = time.perf_counter()
+        results = sommelier.compare_personas(args.name or "Guest", args.dish, mode=mode)
+        timings[mode] = time.perf_counter() - start
+        print(f"\n===== {mode} ({timings[mode]:.1f}s) =====")
+        for persona_key, response in results.items():
+            print(f"\n--- {PERSONAS[persona_key].name} ---\n{response}")
+    print("\n🍷 Compare: " + " · ".join(f"{mode} {seconds:.1f}s" for mode, seconds in timings.items()),
+          file=sys.stderr)
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI Wine Sommelier")
+    parser.add_argument("--name", help="Customer name")
+    parser.add_argument("--dish", help="Dish description")
+    parser.add_argument("--persona", default="professional", choices=list(PERSONAS.keys()),
+                        help="Sommelier persona (default for batch rows without one)")
+    parser.add_argument("--bottles", action="store_true", help="Append specific bottle suggestions")
+    parser.add_argument("--backend", default="ollama", choices=["ollama", "groq"])
+    parser.add_argument("--model", default="llama3.2")
+    parser.add_argument("--host", help="Ollama host, e.g. http://localhost:11434; "
+                                       "comma-separate several to load-balance across them")
+    parser.add_argument("--compare", choices=["fanout", "fused", "both"],
+                        help="Ask every persona: one call each, one fused call, or time both")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus metrics on localhost:PORT/metrics while running")
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", metavar="FILE", help="JSONL/CSV requests file, or - for stdin")
+    batch.add_argument("--format", default="auto", choices=["auto", "jsonl", "csv"])
+    batch.add_argument("--workers", type=int, default=4, help="Concurrent requests")
+    batch.add_argument("--output", default="-", help="JSONL results file, or - for stdout")
+    batch.add_argument("--order", default="input", choices=["input", "completion"],
+                       help="Write results in input order or as they finish")
+    batch.add_argument("--checkpoint", help="Checkpoint file (default: OUTPUT.ckpt)")
+    batch.add_argument("--resume", action="store_true",
+                       help="Skip rows already recorded in the checkpoint and append to OUTPUT")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.metrics_port:
+        from src.metrics import serve_metrics
+        serve_metrics(args.metrics_port)
+    sommelier = WineSommelier(llm_client=build_client(args))
+    if args.batch:
+        return run_batch(sommelier, args)
+    if args.compare:
+        return run_compare(sommelier, args)
+    return run_single(sommelier, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
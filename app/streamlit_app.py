@@ -6,8 +6,14 @@ import random
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.sommelier import WineSommelier
+from src.sommelier import RecommendationStream, WineSommelier
 from src.personas import PERSONAS
+from src.prompt_builder import PromptBuilder
+from src.health import HealthProbe, ollama_check
+from src.metrics import serve_metrics
+from src.speculation import SpeculationPool, Speculator
+from src.warmup import KeepWarm
+from src.wine_api import WineDatabase
 
 # Page config
 st.set_page_config(
@@ -17,21 +23,63 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-IS_CLOUD = os.getenv("STREAMLIT_CLOUD") == "true"
+MODEL = "llama3.2"
+# Opt-in: start generating once the inputs settle, before the button is clicked
+SPECULATE = os.getenv("SOMMELIER_SPECULATE", "").lower() in ("1", "true", "yes")
 
-# Import the appropriate client
-if IS_CLOUD:
-    from src.cloud_client import CloudLLMClient as LLMClient
-else:
-    try:
-        import ollama
-        # Check if Ollama is actually running
-        ollama.list()
-        from src.simple_client import SimpleLLMClient as LLMClient
-    except:
-        # Fallback to cloud if Ollama isn't available locally
+
+@st.cache_resource
+def get_health_probe():
+    """Process-wide Ollama health probe; re-checks at most every 30s."""
+    return HealthProbe(ollama_check(), interval=30.0)
+
+
+@st.cache_resource
+def get_backend():
+    """Pick the backend once per process and share the warmed-up client."""
+    is_cloud = os.getenv("STREAMLIT_CLOUD") == "true"
+    # Fall back to cloud if Ollama isn't available locally
+    if not is_cloud and not get_health_probe().is_healthy():
+        is_cloud = True
+    if is_cloud:
         from src.cloud_client import CloudLLMClient as LLMClient
-        IS_CLOUD = True
+    else:
+        from src.simple_client import SimpleLLMClient as LLMClient
+    llm = LLMClient(model=MODEL)
+    # Preload the model before the first request
+    report = llm.warm_up() if hasattr(llm, 'warm_up') else None
+    if not is_cloud:
+        # Keep the local model loaded; Groq has nothing to unload, and
+        # pinging it would only spend rate-limit budget
+        KeepWarm([llm]).start()
+    return llm, report, is_cloud
+
+
+@st.cache_resource
+def start_metrics_server():
+    """Expose Prometheus metrics once per process when SOMMELIER_METRICS_PORT is set."""
+    port = os.getenv("SOMMELIER_METRICS_PORT")
+    return serve_metrics(int(port)) if port else None
+
+
+@st.cache_resource
+def get_speculation_pool():
+    """Caps speculative generations across all sessions (SOMMELIER_SPECULATE_MAX, default 1)."""
+    return SpeculationPool(max_concurrent=int(os.getenv("SOMMELIER_SPECULATE_MAX", "1")))
+
+
+@st.cache_resource
+def get_wine_db():
+    return WineDatabase()
+
+
+@st.cache_resource
+def get_prompt_builder():
+    return PromptBuilder()
+
+
+IS_CLOUD = get_backend()[2]
+start_metrics_server()
 
 
 # Custom CSS for elegant styling
@@ -247,16 +295,128 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize
+
+# Initialize: heavy resources are shared, only per-user state lives in the session
 if 'sommelier' not in st.session_state:
-    # Initialize LLM client first
-    llm = LLMClient(model="llama3.2")
-    # Pass it to WineSommelier
-    st.session_state.sommelier = WineSommelier(llm_client=llm)
+    llm, warmup_report, _ = get_backend()
+    st.session_state.sommelier = WineSommelier(
+        llm_client=llm,
+        wine_db=get_wine_db(),
+        prompt_builder=get_prompt_builder()
+    )
+    st.session_state.sommelier.warmup_report = warmup_report
+if SPECULATE and 'speculator' not in st.session_state:
+    # Bound to this session's sommelier; the worker thread can't read session_state
+    sommelier = st.session_state.sommelier
+    st.session_state.speculator = Speculator(
+        get_speculation_pool(),
+        lambda name, dish, persona: sommelier.recommend_stream(name, dish, persona, save_response=False)
+    )
 if 'history' not in st.session_state:
     st.session_state.history = []
 if 'show_comparison' not in st.session_state:
     st.session_state.show_comparison = False
+if 'comparisons' not in st.session_state:
+    # (name, dish, personas, model) -> {persona: PersonaResult}, most recent last
+    st.session_state.comparisons = {}
+
+MAX_STORED_COMPARISONS = 10
+
+
+def comparison_key(name, dish):
+    llm = st.session_state.sommelier.llm
+    return (name, dish, tuple(PERSONAS.keys()), getattr(llm, 'model', MODEL))
+
+
+def render_comparison_result(placeholder, result):
+    if not result.ok or st.session_state.sommelier.is_error_response(result.response):
+        placeholder.warning(f"{result.response}\n\nClick 🔁 Regenerate to try again.")
+        return
+    with placeholder.container():
+        st.markdown(
+            f'<div class="recommendation-box">{result.response}</div>',
+            unsafe_allow_html=True
+        )
+        st.caption(f"⏱️ Generated in {result.elapsed:.1f}s")
+
+
+def show_comparison(name, dish, regenerate=False):
+    """Render Compare All from the session store, generating only what's missing."""
+    key = comparison_key(name, dish)
+    store = st.session_state.comparisons
+    results = {} if regenerate else dict(store.get(key, {}))
+
+    tabs = st.tabs([f"🍷 {PERSONAS[p].name}" for p in PERSONAS.keys()])
+    placeholders = {}
+    for tab, persona_key in zip(tabs, PERSONAS.keys()):
+        with tab:
+            placeholders[persona_key] = st.empty()
+            if persona_key in results:
+                render_comparison_result(placeholders[persona_key], results[persona_key])
+            else:
+                placeholders[persona_key].info(f"🍇 Consulting {PERSONAS[persona_key].name}...")
+
+    missing = [p for p in PERSONAS.keys() if p not in results]
+    if missing:
+        # Fill each tab in as soon as its persona finishes
+        with st.spinner("Getting perspectives from all sommeliers..."):
+            for result in st.session_state.sommelier.iter_compare_personas(
+                name, dish, missing, refresh_cache=regenerate
+            ):
+                render_comparison_result(placeholders[result.persona], result)
+                # Failures are stored too; only Regenerate asks the backend again
+                results[result.persona] = result
+        store.pop(key, None)
+        store[key] = results
+        while len(store) > MAX_STORED_COMPARISONS:
+            store.pop(next(iter(store)))
+
+
+def stream_recommendation(name, dish, persona_key, persona_label):
+    """Render a recommendation as it streams in, then record it in history."""
+    sommelier = st.session_state.sommelier
+    speculator = st.session_state.get('speculator')
+    # A speculative generation for these inputs may already be running or done
+    flight = speculator.claim(name, dish, persona_key) if speculator else None
+    placeholder = st.empty()
+    with placeholder.container():
+        st.caption(f"🍇 Consulting {PERSONAS[persona_key].name}...")
+        if flight is not None:
+            stream = RecommendationStream(flight.stream())
+        else:
+            stream = sommelier.recommend_stream(
+                customer_name=name,
+                dish_description=dish,
+                persona=persona_key
+            )
+        st.write_stream(stream)
+    if flight is not None:
+        # Speculative runs don't save, in case they are discarded
+        sommelier.save_interaction(name, dish, persona_key, stream.text)
+    # The finished recommendation is shown from history below
+    placeholder.empty()
+    st.session_state.history.append({
+        'name': name,
+        'dish': dish,
+        'persona': persona_label,
+        'response': stream.text,
+        'time_to_first_token': stream.time_to_first_token,
+        'total_latency': stream.total_latency
+    })
+    st.session_state.show_comparison = False
+
+
+if st.session_state.sommelier.warmup_report is not None:
+    st.sidebar.caption(f"🔥 {st.session_state.sommelier.warmup_report}")
+if not IS_CLOUD:
+    health = get_health_probe().status()
+    st.sidebar.caption(f"{'🟢' if health.ok else '🔴'} Ollama {health}")
+if SPECULATE:
+    spec = get_speculation_pool().stats()
+    st.sidebar.caption(
+        f"⚡ Speculation hit rate {spec['hit_rate']:.0%} "
+        f"({spec['hits']}/{spec['hits'] + spec['misses']} requests)"
+    )
 
 # Header with subtle animation
 st.markdown('<h1><span class="wine-icon">🍷</span> AI Wine Sommelier <span class="wine-icon">🍷</span></h1>', unsafe_allow_html=True)
@@ -303,6 +463,9 @@ with col1:
     </div>
     """, unsafe_allow_html=True)
     
+    if 'speculator' in st.session_state:
+        st.session_state.speculator.observe(name, dish, persona)
+
     # Action buttons - Updated with 3 columns
     col_btn1, col_btn2, col_btn3 = st.columns(3)
     with col_btn1:
@@ -331,38 +494,16 @@ with col2:
     
     # Regular recommendation 
     if recommend_btn and name and dish:
-        with st.spinner("🍇 Consulting our sommelier..."):
-            response = st.session_state.sommelier.recommend(
-                customer_name=name,
-                dish_description=dish,
-                persona=persona
-            )
-            st.session_state.history.append({
-                'name': name,
-                'dish': dish,
-                'persona': PERSONAS[persona].name,
-                'response': response
-            })
-            st.session_state.show_comparison = False
+        stream_recommendation(name, dish, persona, PERSONAS[persona].name)
 
     # Surprise button (around line 350)
     if surprise_btn and name and dish:
         random_persona = random.choice(list(PERSONAS.keys()))
         st.info(f"🎲 Randomly selected: {PERSONAS[random_persona].name}")
         
-        with st.spinner(f"🍇 Consulting {PERSONAS[random_persona].name}..."):
-            response = st.session_state.sommelier.recommend(
-                customer_name=name,
-                dish_description=dish,
-                persona=random_persona
-            )
-            st.session_state.history.append({
-                'name': name,
-                'dish': dish,
-                'persona': PERSONAS[random_persona].name + " (Surprise!)",
-                'response': response
-            })
-            st.session_state.show_comparison = False
+        stream_recommendation(
+            name, dish, random_persona, PERSONAS[random_persona].name + " (Surprise!)"
+        )
     
     # Handle comparison button
     if compare_btn and name and dish:
@@ -371,12 +512,8 @@ with col2:
     # Display recommendation or comparison
     if st.session_state.show_comparison and name and dish:
         st.markdown("### 🎭 All Personalities")
-        with st.spinner("Getting perspectives from all sommeliers..."):
-            comparisons = st.session_state.sommelier.compare_personas(name, dish)
-            tabs = st.tabs([f"🍷 {PERSONAS[p].name}" for p in PERSONAS.keys()])
-            for tab, (persona_key, response) in zip(tabs, comparisons.items()):
-                with tab:
-                    st.markdown(f'<div class="recommendation-box">{response}</div>', unsafe_allow_html=True)
+        regenerate_btn = st.button("🔁 Regenerate", help="Ask every sommelier again")
+        show_comparison(name, dish, regenerate=regenerate_btn)
     elif st.session_state.history:
         latest = st.session_state.history[-1]
         st.markdown(f"""
@@ -387,6 +524,11 @@ with col2:
         </div>
         """, unsafe_allow_html=True)
         st.markdown(latest['response'])
+        if latest.get('total_latency') is not None:
+            st.caption(
+                f"⏱️ First words after {latest['time_to_first_token'] or 0:.1f}s · "
+                f"complete in {latest['total_latency']:.1f}s"
+            )
         
         # Export button
         if st.button("📥 Save Recommendation"):
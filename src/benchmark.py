@@ -0,0 +1,72 @@
+"""Tiny timing harness with JSON baselines, used by the offline benchmark suite."""
+import gc
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[], object], number: Optional[int] = None, repeat: int = 11,
+            min_time: float = 0.1) -> float:
+    """Seconds per call of ``fn``: median of ``repeat`` runs of ``number`` calls.
+
+    The median shrugs off both lucky and disturbed runs, and the garbage
+    collector is paused while timing (as timeit does) so a collection
+    triggered by an earlier test doesn't land in one benchmark's numbers.
+
+    Without ``number``, calls are batched until a run takes at least ``min_time``.
+    """
+    fn()  # warm caches and lazy imports
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if number is None:
+            number = 1
+            while True:
+                start = time.perf_counter()
+                for _ in range(number):
+                    fn()
+                if time.perf_counter() - start >= min_time or number >= 1_000_000:
+                    break
+                number *= 2
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            runs.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return statistics.median(runs)
+
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: Dict[str, float]) -> None:
+    with open(path, "w") as f:
+        json.dump(dict(sorted(results.items())), f, indent=2)
+        f.write("\n")
+
+
+def regressions(results: Dict[str, float], baseline: Dict[str, float],
+                threshold: float = 0.25, floor: float = 0.0) -> List[str]:
+    """Benchmarks more than ``threshold`` (a fraction) slower than their baseline.
+
+    ``floor`` (seconds) is the smallest slowdown that counts, so a
+    microsecond-scale step isn't failed by a few microseconds of jitter.
+    """
+    slow = []
+    for name, seconds in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected and seconds > max(expected * (1 + threshold), expected + floor):
+            slow.append(f"{name}: {seconds * 1e6:.1f}us vs baseline {expected * 1e6:.1f}us "
+                        f"(+{(seconds / expected - 1) * 100:.0f}%)")
+    return slow
@@ -1,38 +1,163 @@
 # src/cloud_client.py
-import streamlit as st
-from groq import Groq
+from src.config import fail, get_secret, report_error
+from src.generation import WARMUP_PROFILE, groq_params
+from src.http_pool import DEFAULT_POOL_SIZE, LoopLocal, pool_limits
+from src.prompt_builder import to_messages
+from src.rate_limit import estimate_request_tokens, groq_rate_limiter, usage_tokens
+from src.usage import TokenUsage
+from src.warmup import timed_warmup
 
 class CloudLLMClient:
-    def __init__(self, model="llama3.2"):
+    # Takes a per-request GenerationProfile (max tokens, stop, temperature)
+    accepts_generation_profile = True
+
+    def __init__(self, model="llama3.2", pool_size=DEFAULT_POOL_SIZE, rate_limiter=None):
         """Initialize cloud LLM client using Groq API"""
+        self.usage = TokenUsage("groq")
+        # Shared by every Groq client in the process unless one is passed in
+        self.rate_limiter = rate_limiter or groq_rate_limiter()
         try:
-            self.client = Groq(api_key=st.secrets["GROQ_API_KEY"])
-        except:
-            st.error("Please configure GROQ_API_KEY in Streamlit secrets")
-            st.stop()
-        
+            # Imported here so the package loads without the Groq SDK
+            import httpx
+            from groq import AsyncGroq, Groq
+            api_key = get_secret("GROQ_API_KEY")
+            if not api_key:
+                raise KeyError("GROQ_API_KEY")
+            # Reuse keep-alive connections across requests; 429s are retried
+            # by the rate limiter, not the SDK
+            self.client = Groq(
+                api_key=api_key,
+                max_retries=0,
+                http_client=httpx.Client(limits=pool_limits(pool_size))
+            )
+            self._async_clients = LoopLocal(lambda: AsyncGroq(
+                api_key=api_key,
+                max_retries=0,
+                http_client=httpx.AsyncClient(limits=pool_limits(pool_size))
+            ))
+        except Exception as e:
+            fail("Please configure GROQ_API_KEY in Streamlit secrets", e)
+
         # Only use WORKING Groq models
         self.model_map = {
-            "llama3.2": "llama-3.1-8b-instant",   
-            "llama3": "gemma2-9b-it",             
-            "llama2": "llama-3.1-8b-instant",     
-            "gemma": "gemma2-9b-it",              
-            "mixtral": "gemma2-9b-it",            
-            "qwen": "llama-3.1-8b-instant"        
+            "llama3.2": "llama-3.1-8b-instant",
+            "llama3": "gemma2-9b-it",
+            "llama2": "llama-3.1-8b-instant",
+            "gemma": "gemma2-9b-it",
+            "mixtral": "gemma2-9b-it",
+            "qwen": "llama-3.1-8b-instant"
         }
-        
+
         self.model = self.model_map.get(model, "llama-3.1-8b-instant")
-    
-    def chat(self, prompt):
+        self.usage.model = self.model
+
+    def warm_up(self):
+        """Open a pooled connection to Groq with a one-token request"""
+        messages = [{"role": "user", "content": "Hi"}]
+        tokens = estimate_request_tokens(messages, WARMUP_PROFILE)
+
+        def request():
+            # Counts against the same budget as real requests
+            self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=1
+                ),
+                tokens
+            )
+        return timed_warmup(self.model, request)
+
+    def chat(self, prompt, profile=None):
         """Send chat request to Groq API"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1000
+            messages = to_messages(prompt)
+            tokens = estimate_request_tokens(messages, profile)
+            response = self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **groq_params(profile)
+                ),
+                tokens
+            )
+            self.rate_limiter.settle(tokens, usage_tokens(response.usage))
+            self.usage.record_groq(response.usage)
+            return response.choices[0].message.content
+        except Exception as e:
+            self.usage.record_error(e)
+            report_error(f"Error calling Groq API: {str(e)}")
+            return "I'm having trouble connecting to my wine knowledge base. Please try again!"
+
+    def stream(self, prompt, profile=None):
+        """Stream response text chunks from Groq API as they are generated"""
+        try:
+            messages = to_messages(prompt)
+            tokens = estimate_request_tokens(messages, profile)
+            stream = self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **groq_params(profile),
+                    stream=True
+                ),
+                tokens
             )
+            for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+                if chunk.x_groq is not None and chunk.x_groq.usage is not None:
+                    self.rate_limiter.settle(tokens, usage_tokens(chunk.x_groq.usage))
+                    self.usage.record_groq(chunk.x_groq.usage)
+        except Exception as e:
+            self.usage.record_error(e)
+            report_error(f"Error calling Groq API: {str(e)}")
+            yield "I'm having trouble connecting to my wine knowledge base. Please try again!"
+
+    async def achat(self, prompt, profile=None):
+        """Send chat request to Groq API without blocking the event loop"""
+        try:
+            messages = to_messages(prompt)
+            tokens = estimate_request_tokens(messages, profile)
+            response = await self.rate_limiter.acall(
+                lambda: self._async_clients.get().chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **groq_params(profile)
+                ),
+                tokens
+            )
+            self.rate_limiter.settle(tokens, usage_tokens(response.usage))
+            self.usage.record_groq(response.usage)
             return response.choices[0].message.content
         except Exception as e:
-            st.error(f"Error calling Groq API: {str(e)}")
-            return "I'm having trouble connecting to my wine knowledge base. Please try again!"
\ No newline at end of file
+            self.usage.record_error(e)
+            report_error(f"Error calling Groq API: {str(e)}")
+            return "I'm having trouble connecting to my wine knowledge base. Please try again!"
+
+    async def astream(self, prompt, profile=None):
+        """Stream response text chunks from Groq API"""
+        try:
+            messages = to_messages(prompt)
+            tokens = estimate_request_tokens(messages, profile)
+            stream = await self.rate_limiter.acall(
+                lambda: self._async_clients.get().chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **groq_params(profile),
+                    stream=True
+                ),
+                tokens
+            )
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+                if chunk.x_groq is not None and chunk.x_groq.usage is not None:
+                    self.rate_limiter.settle(tokens, usage_tokens(chunk.x_groq.usage))
+                    self.usage.record_groq(chunk.x_groq.usage)
+        except Exception as e:
+            self.usage.record_error(e)
+            report_error(f"Error calling Groq API: {str(e)}")
+            yield "I'm having trouble connecting to my wine knowledge base. Please try again!"
@@ -0,0 +1,110 @@
+"""Secrets/config access and UI notices, kept free of Streamlit imports.
+
+The core library reads secrets through a provider that can be swapped out
+(``set_secrets_provider``), so headless scripts and workers never need
+Streamlit. By default environment variables are consulted first, then
+Streamlit secrets, which is only imported on first use.
+"""
+import os
+import sys
+from typing import Any, Dict, Optional, Sequence
+
+
+class SecretsProvider:
+    """Source of secrets such as API keys."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+
+class EnvSecrets(SecretsProvider):
+    """Secrets from environment variables."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return os.environ.get(key, default)
+
+
+class DictSecrets(SecretsProvider):
+    """Secrets from a plain dict, handy for tests and batch jobs."""
+
+    def __init__(self, values: Dict[str, Any]):
+        self.values = dict(values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+
+class StreamlitSecrets(SecretsProvider):
+    """Secrets from ``st.secrets``; imports Streamlit only when first asked."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            import streamlit as st
+            return st.secrets.get(key, default)
+        except Exception:
+            # No secrets.toml, or Streamlit isn't installed
+            return default
+
+
+class ChainSecrets(SecretsProvider):
+    """Try several providers in order."""
+
+    def __init__(self, providers: Sequence[SecretsProvider]):
+        self.providers = list(providers)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        for provider in self.providers:
+            value = provider.get(key)
+            if value is not None:
+                return value
+        return default
+
+
+_provider: SecretsProvider = ChainSecrets([EnvSecrets(), StreamlitSecrets()])
+
+
+def set_secrets_provider(provider: SecretsProvider) -> None:
+    """Replace the process-wide secrets provider."""
+    global _provider
+    _provider = provider
+
+
+def get_secret(key: str, default: Any = None) -> Any:
+    return _provider.get(key, default)
+
+
+def _streamlit_running():
+    """The streamlit module, but only inside a running Streamlit app."""
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return None
+    try:
+        from streamlit import runtime
+        return st if runtime.exists() else None
+    except Exception:
+        return None
+
+
+def report_error(message: str) -> None:
+    """Show an error in the Streamlit UI when running there, else on stderr."""
+    st = _streamlit_running()
+    if st is not None:
+        st.error(message)
+    else:
+        print(f"Error: {message}", file=sys.stderr)
+
+
+def report_info(message: str) -> None:
+    """Show a notice in the Streamlit sidebar when running there."""
+    st = _streamlit_running()
+    if st is not None:
+        st.sidebar.info(message)
+
+
+def fail(message: str, exc: Optional[Exception] = None):
+    """Stop the Streamlit script with an error, or raise outside Streamlit."""
+    st = _streamlit_running()
+    if st is not None:
+        st.error(message)
+        st.stop()
+    raise RuntimeError(message) from exc
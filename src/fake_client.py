@@ -0,0 +1,198 @@
+# src/fake_client.py
+"""Deterministic offline stand-in for the LLM clients, for tests and benchmarks."""
+import asyncio
+import random
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Union
+
+from src.fused import END_MARKER, listed_personas
+from src.generation import GenerationProfile
+from src.prompt_builder import Messages, to_messages
+from src.usage import TokenUsage
+from src.warmup import WarmupReport, timed_warmup
+
+WINES = [
+    "Pinot Noir", "Chardonnay", "Sauvignon Blanc", "Cabernet Sauvignon",
+    "Riesling", "Syrah", "Chianti", "Champagne",
+]
+
+# Most recent prompts (and profiles) a fake client keeps for inspection
+RECORDED_PROMPTS = 100
+
+Reply = Union[str, Callable[[Messages], str]]
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """How long a fake backend takes: time to first token, then a steady token rate."""
+    first_token: float = 0.0
+    tokens_per_second: float = 0.0  # 0 means instant
+    completion_tokens: int = 120
+    # Fraction of random (but seeded) variation applied to both delays
+    jitter: float = 0.0
+
+
+PROFILES: Dict[str, LatencyProfile] = {
+    "instant": LatencyProfile(),
+    "ollama_cpu": LatencyProfile(first_token=0.8, tokens_per_second=12, jitter=0.1),
+    "ollama_gpu": LatencyProfile(first_token=0.25, tokens_per_second=60, jitter=0.1),
+    "groq": LatencyProfile(first_token=0.15, tokens_per_second=500, jitter=0.1),
+}
+
+
+class FakeLLMClient:
+    """Same interface as the real clients; the reply depends only on the prompt and seed.
+
+    ``time_scale`` shrinks every delay (0.01 makes a 1s profile take 10ms)
+    so concurrency can be benchmarked without waiting on real latencies.
+    A GenerationProfile caps the reply at its ``max_tokens``.
+
+    Tests can pin the answer with ``reply`` (text, or a function of the
+    messages that may raise to play a failing backend) and add ``delay``
+    seconds (or a function of the messages) before the first token. Calls
+    started, peak concurrency and the latest prompts are recorded.
+    """
+
+    accepts_generation_profile = True
+
+    def __init__(self, profile: Union[str, LatencyProfile] = "instant", seed: int = 0,
+                 time_scale: float = 1.0, model: str = "fake", reply: Optional[Reply] = None,
+                 delay: Union[float, Callable[[Messages], float]] = 0.0):
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+        self.seed = seed
+        self.time_scale = time_scale
+        self.model = model
+        self.reply = reply
+        self.delay = delay
+        self.usage = TokenUsage("fake", model)
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.prompts: Deque[Messages] = deque(maxlen=RECORDED_PROMPTS)
+        self.profiles: Deque[Optional[GenerationProfile]] = deque(maxlen=RECORDED_PROMPTS)
+        self._lock = threading.Lock()
+
+    def _start(self, prompt: Union[str, Messages], generation: Optional[GenerationProfile]):
+        messages = to_messages(prompt)
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.prompts.append(messages)
+            self.profiles.append(generation)
+        try:
+            return self._plan(messages, generation)
+        except BaseException:
+            self._finish()
+            raise
+
+    def _finish(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _plan(self, prompt: Union[str, Messages], generation: Optional[GenerationProfile] = None):
+        """Reply tokens and per-token delays for a prompt, identical on every call."""
+        messages = to_messages(prompt)
+        text = "\n".join(m["content"] for m in messages)
+        rng = random.Random(zlib.crc32(text.encode("utf-8")) ^ self.seed)
+        profile = self.profile
+
+        if self.reply is not None:
+            reply = self.reply if isinstance(self.reply, str) else self.reply(messages)
+            tokens = re.findall(r"\s*\S+\s*", reply)
+            if generation is not None:
+                tokens = tokens[:generation.max_tokens]
+        else:
+            tokens = self._generate(messages, rng, generation)
+
+        # Streamed chunks join to exactly what chat() returns
+        while tokens and not tokens[-1].strip():
+            tokens.pop()
+        if tokens:
+            tokens[-1] = tokens[-1].rstrip()
+
+        def vary(seconds: float) -> float:
+            if profile.jitter:
+                seconds *= 1 + rng.uniform(-profile.jitter, profile.jitter)
+            return seconds * self.time_scale
+
+        extra = self.delay if isinstance(self.delay, (int, float)) else self.delay(messages)
+        first = vary(profile.first_token) + extra
+        per_token = vary(1 / profile.tokens_per_second) if profile.tokens_per_second else 0.0
+        return tokens, first, per_token, len(text) // 4
+
+    def _generate(self, messages: Messages, rng: random.Random,
+                  generation: Optional[GenerationProfile]) -> List[str]:
+        wine = WINES[rng.randrange(len(WINES))]
+        request = messages[-1]["content"]
+        words = (f"For {request.split(' asks: ')[-1][:80]}, I recommend a {wine}. "
+                 f"Its structure and acidity complement the dish. ").split()
+        count = max(self.profile.completion_tokens, len(words))
+        if generation is not None:
+            count = min(count, generation.max_tokens)
+        tokens = [words[i % len(words)] + " " for i in range(count)]
+        fused = listed_personas(messages)
+        if fused:
+            # Answer a fused comparison like an obliging model: one section per persona
+            tokens = [t for key in fused for t in [f"=== {key} ===\n", *tokens, "\n\n"]]
+            tokens.append(END_MARKER)
+            if generation is not None:
+                tokens = tokens[:generation.max_tokens]
+        return tokens
+
+    def _record(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.usage.record(prompt_tokens, completion_tokens)
+        if self.profile.tokens_per_second:
+            self.usage.record_rate(completion_tokens, completion_tokens / self.profile.tokens_per_second)
+
+    def warm_up(self) -> WarmupReport:
+        return timed_warmup(self.model, lambda: 0.0)
+
+    def chat(self, prompt, profile=None) -> str:
+        tokens, first, per_token, prompt_tokens = self._start(prompt, profile)
+        try:
+            delay = first + per_token * len(tokens)
+            if delay:
+                time.sleep(delay)
+            self._record(prompt_tokens, len(tokens))
+            return "".join(tokens)
+        finally:
+            self._finish()
+
+    def stream(self, prompt, profile=None):
+        tokens, first, per_token, prompt_tokens = self._start(prompt, profile)
+        try:
+            if first:
+                time.sleep(first)
+            for token in tokens:
+                if per_token:
+                    time.sleep(per_token)
+                yield token
+            self._record(prompt_tokens, len(tokens))
+        finally:
+            self._finish()
+
+    async def achat(self, prompt, profile=None) -> str:
+        tokens, first, per_token, prompt_tokens = self._start(prompt, profile)
+        try:
+            await asyncio.sleep(first + per_token * len(tokens))
+            self._record(prompt_tokens, len(tokens))
+            return "".join(tokens)
+        finally:
+            self._finish()
+
+    async def astream(self, prompt, profile=None):
+        tokens, first, per_token, prompt_tokens = self._start(prompt, profile)
+        try:
+            await asyncio.sleep(first)
+            for token in tokens:
+                await asyncio.sleep(per_token)
+                yield token
+            self._record(prompt_tokens, len(tokens))
+        finally:
+            self._finish()
@@ -0,0 +1,122 @@
+"""Fused comparison: one LLM call answers as several personas at once.
+
+Each reply comes back under a ``=== persona_key ===`` header and the
+whole answer ends with ``=== END ===`` (a JSON object keyed by persona is
+accepted too). A reply with no header after it may have been cut off by
+``max_tokens``, so that persona gets its own call instead. One call pays prompt prefill
+and scheduling once instead of per persona, which helps most on a single
+CPU-bound Ollama server where parallel requests don't overlap.
+"""
+import json
+import re
+import threading
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from src.generation import (
+    DEFAULT_PROFILE, PROMPT_OVERHEAD_TOKENS, GenerationProfile, estimate_tokens
+)
+from src.prompt_builder import TEMPLATE_VERSION, Messages, PromptBuilder, compact_text
+
+# Roughly 0.75 words per token in English
+WORDS_PER_TOKEN = 0.75
+
+_HEADER = re.compile(r"^[ \t#*]*={2,}[ \t]*\[?([A-Za-z0-9_]+)\]?[ \t]*={2,}[ \t*]*$", re.MULTILINE)
+END_MARKER = "=== END ==="
+_LISTED = re.compile(r"^\[([A-Za-z0-9_]+)\] ", re.MULTILINE)
+
+_cache: Dict[tuple, str] = {}
+_cache_lock = threading.Lock()
+
+
+def fused_system_prompt(personas: Mapping[str, object], words_per_reply: int) -> str:
+    """Instructions plus a condensed description of every persona, built once per set."""
+    key = (TEMPLATE_VERSION, words_per_reply) + tuple(
+        (k, p.role, p.instruction, p.tone_markers) for k, p in personas.items()
+    )
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    sections = []
+    for persona_key, persona in personas.items():
+        lines = [f"[{persona_key}] {persona.name}", compact_text(persona.role),
+                 compact_text(persona.instruction)]
+        if persona.tone_markers:
+            lines.append(f"Tone: {compact_text(persona.tone_markers)}")
+        sections.append("\n".join(lines))
+    first = next(iter(personas))
+    system = (
+        f"You are {len(personas)} different wine sommeliers answering the same customer. "
+        f"Write one complete, in-character recommendation from each sommelier below, "
+        f"in the order listed, each under {words_per_reply} words.\n"
+        f"Start each reply with its key on a line of its own, like:\n"
+        f"=== {first} ===\n"
+        f"After the last reply, write {END_MARKER} on a line of its own.\n\n"
+        + "\n\n".join(sections)
+    )
+    with _cache_lock:
+        return _cache.setdefault(key, system)
+
+
+def fused_prompt(personas: Mapping[str, object], user_name: str, user_input: str,
+                 num_ctx: int = DEFAULT_PROFILE.num_ctx) -> Tuple[Messages, GenerationProfile]:
+    """Messages and generation settings for one call covering ``personas``.
+
+    The replies share whatever context is left after the prompt, so the
+    context size (and the loaded Ollama model) stays the same as for
+    single-persona calls.
+    """
+    profiles = [getattr(p, 'generation', None) or DEFAULT_PROFILE for p in personas.values()]
+    wanted = sum(p.max_tokens for p in profiles)
+    # Size the prompt with a provisional word budget, then fit the replies in what's left
+    probe = fused_system_prompt(personas, 100)
+    available = (num_ctx - estimate_tokens(probe) - estimate_tokens(user_input)
+                 - PROMPT_OVERHEAD_TOKENS)
+    max_tokens = max(1, min(wanted, available))
+    words = max(20, int(max_tokens / len(personas) * WORDS_PER_TOKEN) // 10 * 10)
+    messages = [
+        {'role': 'system', 'content': fused_system_prompt(personas, words)},
+        {'role': 'user', 'content': PromptBuilder.user_prompt(user_name, user_input)},
+    ]
+    temperature = sum(p.temperature for p in profiles) / len(profiles)
+    return messages, GenerationProfile(max_tokens=max_tokens, temperature=round(temperature, 2),
+                                       num_ctx=num_ctx)
+
+
+def listed_personas(prompt: Messages) -> List[str]:
+    """Persona keys a fused system prompt asks for, in order (empty for other prompts)."""
+    if not prompt or prompt[0].get('role') != 'system':
+        return []
+    system = prompt[0]['content']
+    # Every fused prompt names the end marker; skip the regex scan for the rest
+    if END_MARKER not in system:
+        return []
+    return _LISTED.findall(system)
+
+
+def parse_fused_response(text: str, keys: Sequence[str]) -> Dict[str, str]:
+    """Split a fused reply into ``{persona_key: response}``.
+
+    Missing or empty replies are left out, and so is a last reply that no
+    header (normally ``=== END ===``) closes, since it may be truncated.
+    """
+    wanted = set(keys)
+    parsed: Dict[str, str] = {}
+    headers = list(_HEADER.finditer(text))
+    for match, closing in zip(headers, headers[1:]):
+        key = match.group(1)
+        body = text[match.end():closing.start()].strip()
+        if key in wanted and body and key not in parsed:
+            parsed[key] = body
+    if parsed:
+        return parsed
+    # Some models answer in JSON whatever they are asked
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {k: v.strip() for k, v in data.items() if k in wanted and isinstance(v, str) and v.strip()}
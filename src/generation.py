@@ -0,0 +1,78 @@
+"""Per-persona generation settings and local prompt-size estimates."""
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Ollama reloads a model whenever num_ctx changes, so every persona (and the
+# warm-up request) should share one context size
+DEFAULT_NUM_CTX = 2048
+# Longest dish description sent to the model; longer ones are trimmed
+MAX_DISH_TOKENS = 200
+# Chat-template tokens plus the "Customer ... asks:" wrapper around the dish
+PROMPT_OVERHEAD_TOKENS = 32
+# Rough characters per token for English text with Llama-family tokenizers
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Output limits and sampling settings applied by every backend."""
+    max_tokens: int = 500
+    temperature: float = 0.7
+    # Generation stops at the first of these; Groq accepts at most 4
+    stop: Tuple[str, ...] = ()
+    # Context window; Ollama only (Groq fixes it per model)
+    num_ctx: int = DEFAULT_NUM_CTX
+
+
+DEFAULT_PROFILE = GenerationProfile()
+# One-token request that loads the model or opens a connection
+WARMUP_PROFILE = GenerationProfile(max_tokens=1)
+
+
+def ollama_options(profile: Optional[GenerationProfile] = None,
+                   temperature: Optional[float] = None) -> Dict[str, Any]:
+    """Ollama ``options`` for a profile; ``temperature`` overrides the profile's."""
+    profile = profile or DEFAULT_PROFILE
+    options = {
+        "temperature": profile.temperature if temperature is None else temperature,
+        "num_predict": profile.max_tokens,
+        "num_ctx": profile.num_ctx,
+    }
+    if profile.stop:
+        options["stop"] = list(profile.stop)
+    return options
+
+
+def groq_params(profile: Optional[GenerationProfile] = None) -> Dict[str, Any]:
+    """Keyword arguments for Groq's chat.completions.create."""
+    profile = profile or DEFAULT_PROFILE
+    params = {"temperature": profile.temperature, "max_tokens": profile.max_tokens}
+    if profile.stop:
+        params["stop"] = list(profile.stop[:4])
+    return params
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without loading a tokenizer."""
+    if not text:
+        return 0
+    # Short words and punctuation cost more than four characters' worth
+    return max(math.ceil(len(text) / CHARS_PER_TOKEN), len(text.split()))
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` at a word boundary so it fits in about ``max_tokens`` tokens."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    cut = text[:max_tokens * CHARS_PER_TOKEN]
+    words = cut.split()[:max_tokens]
+    # Drop the word the cut landed in, unless it is the only one
+    if len(words) > 1 and not cut[-1].isspace():
+        words = words[:-1]
+    trimmed = " ".join(words)
+    while trimmed and estimate_tokens(trimmed + " …") > max_tokens:
+        trimmed = trimmed.rsplit(" ", 1)[0] if " " in trimmed else ""
+    return trimmed + " …" if trimmed else ""
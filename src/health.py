@@ -0,0 +1,67 @@
+"""Cached backend health checks, so UIs don't probe the backend on every render."""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class HealthStatus:
+    """Result of the most recent probe."""
+    ok: bool
+    checked_at: float
+    latency: float
+    error: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.checked_at
+
+    def __str__(self) -> str:
+        if self.ok:
+            return f"healthy ({self.latency * 1000:.0f}ms, checked {self.age:.0f}s ago)"
+        return f"unavailable: {self.error} (checked {self.age:.0f}s ago)"
+
+
+class HealthProbe:
+    """Run ``check`` at most once per ``interval`` seconds and cache the result.
+
+    ``check`` returns normally when the backend is healthy and raises otherwise.
+    Concurrent callers share one in-flight probe.
+    """
+
+    def __init__(self, check: Callable[[], object], interval: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.check = check
+        self.interval = interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._status: Optional[HealthStatus] = None
+        self.probes = 0
+
+    def status(self, refresh: bool = False) -> HealthStatus:
+        """Cached status, re-probing when stale or when ``refresh`` is set."""
+        with self._lock:
+            if refresh or self._status is None or self._clock() - self._status.checked_at >= self.interval:
+                self._status = self._probe()
+            return self._status
+
+    def is_healthy(self) -> bool:
+        return self.status().ok
+
+    def _probe(self) -> HealthStatus:
+        self.probes += 1
+        start = self._clock()
+        try:
+            self.check()
+        except Exception as e:
+            return HealthStatus(False, self._clock(), self._clock() - start, f"{type(e).__name__}: {e}")
+        return HealthStatus(True, self._clock(), self._clock() - start)
+
+
+def ollama_check(host: Optional[str] = None, timeout: float = 2.0) -> Callable[[], object]:
+    """Health check that lists the models of an Ollama server."""
+    def check():
+        import ollama
+        return ollama.Client(host=host, timeout=timeout).list()
+    return check
@@ -0,0 +1,167 @@
+"""Persisted interaction history: an append-only JSONL log written off the request path.
+
+Records are queued and written in batches by a background thread. The
+active file is rotated by size and age into timestamped siblings, and
+``iter_records`` streams everything back oldest-first for analytics:
+
+    for record in JSONLHistorySink(".cache/history").iter_records():
+        ...
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+class JSONLHistorySink:
+    """Batched, rotating JSONL writer for interaction records."""
+
+    ACTIVE = "history.jsonl"
+
+    def __init__(self, directory: str = ".cache/history", max_bytes: int = 50 * 1024 * 1024,
+                 max_age: Optional[float] = 24 * 3600, batch_size: int = 256,
+                 max_queue: int = 10_000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._opened_at = 0.0
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @property
+    def active_path(self) -> Path:
+        return self.directory / self.ACTIVE
+
+    def write(self, record: Dict) -> bool:
+        """Queue a record without blocking; False (and counted) if the queue is full."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self) -> None:
+        """Block until every queued record is on disk."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(None)
+        self._writer.join()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Optional[Dict]] = [self._queue.get()]
+            # Records that piled up while the last batch was written go out together
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not None]
+            try:
+                if records:
+                    self._write_batch(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        self._maybe_rotate()
+        if self._file is None:
+            self._file = open(self.active_path, "a", encoding="utf-8")
+            self._opened_at = time.time()
+        self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        self._file.flush()
+        self.written += len(records)
+
+    def _maybe_rotate(self) -> None:
+        path = self.active_path
+        if not path.exists():
+            return
+        if self._file is None:
+            self._opened_at = path.stat().st_mtime if path.stat().st_size else time.time()
+        too_big = path.stat().st_size >= self.max_bytes
+        too_old = self.max_age is not None and time.time() - self._opened_at >= self.max_age
+        if not (too_big or too_old) or path.stat().st_size == 0:
+            return
+        if self._file:
+            self._file.close()
+            self._file = None
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        os.replace(path, self.directory / f"history-{stamp}.jsonl")
+        self.rotations += 1
+
+    def files(self) -> List[Path]:
+        """History files oldest-first: rotated files, then the active one."""
+        rotated = sorted(self.directory.glob("history-*.jsonl"))
+        if self.active_path.exists():
+            rotated.append(self.active_path)
+        return rotated
+
+    def iter_records(self, since: Optional[str] = None) -> Iterator[Dict]:
+        """Stream past interactions oldest-first, one line at a time.
+
+        ``since`` is an ISO timestamp; older records are skipped.
+        """
+        for path in self.files():
+            try:
+                f = open(path, encoding="utf-8")
+            except FileNotFoundError:
+                # Rotated away between listing and opening
+                continue
+            with f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # A batch still being written
+                        break
+                    record = json.loads(line)
+                    if since is None or record.get("timestamp", "") >= since:
+                        yield record
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
+
+
+_sinks: Dict[Path, JSONLHistorySink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_history_sink(directory: str) -> JSONLHistorySink:
+    """Process-wide sink for a directory, so only one writer appends to and rotates its files."""
+    key = Path(directory).resolve()
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None or sink._closed:
+            sink = _sinks[key] = JSONLHistorySink(str(key))
+        return sink
@@ -0,0 +1,45 @@
+"""Shared HTTP connection-pool settings for the LLM backends."""
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Callable, Generic, TypeVar
+
+if TYPE_CHECKING:
+    import httpx
+
+# Enough keep-alive connections for a full persona comparison plus headroom
+DEFAULT_POOL_SIZE = 32
+
+T = TypeVar("T")
+
+
+def pool_limits(pool_size: int = DEFAULT_POOL_SIZE) -> "httpx.Limits":
+    """Keep-alive connection limits for one backend client."""
+    import httpx
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=30.0,
+    )
+
+
+class LoopLocal(Generic[T]):
+    """Lazily create one object per running event loop.
+
+    httpx.AsyncClient pools are bound to the loop that first used them, so
+    async clients are cached per loop rather than shared across loops.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instances = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            instance = self._instances.get(loop)
+            if instance is None:
+                instance = self._factory()
+                self._instances[loop] = instance
+            return instance
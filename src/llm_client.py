@@ -1,17 +1,39 @@
 """Ollama client wrapper for LLM interactions."""
-import ollama
+from typing import AsyncIterator, Iterator, Optional, Union
+
+from src.generation import DEFAULT_NUM_CTX, GenerationProfile, ollama_options
+from src.http_pool import DEFAULT_POOL_SIZE, LoopLocal, pool_limits
+from src.prompt_builder import Messages, to_messages
+from src.usage import TokenUsage
+from src.warmup import DEFAULT_KEEP_ALIVE, WarmupReport, timed_warmup
 
 class LLMClient:
     """Wrapper for Ollama API interactions."""
-    
-    def __init__(self, model: str = "llama3.2"):
+
+    # Takes a per-request GenerationProfile (max tokens, stop, temperature, num_ctx)
+    accepts_generation_profile = True
+
+    def __init__(self, model: str = "llama3.2", host: Optional[str] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 keep_alive: Optional[Union[str, float]] = DEFAULT_KEEP_ALIVE):
         self.model = model
+        self.keep_alive = keep_alive
+        self.host = host
+        self.pool_size = pool_size
+        self.usage = TokenUsage("ollama", model)
+        # Imported here so the package loads without the Ollama SDK
+        import ollama
+        # Keep-alive pools shared by every request from this client
+        self.client = ollama.Client(host=host, limits=pool_limits(pool_size))
+        self._async_clients = LoopLocal(
+            lambda: ollama.AsyncClient(host=host, limits=pool_limits(pool_size))
+        )
         self._validate_model()
-    
+
     def _validate_model(self):
         """Check if model is available in Ollama."""
         try:
-            models = ollama.list()
+            models = self.client.list()
             # Handle the response structure correctly
             available_models = [m.model for m in models.models]
             # Also check for model:tag format
@@ -21,15 +43,93 @@ class LLMClient:
                 print(f"Available models: {available_models}")
         except Exception as e:
             print(f"Warning: Could not validate model: {e}")
-    
-    def chat(self, prompt: str, temperature: float = 0.7) -> str:
+
+    def warm_up(self, model: Optional[str] = None) -> WarmupReport:
+        """Load the model into memory with a one-token generation."""
+        model = model or self.model
+
+        def request():
+            response = self.client.generate(
+                model=model,
+                prompt="Hi",
+                # Same num_ctx as real requests, or the first one reloads the model
+                options={'num_predict': 1, 'num_ctx': DEFAULT_NUM_CTX},
+                keep_alive=self.keep_alive
+            )
+            load_duration = response.get('load_duration')
+            return load_duration / 1e9 if load_duration is not None else None
+
+        return timed_warmup(model, request)
+
+    def chat(self, prompt: Union[str, Messages], temperature: Optional[float] = None,
+             profile: Optional[GenerationProfile] = None) -> str:
         """Send chat request to LLM."""
         try:
-            response = ollama.chat(
+            response = self.client.chat(
                 model=self.model,
-                messages=[{'role': 'user', 'content': prompt}],
-                options={'temperature': temperature}
+                messages=to_messages(prompt),
+                options=ollama_options(profile, temperature),
+                keep_alive=self.keep_alive
             )
+            self.usage.record_ollama(response)
             return response['message']['content']
         except Exception as e:
+            self.usage.record_error(e)
             return f"Error: {str(e)}"
+
+    def stream(self, prompt: Union[str, Messages], temperature: Optional[float] = None,
+               profile: Optional[GenerationProfile] = None) -> Iterator[str]:
+        """Stream response text chunks from the LLM as they are generated."""
+        try:
+            for part in self.client.chat(
+                model=self.model,
+                messages=to_messages(prompt),
+                options=ollama_options(profile, temperature),
+                keep_alive=self.keep_alive,
+                stream=True
+            ):
+                content = part['message']['content']
+                if content:
+                    yield content
+                if part.get('done'):
+                    self.usage.record_ollama(part)
+        except Exception as e:
+            self.usage.record_error(e)
+            yield f"Error: {str(e)}"
+
+    async def achat(self, prompt: Union[str, Messages], temperature: Optional[float] = None,
+                    profile: Optional[GenerationProfile] = None) -> str:
+        """Send chat request to LLM without blocking the event loop."""
+        try:
+            response = await self._async_clients.get().chat(
+                model=self.model,
+                messages=to_messages(prompt),
+                options=ollama_options(profile, temperature),
+                keep_alive=self.keep_alive
+            )
+            self.usage.record_ollama(response)
+            return response['message']['content']
+        except Exception as e:
+            self.usage.record_error(e)
+            return f"Error: {str(e)}"
+
+    async def astream(self, prompt: Union[str, Messages], temperature: Optional[float] = None,
+                      profile: Optional[GenerationProfile] = None) -> AsyncIterator[str]:
+        """Stream response text chunks from the LLM."""
+        try:
+            stream = await self._async_clients.get().chat(
+                model=self.model,
+                messages=to_messages(prompt),
+                options=ollama_options(profile, temperature),
+                keep_alive=self.keep_alive,
+                stream=True
+            )
+            async for part in stream:
+                content = part['message']['content']
+                if content:
+                    yield content
+                if part.get('done'):
+                    self.usage.record_ollama(part)
+        except Exception as e:
+            self.usage.record_error(e)
+            yield f"Error: {str(e)}"
@@ -0,0 +1,324 @@
+"""In-process metrics (counters and histograms) with a Prometheus text endpoint.
+
+Read them in process with ``REGISTRY.snapshot()``, or scrape them:
+
+    from src.metrics import serve_metrics
+    serve_metrics(port=9464)   # curl localhost:9464/metrics
+"""
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; spans cache hits (sub-ms) up to slow CPU generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RATE_BUCKETS = (1, 5, 10, 20, 40, 80, 160, 320, 640, 1280)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple([labels[n] for n in self.labelnames])
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._inc(self._key(labels), amount)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def labels(self, **labels) -> "_BoundCounter":
+        """The series for ``labels``, checked once; for per-request hot paths."""
+        return _BoundCounter(self, self._key(labels))
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v:g}"
+                for k, v in sorted(self.samples().items())]
+
+
+class Histogram(_Metric):
+    """Bucketed observations with a running sum and count per label combination."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        self._observe(self._key(labels), value)
+
+    def _observe(self, key: LabelValues, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing how long the ``with`` block takes, even if it raises."""
+        return _Timer(self.labels(**labels))
+
+    def labels(self, **labels) -> "_BoundHistogram":
+        """The series for ``labels``, checked once; for per-request hot paths."""
+        return _BoundHistogram(self, self._key(labels))
+
+    def summary(self, **labels) -> Dict[str, float]:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return {"count": 0, "sum": 0.0, "mean": 0.0}
+            return {"count": series[2], "sum": series[1], "mean": series[1] / series[2]}
+
+    def samples(self) -> Dict[LabelValues, Dict[str, float]]:
+        with self._lock:
+            keys = list(self._series)
+        return {k: self.summary(**dict(zip(self.labelnames, k))) for k in keys}
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            series = {k: ([*v[0]], v[1], v[2]) for k, v in self._series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total:g}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _BoundCounter:
+    __slots__ = ("counter", "key")
+
+    def __init__(self, counter: Counter, key: LabelValues):
+        self.counter = counter
+        self.key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.counter._inc(self.key, amount)
+
+
+class _BoundHistogram:
+    __slots__ = ("histogram", "key")
+
+    def __init__(self, histogram: Histogram, key: LabelValues):
+        self.histogram = histogram
+        self.key = key
+
+    def observe(self, value: float) -> None:
+        self.histogram._observe(self.key, value)
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    """Plain class rather than @contextmanager: it wraps every pipeline phase."""
+    __slots__ = ("series", "start")
+
+    def __init__(self, series: _BoundHistogram):
+        self.series = series
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.series.observe(time.perf_counter() - self.start)
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """{metric: {"label=value,...": value or {count, sum, mean}}} for in-process use."""
+        snapshot = {}
+        for name, metric in sorted(self._metrics.items()):
+            snapshot[name] = {
+                ",".join(f"{n}={v}" for n, v in zip(metric.labelnames, key)): value
+                for key, value in sorted(metric.samples().items())
+            }
+        return snapshot
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    "sommelier_requests_total", "Recommendations served", ("persona", "model", "source")
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    "sommelier_request_errors_total", "Recommendations that came back as an error message",
+    ("persona", "model")
+)
+COALESCED = REGISTRY.counter(
+    "sommelier_coalesced_requests_total", "Requests that shared an identical in-flight generation",
+    ("persona", "model")
+)
+SPECULATIONS = REGISTRY.counter(
+    "sommelier_speculations_total",
+    "Speculative generations by outcome (started, skipped, discarded, hits, misses)",
+    ("outcome",)
+)
+PHASE_SECONDS = REGISTRY.histogram(
+    "sommelier_phase_seconds",
+    "Time per pipeline phase (prompt_build, llm_call, varietal_extraction, bottle_lookup)",
+    ("phase", "persona", "model")
+)
+LLM_ERRORS = REGISTRY.counter(
+    "llm_client_errors_total", "Backend calls that failed (even when a friendly message was returned)",
+    ("backend", "model", "error")
+)
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "llm_rate_limit_wait_seconds", "Time a request queued in the client-side rate limiter",
+    ("priority",)
+)
+RATE_LIMIT_RETRIES = REGISTRY.counter(
+    "llm_rate_limit_retries_total", "Requests retried after the backend answered 429",
+    ("priority",)
+)
+TOKENS_PER_SECOND = REGISTRY.histogram(
+    "llm_generation_tokens_per_second", "Completion tokens per second reported by the backend",
+    ("backend", "model"), buckets=RATE_BUCKETS
+)
+
+
+class RequestMetrics:
+    """The recommendation series for one persona and model, bound once and reused."""
+
+    def __init__(self, persona: str, model: str):
+        labels = {"persona": persona, "model": model}
+        self.prompt_build = PHASE_SECONDS.labels(phase="prompt_build", **labels)
+        self.llm_seconds = PHASE_SECONDS.labels(phase="llm_call", **labels)
+        self.varietal_extraction = PHASE_SECONDS.labels(phase="varietal_extraction", **labels)
+        self.bottle_lookup = PHASE_SECONDS.labels(phase="bottle_lookup", **labels)
+        self.from_llm = REQUESTS.labels(source="llm", **labels)
+        self.from_cache = REQUESTS.labels(source="cache", **labels)
+        self.errors = REQUEST_ERRORS.labels(**labels)
+        self.coalesced = COALESCED.labels(**labels)
+
+    def llm_call(self) -> "_LLMCallTimer":
+        """Time an LLM call; a raising client still counts as a failed request."""
+        return _LLMCallTimer(self)
+
+
+class _LLMCallTimer:
+    __slots__ = ("metrics", "start")
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.metrics.llm_seconds.observe(time.perf_counter() - self.start)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.metrics.from_llm.inc()
+            self.metrics.errors.inc()
+
+
+def serve_metrics(port: int = 9464, host: str = "127.0.0.1",
+                  registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread; returns the server (``shutdown()`` to stop)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
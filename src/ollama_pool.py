@@ -0,0 +1,325 @@
+"""Spread requests over several Ollama servers.
+
+Each request goes to the healthy host with the fewest requests in flight,
+preferring hosts that already have the model loaded (no cold start) unless
+they are ``cold_penalty`` requests busier.
+Hosts that keep failing are ejected for a cool-down, then get one trial
+request at a time until one succeeds; a request that fails on one host is
+retried on another. A host that hasn't pulled the model (404) is passed
+over for a cool-down too. With no host able to take it, a request fails fast.
+
+    client = MultiHostLLMClient(["http://gpu1:11434", "http://gpu2:11434"])
+    sommelier = WineSommelier(llm_client=client)
+"""
+import itertools
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence, Union
+
+from src.generation import DEFAULT_NUM_CTX, GenerationProfile, ollama_options
+from src.http_pool import DEFAULT_POOL_SIZE, LoopLocal, pool_limits
+from src.prompt_builder import Messages, to_messages
+from src.resilience import CircuitBreaker, CircuitOpenError
+from src.usage import TokenUsage
+from src.warmup import DEFAULT_KEEP_ALIVE, WarmupReport, timed_warmup
+
+
+def keep_alive_seconds(keep_alive: Optional[Union[str, float]]) -> float:
+    """Seconds a model stays loaded for an Ollama keep_alive value ("30m", "1h", 300)."""
+    if keep_alive is None:
+        return 300.0  # Ollama's default
+    if isinstance(keep_alive, (int, float)):
+        return float(keep_alive)
+    units = {"s": 1, "m": 60, "h": 3600}
+    text = keep_alive.strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+class OllamaHost:
+    """One Ollama server and what the router knows about it."""
+
+    def __init__(self, url: str, pool_size: int, failure_threshold: int, cooldown: float):
+        # Imported here so the package loads without the Ollama SDK
+        import ollama
+        self.url = url
+        self.client = ollama.Client(host=url, limits=pool_limits(pool_size))
+        self.async_clients = LoopLocal(
+            lambda: ollama.AsyncClient(host=url, limits=pool_limits(pool_size))
+        )
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown=cooldown)
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        # model -> monotonic time until which it is expected to stay loaded
+        self.loaded: Dict[str, float] = {}
+        # model -> monotonic time until which the host is assumed not to have it
+        self.missing: Dict[str, float] = {}
+
+    def has_loaded(self, model: str) -> bool:
+        return self.loaded.get(model, 0.0) > time.monotonic()
+
+    def lacks(self, model: str) -> bool:
+        return self.missing.get(model, 0.0) > time.monotonic()
+
+    def stats(self) -> Dict:
+        return {
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "state": self.breaker.state,
+            "loaded": sorted(m for m in self.loaded if self.has_loaded(m)),
+        }
+
+
+class MultiHostLLMClient:
+    """Least-outstanding-requests load balancer over Ollama hosts.
+
+    Same interface as LLMClient, so it works behind WineSommelier unchanged.
+    """
+
+    accepts_generation_profile = True
+
+    def __init__(self, hosts: Sequence[str], model: str = "llama3.2",
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 keep_alive: Optional[Union[str, float]] = DEFAULT_KEEP_ALIVE,
+                 failure_threshold: int = 3, cooldown: float = 30.0, cold_penalty: int = 2):
+        if not hosts:
+            raise ValueError("At least one Ollama host is required")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.usage = TokenUsage("ollama", model)
+        # A host without the model loaded counts as this many extra requests in flight
+        self.cold_penalty = cold_penalty
+        self.hosts: List[OllamaHost] = [
+            OllamaHost(url, pool_size, failure_threshold, cooldown) for url in hosts
+        ]
+        self._lock = threading.Lock()
+        # Rotates the tie-break order so equally loaded hosts share the work
+        self._turn = itertools.count()
+
+    def _acquire(self, exclude=()) -> Optional[OllamaHost]:
+        """Reserve the best host for a request, or None if no untried host will take one."""
+        with self._lock:
+            start = next(self._turn) % len(self.hosts)
+            rotated = self.hosts[start:] + self.hosts[:start]
+            # Hosts that said they don't have the model go last
+            ranked = sorted(
+                (h for h in rotated if h not in exclude),
+                key=lambda h: (h.lacks(self.model),
+                               h.outstanding + (0 if h.has_loaded(self.model) else self.cold_penalty))
+            )
+            for host in ranked:
+                # Ejected hosts are skipped; a cooled-down one gets a single trial request at a time
+                if host.breaker.allow():
+                    break
+            else:
+                return None
+            host.outstanding += 1
+            host.requests += 1
+            return host
+
+    def _release(self, host: OllamaHost, error: Optional[BaseException] = None) -> None:
+        failed = error is not None and _is_host_failure(error)
+        with self._lock:
+            host.outstanding -= 1
+            if error is None:
+                host.loaded[self.model] = time.monotonic() + keep_alive_seconds(self.keep_alive)
+                host.missing.pop(self.model, None)
+            elif failed:
+                host.failures += 1
+                host.loaded.pop(self.model, None)
+            elif _is_model_missing(error):
+                host.loaded.pop(self.model, None)
+                host.missing[self.model] = time.monotonic() + host.breaker.cooldown
+        if failed:
+            host.breaker.record_failure()
+        else:
+            # A 4xx still proves the host is up
+            host.breaker.record_success()
+
+    def _give_up(self, last_error: Optional[BaseException]) -> str:
+        if last_error is None:
+            # No host was even tried
+            last_error = CircuitOpenError("Every Ollama host is ejected or running a trial request")
+        self.usage.record_error(last_error)
+        return f"Error: {str(last_error)}"
+
+    def _request(self, messages, profile: Optional[GenerationProfile] = None) -> Dict:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "options": ollama_options(profile),
+            "keep_alive": self.keep_alive,
+        }
+
+    def warm_up(self, model: Optional[str] = None) -> WarmupReport:
+        """Load the model on every host; the slowest load is reported."""
+        model = model or self.model
+
+        def request():
+            loads = []
+            errors = []
+            for host in self.hosts:
+                try:
+                    response = host.client.generate(
+                        model=model, prompt="Hi",
+                        options={'num_predict': 1, 'num_ctx': DEFAULT_NUM_CTX},
+                        keep_alive=self.keep_alive
+                    )
+                except Exception as e:
+                    if _is_model_missing(e):
+                        host.missing[model] = time.monotonic() + host.breaker.cooldown
+                    errors.append(f"{host.url}: {e}")
+                    continue
+                host.loaded[model] = time.monotonic() + keep_alive_seconds(self.keep_alive)
+                load_duration = response.get('load_duration')
+                loads.append(load_duration / 1e9 if load_duration is not None else 0.0)
+            if not loads:
+                raise ConnectionError("; ".join(errors))
+            return max(loads)
+
+        return timed_warmup(model, request)
+
+    def chat(self, prompt: Union[str, Messages],
+             profile: Optional[GenerationProfile] = None) -> str:
+        """Send a chat request, failing over to another host on errors."""
+        messages = to_messages(prompt)
+        tried = []
+        last_error: Optional[BaseException] = None
+        while True:
+            host = self._acquire(tried)
+            if host is None:
+                break
+            tried.append(host)
+            try:
+                response = host.client.chat(**self._request(messages, profile))
+            except Exception as e:
+                self._release(host, e)
+                last_error = e
+                if not _should_fail_over(e):
+                    break
+                continue
+            self._release(host)
+            self.usage.record_ollama(response)
+            return response['message']['content']
+        return self._give_up(last_error)
+
+    def stream(self, prompt: Union[str, Messages],
+               profile: Optional[GenerationProfile] = None) -> Iterator[str]:
+        """Stream a response; fails over only if the host fails before the first chunk."""
+        messages = to_messages(prompt)
+        tried = []
+        last_error: Optional[BaseException] = None
+        while True:
+            host = self._acquire(tried)
+            if host is None:
+                break
+            tried.append(host)
+            started = False
+            try:
+                for part in host.client.chat(**self._request(messages, profile), stream=True):
+                    content = part['message']['content']
+                    if content:
+                        started = True
+                        yield content
+                    if part.get('done'):
+                        self.usage.record_ollama(part)
+            except Exception as e:
+                self._release(host, e)
+                last_error = e
+                if started or not _should_fail_over(e):
+                    break
+                continue
+            except BaseException:
+                # Consumer stopped early (GeneratorExit); not the host's fault
+                self._release(host)
+                raise
+            self._release(host)
+            return
+        yield self._give_up(last_error)
+
+    async def achat(self, prompt: Union[str, Messages],
+                    profile: Optional[GenerationProfile] = None) -> str:
+        """Async chat with the same routing and failover."""
+        messages = to_messages(prompt)
+        tried = []
+        last_error: Optional[BaseException] = None
+        while True:
+            host = self._acquire(tried)
+            if host is None:
+                break
+            tried.append(host)
+            try:
+                response = await host.async_clients.get().chat(**self._request(messages, profile))
+            except Exception as e:
+                self._release(host, e)
+                last_error = e
+                if not _should_fail_over(e):
+                    break
+                continue
+            except BaseException:
+                self._release(host)
+                raise
+            self._release(host)
+            self.usage.record_ollama(response)
+            return response['message']['content']
+        return self._give_up(last_error)
+
+    async def astream(self, prompt: Union[str, Messages],
+                      profile: Optional[GenerationProfile] = None) -> AsyncIterator[str]:
+        """Async streaming with failover before the first chunk."""
+        messages = to_messages(prompt)
+        tried = []
+        last_error: Optional[BaseException] = None
+        while True:
+            host = self._acquire(tried)
+            if host is None:
+                break
+            tried.append(host)
+            started = False
+            try:
+                stream = await host.async_clients.get().chat(**self._request(messages, profile), stream=True)
+                async for part in stream:
+                    content = part['message']['content']
+                    if content:
+                        started = True
+                        yield content
+                    if part.get('done'):
+                        self.usage.record_ollama(part)
+            except Exception as e:
+                self._release(host, e)
+                last_error = e
+                if started or not _should_fail_over(e):
+                    break
+                continue
+            except BaseException:
+                self._release(host)
+                raise
+            self._release(host)
+            return
+        yield self._give_up(last_error)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-host routing state: in-flight, totals, breaker state, loaded models."""
+        with self._lock:
+            return {host.url: host.stats() for host in self.hosts}
+
+
+def _is_host_failure(error: BaseException) -> bool:
+    """Connection problems and 5xx mean the host is unhealthy; 4xx mean the request is bad."""
+    status = getattr(error, 'status_code', None)
+    if isinstance(status, int) and 0 < status < 500:
+        return False
+    return True
+
+
+def _is_model_missing(error: BaseException) -> bool:
+    """A 404 from Ollama means this host hasn't pulled the model."""
+    return getattr(error, 'status_code', None) == 404
+
+
+def _should_fail_over(error: BaseException) -> bool:
+    """Whether another host might answer the request this one couldn't."""
+    return _is_host_failure(error) or _is_model_missing(error)
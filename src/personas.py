@@ -1,8 +1,23 @@
 #src/personas.py
 
-"""Persona configurations for the wine sommelier."""
-from dataclasses import dataclass
-from typing import Optional
+"""Persona configurations for the wine sommelier.
+
+The personas below are built in. Set ``SOMMELIER_PERSONAS_DIR`` to add more
+(or override these) from a directory of ``<key>.json`` / ``<key>.yaml``
+files; see PersonaRegistry.
+"""
+import json
+import os
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from src.generation import GenerationProfile
+
+# Keeps the model from writing the next customer's turn itself
+STOP_AT_NEXT_TURN = ("\nCustomer ",)
 
 
 @dataclass
@@ -15,9 +30,11 @@ class PersonaConfig:
     context: str
     examples: Optional[str] = None
     tone_markers: Optional[str] = None
+    # Output cap, stop sequences and sampling; None uses the backend default profile
+    generation: Optional[GenerationProfile] = None
 
 
-PERSONAS = {
+BUILTIN_PERSONAS = {
     "professional": PersonaConfig(
         name="Professional Sommelier",
         role="You are a certified Master Sommelier with 20 years of experience.",
@@ -34,7 +51,8 @@ PERSONAS = {
         examples="""
         Example: "Good evening, [Name]. Your selection of [dish] is exquisite. 
         I would recommend a [wine] for its [characteristics] that complement [dish elements]..."
-        """
+        """,
+        generation=GenerationProfile(max_tokens=450, temperature=0.6, stop=STOP_AT_NEXT_TURN)
     ),
     
     "valley_girl": PersonaConfig(
@@ -50,7 +68,8 @@ PERSONAS = {
         6. Sassy sign-off
         """,
         context="You're the most popular bartender at the hottest wine bar in LA.",
-        tone_markers="Use 'like', 'totally', 'OMG', emojis, and be super enthusiastic!"
+        tone_markers="Use 'like', 'totally', 'OMG', emojis, and be super enthusiastic!",
+        generation=GenerationProfile(max_tokens=300, temperature=0.9, stop=STOP_AT_NEXT_TURN)
     ),
     
     "rick_sanchez": PersonaConfig(
@@ -66,7 +85,8 @@ PERSONAS = {
         6. Nihilistic conclusion
         """,
         context="You're only doing this job to fund interdimensional experiments.",
-        tone_markers="*burp*, use scientific jargon, be condescending, reference the multiverse"
+        tone_markers="*burp*, use scientific jargon, be condescending, reference the multiverse",
+        generation=GenerationProfile(max_tokens=300, temperature=0.9, stop=STOP_AT_NEXT_TURN)
     ), 
 
     "wine_loving_grandma": PersonaConfig(
@@ -96,7 +116,8 @@ PERSONAS = {
         Passive aggressive guilt trips, mentions how other grandchildren visit more often, 
         compares everything to her cooking, gossips about neighbors, references her 'stories' 
         (soap operas), drops hints about wanting great-grandchildren. Uses outdated wine 
-        terms like 'a nice blush wine' for rosé."""
+        terms like 'a nice blush wine' for rosé.""",
+        generation=GenerationProfile(max_tokens=400, temperature=0.8, stop=STOP_AT_NEXT_TURN)
     ),
 
     "yoga_teacher": PersonaConfig(
@@ -124,7 +145,8 @@ PERSONAS = {
         journey, practice, intention, sacred, mindful, conscious, universe, energy, 
         vibration, frequency. Drops Sanskrit terms like 'ahimsa' (non-violence) when 
         discussing organic wines. Relates everything to chakras, mercury retrograde, 
-        or moon phases. Passive-aggressively judges non-organic choices. Uses ✨🙏🕉️ emojis."""
+        or moon phases. Passive-aggressively judges non-organic choices. Uses ✨🙏🕉️ emojis.""",
+        generation=GenerationProfile(max_tokens=350, temperature=0.8, stop=STOP_AT_NEXT_TURN)
     ),
 
     "hogwarts_sommelier": PersonaConfig(
@@ -155,7 +177,210 @@ PERSONAS = {
         Uses phrases like: 'my detecting spells indicate', 'the ancient texts say', 
         'according to my divination', 'I sense magical properties'. Warns about wine 
         interactions with full moons or astronomical events. Suggests wand movements 
-        for proper wine swirling. Creates spell names like 'Vinus Revelio' or 'Fermentus Perfectus'."""
+        for proper wine swirling. Creates spell names like 'Vinus Revelio' or 'Fermentus Perfectus'.""",
+        generation=GenerationProfile(max_tokens=400, temperature=0.8, stop=STOP_AT_NEXT_TURN)
 ),
 
 }
+
+
+PERSONA_SUFFIXES = (".json", ".yaml", ".yml")
+
+
+class PersonaLoadError(KeyError):
+    """A persona file exists but could not be turned into a PersonaConfig."""
+
+
+def read_persona_file(path: Path) -> Dict[str, Any]:
+    """The raw mapping in a JSON or YAML persona file."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        data = json.loads(text)
+    else:
+        try:
+            # Optional; only needed when YAML persona files are used
+            import yaml
+        except ImportError:
+            raise ImportError(f"PyYAML is required to read {path.name} (pip install pyyaml)") from None
+        data = yaml.safe_load(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path.name} must contain a mapping of persona fields")
+    return data
+
+
+def persona_from_dict(data: Dict[str, Any], base: Optional[PersonaConfig] = None) -> PersonaConfig:
+    """Build a PersonaConfig from file fields, on top of ``base`` if given."""
+    values = {f.name: getattr(base, f.name) for f in fields(PersonaConfig)} if base else {}
+    data = {k: v for k, v in data.items() if k != "extends"}
+    generation = data.pop("generation", None)
+    values.update(data)
+    if isinstance(generation, dict):
+        inherited = vars(base.generation) if base is not None and base.generation else {}
+        merged = {**inherited, **generation}
+        if "stop" in merged:
+            merged["stop"] = tuple(merged["stop"])
+        values["generation"] = GenerationProfile(**merged)
+    elif generation is not None:
+        raise ValueError("generation must be a mapping of GenerationProfile fields")
+    return PersonaConfig(**values)
+
+
+class _Entry:
+    """One persona in the registry index; a file is parsed on first lookup."""
+    __slots__ = ("path", "version", "data", "config", "base", "error", "previous")
+
+    def __init__(self, path: Optional[Path] = None, version: Optional[Tuple[int, int]] = None,
+                 config: Optional[PersonaConfig] = None, previous: Optional[PersonaConfig] = None):
+        self.path = path
+        self.version = version
+        self.data: Optional[Dict[str, Any]] = None
+        self.config = config
+        # The config this one extends, to notice when the base changes
+        self.base: Optional[PersonaConfig] = None
+        self.error: Optional[str] = None
+        # Last good version, served if an edited file fails to parse
+        self.previous = previous
+
+
+class PersonaRegistry(Mapping):
+    """Read-only ``{key: PersonaConfig}`` over built-in personas plus a directory of files.
+
+    Each ``<key>.json`` / ``<key>.yaml`` file holds PersonaConfig fields,
+    with ``generation`` as a nested mapping. ``extends: <key>`` starts from
+    another persona, so a per-venue variant only lists what differs. Only
+    file names and modification times are read up front; a file is parsed
+    the first time its key is looked up, and lookups stay dict-speed.
+
+    ``refresh()`` rescans the directory and swaps in the new index with a
+    single assignment. Lookups never see a half-updated registry, and
+    requests that already hold a PersonaConfig keep using it. An edited
+    file that fails to parse leaves the previous version in place.
+
+    Iterating loads every listed persona and leaves out the ones that have
+    never loaded (their error is in ``errors``), so a bad file dropped into
+    the directory can't break code that lists personas and looks them up.
+    """
+
+    def __init__(self, builtin: Dict[str, PersonaConfig],
+                 directory: Optional[Union[str, Path]] = None):
+        self.builtin = dict(builtin)
+        self.directory = Path(directory) if directory else None
+        self.errors: Dict[str, str] = {}
+        self.reloads = 0
+        self._entries: Dict[str, _Entry] = {}
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.refresh()
+
+    def __getitem__(self, key: str) -> PersonaConfig:
+        entry = self._entries[key]
+        config = entry.config
+        if config is None or entry.base is not None:
+            # Not parsed yet, or derived from a persona that may have changed
+            config = self._resolve(key, entry, ())
+        return config
+
+    def __iter__(self) -> Iterator[str]:
+        for key, entry in list(self._entries.items()):
+            if entry.path is None or self._loads(key, entry):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        # Listed personas count even before (or without) loading their file
+        return key in self._entries
+
+    def _loads(self, key: str, entry: _Entry) -> bool:
+        try:
+            self._resolve(key, entry, ())
+        except PersonaLoadError:
+            return False
+        return True
+
+    def _resolve(self, key: str, entry: _Entry, seen: Tuple[str, ...]) -> PersonaConfig:
+        """Parse (or re-derive) a file persona, falling back to its last good version."""
+        if entry.path is None:
+            return entry.config
+        if key in seen:
+            raise PersonaLoadError(f"Persona {key!r} extends itself via {' -> '.join(seen)}")
+        if entry.data is None and entry.error is None:
+            try:
+                entry.data = read_persona_file(entry.path)
+            except Exception as e:
+                # Not re-read until the file changes and refresh() re-indexes it
+                entry.error = self.errors[key] = f"{type(e).__name__}: {e}"
+        if entry.data is not None:
+            try:
+                parent = entry.data.get("extends")
+                base = self._resolve(parent, self._entries[parent], seen + (key,)) if parent else None
+                if entry.config is None or base is not entry.base:
+                    entry.config, entry.base = persona_from_dict(entry.data, base), base
+                    self.errors.pop(key, None)
+                return entry.config
+            except Exception as e:
+                self.errors[key] = f"{type(e).__name__}: {e}"
+        fallback = entry.config or entry.previous
+        if fallback is None:
+            raise PersonaLoadError(f"Persona {key!r} could not be loaded: {self.errors.get(key)}")
+        return fallback
+
+    def refresh(self) -> bool:
+        """Rescan the directory; returns True if any persona was added, changed or removed."""
+        with self._refresh_lock:
+            entries = {key: _Entry(config=config) for key, config in self.builtin.items()}
+            if self.directory is not None and self.directory.is_dir():
+                for path in sorted(self.directory.iterdir()):
+                    if path.suffix.lower() not in PERSONA_SUFFIXES or path.name.startswith("."):
+                        continue
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue  # deleted mid-scan
+                    version = (stat.st_mtime_ns, stat.st_size)
+                    old = self._entries.get(path.stem)
+                    if old is not None and old.path == path and old.version == version:
+                        entries[path.stem] = old
+                        continue
+                    self.errors.pop(path.stem, None)
+                    previous = (old.config or old.previous) if old is not None else None
+                    entries[path.stem] = _Entry(path, version, previous=previous)
+            changed = (entries.keys() != self._entries.keys()
+                       or any(entry is not self._entries[key] and entry.path is not None
+                              for key, entry in entries.items()))
+            self._entries = entries
+            if changed:
+                self.reloads += 1
+            return changed
+
+    def watch(self, interval: float = 2.0) -> "PersonaRegistry":
+        """Rescan every ``interval`` seconds from a daemon thread."""
+        if self._watcher is None and self.directory is not None:
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), name="persona-watch", daemon=True
+            )
+            self._watcher.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except OSError as e:
+                self.errors["<directory>"] = str(e)
+
+
+# PERSONAS[key] works as before; with SOMMELIER_PERSONAS_DIR set it also
+# serves (and hot-reloads) the personas defined in that directory
+PERSONAS = PersonaRegistry(BUILTIN_PERSONAS, os.getenv("SOMMELIER_PERSONAS_DIR"))
+if PERSONAS.directory is not None and float(os.getenv("SOMMELIER_PERSONAS_RELOAD", "2")) > 0:
+    PERSONAS.watch(float(os.getenv("SOMMELIER_PERSONAS_RELOAD", "2")))
@@ -1,35 +1,132 @@
 """Prompt construction utilities."""
-from typing import Optional
+import functools
+import hashlib
+import re
+from typing import Dict, List, Optional, Union
+
+from src.generation import estimate_tokens
+
+# Bump whenever the system prompt layout changes so cached prompts/responses roll over
+TEMPLATE_VERSION = 3
+
+Messages = List[Dict[str, str]]
+
+# Rendered prompts kept per cache; hot-reloaded persona versions age out
+PROMPT_CACHE_SIZE = 256
+
+
+def to_messages(prompt: Union[str, Messages]) -> Messages:
+    """Normalize a plain prompt string or a message list to chat messages."""
+    if isinstance(prompt, str):
+        return [{'role': 'user', 'content': prompt}]
+    return list(prompt)
+
+
+# Numbered or bulleted lines keep their own line when prose is rejoined
+_LIST_ITEM = re.compile(r"^(\d+[.)]|[-*•])\s")
+
+
+def compact_text(text: Optional[str]) -> str:
+    """Collapse indentation and hard-wrapped lines, keeping list items and paragraphs.
+
+    Persona fields are indented triple-quoted blocks; sending them verbatim
+    spends prompt tokens on whitespace.
+    """
+    if not text:
+        return ""
+    lines: List[str] = []
+    for raw in text.strip().splitlines():
+        line = " ".join(raw.split())
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+        elif lines and lines[-1] and not _LIST_ITEM.match(line):
+            lines[-1] += " " + line
+        else:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _render_system(key: tuple) -> str:
+    _, include_examples, role, instruction, output_format, context, examples, tone_markers = key
+    # Compacted once here; every request for the persona reuses the result
+    sections = [f"{compact_text(role)}\n{compact_text(instruction)}".strip()]
+    if tone_markers:
+        sections.append(f"Tone: {compact_text(tone_markers)}")
+    sections.append(f"Output Format:\n{compact_text(output_format)}")
+    sections.append(f"Context:\n{compact_text(context)}")
+    if include_examples and examples:
+        sections.append(compact_text(examples))
+    return "\n\n".join(s for s in sections if s)
+
+
+@functools.lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _template_digest(system: str, generation) -> str:
+    template = f"{TEMPLATE_VERSION}\n{system}\n{generation!r}"
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _token_count(system: str) -> int:
+    return estimate_tokens(system)
+
 
 class PromptBuilder:
     """Build structured prompts from components."""
-    
-    @staticmethod
+
+    @classmethod
     def build(
+        cls,
         persona,  # We'll pass the persona object directly
         user_name: str,
         user_input: str,
         include_examples: bool = True
     ) -> str:
         """Construct a complete prompt from components."""
-        user_request = f"Customer {user_name} asks: {user_input}"
-        
-        examples_section = persona.examples if include_examples and hasattr(persona, 'examples') and persona.examples else ""
-        tone_section = f"\nTone: {persona.tone_markers}" if hasattr(persona, 'tone_markers') and persona.tone_markers else ""
-        
-        return f"""
-{persona.role}
-{persona.instruction}
-{tone_section}
-
-Output Format:
-{persona.output_format}
-
-Context:
-{persona.context}
-
-{examples_section}
-
-Current Request:
-{user_request}
-"""
+        return f"{cls.system_prompt(persona, include_examples)}\n\nCurrent Request:\n{cls.user_prompt(user_name, user_input)}"
+
+    @classmethod
+    def system_prompt(cls, persona, include_examples: bool = True) -> str:
+        """The persona preamble as a system message, built once per persona.
+
+        The text depends only on the persona and TEMPLATE_VERSION, so every
+        request for a persona sends byte-identical system content that the
+        backend can reuse as a cached prefix.
+        """
+        # Keyed on the text fields only: they are plain strings with cached
+        # hashes (astuple deep-copies, and hashing the generation profile
+        # runs dataclass code on every call)
+        key = (TEMPLATE_VERSION, include_examples, persona.role, persona.instruction,
+               persona.output_format, persona.context, persona.examples, persona.tone_markers)
+        return _render_system(key)
+
+    @staticmethod
+    def user_prompt(user_name: str, user_input: str) -> str:
+        """The per-request part of the prompt."""
+        return f"Customer {user_name} asks: {user_input}"
+
+    @classmethod
+    def build_messages(
+        cls,
+        persona,
+        user_name: str,
+        user_input: str,
+        include_examples: bool = True
+    ) -> Messages:
+        """Chat messages with the persona as a stable system prefix."""
+        return [
+            {'role': 'system', 'content': cls.system_prompt(persona, include_examples)},
+            {'role': 'user', 'content': cls.user_prompt(user_name, user_input)},
+        ]
+
+    @classmethod
+    def template_hash(cls, persona, include_examples: bool = True) -> str:
+        """Hash of the prompt template and generation settings for a persona, independent of the request."""
+        return _template_digest(cls.system_prompt(persona, include_examples),
+                                getattr(persona, 'generation', None))
+
+    @classmethod
+    def system_tokens(cls, persona, include_examples: bool = True) -> int:
+        """Estimated token count of a persona's system prompt, computed once."""
+        return _token_count(cls.system_prompt(persona, include_examples))
@@ -0,0 +1,360 @@
+"""Client-side rate limiting for the Groq API.
+
+Groq enforces a requests-per-minute and a tokens-per-minute budget per API
+key. Rather than sending requests until one comes back 429, every call
+first takes its share from two token buckets, waiting in a priority queue
+when either is empty. Interactive recommendations go to the front of the
+queue; compare and batch traffic runs at bulk priority:
+
+    with priority(BULK):
+        sommelier.compare_personas(...)
+
+A 429 that gets through anyway (another process shares the key) pauses
+the limiter for the server's ``retry-after`` and the call is retried, up
+to ``max_retries`` times.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from src.generation import DEFAULT_PROFILE, PROMPT_OVERHEAD_TOKENS, GenerationProfile, estimate_tokens
+from src.metrics import RATE_LIMIT_RETRIES, RATE_LIMIT_WAIT
+from src.resilience import backoff_delay
+
+T = TypeVar("T")
+
+# Lower runs first
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Groq free-tier limits for llama-3.1-8b-instant
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 6000
+
+_priority: ContextVar[int] = ContextVar("rate_limit_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Run the enclosed LLM calls (in this thread or task) at ``level``."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class RateLimitTimeout(RuntimeError):
+    """A request waited longer than ``max_wait`` for its turn."""
+
+
+class TokenBucket:
+    """Refills at ``per_minute / 60`` units a second, holding at most ``burst``.
+
+    The level may go negative when a request costs more than estimated;
+    later requests then wait for the debt to be paid off.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self._clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (anything above capacity waits for a full bucket)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return _status_code(error) == 429
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from ``retry-after(-ms)`` headers."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        try:
+            return max(0.0, float(headers.get(header)) / scale)
+        except (TypeError, ValueError):
+            # Missing, or an HTTP date we don't bother parsing
+            continue
+    return None
+
+
+def estimate_request_tokens(messages: List[dict],
+                            profile: Optional[GenerationProfile] = None) -> int:
+    """Tokens a chat request counts against the per-minute budget.
+
+    Groq charges the prompt plus ``max_tokens`` up front, so reserve both;
+    ``settle`` hands back what the completion didn't use.
+    """
+    prompt = sum(estimate_tokens(m.get("content") or "") for m in messages)
+    return prompt + PROMPT_OVERHEAD_TOKENS + (profile or DEFAULT_PROFILE).max_tokens
+
+
+class RateLimiter:
+    """Requests/min and tokens/min budgets shared by every client in the process.
+
+    Waiters queue by (priority, arrival); only the head of the queue may
+    take from the buckets, so a bulk request never takes capacity an
+    interactive one is waiting for. Threads wait on a condition and
+    coroutines on a future woken by the same events, so a cancelled
+    coroutine leaves the queue at once. A budget of None or 0 is not enforced.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: Optional[float] = DEFAULT_TOKENS_PER_MINUTE,
+                 max_retries: int = 3, max_wait: float = 120.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue: List[tuple] = []
+        # ticket -> (event loop, future) for coroutines waiting their turn
+        self._waiters: Dict[tuple, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._arrivals = itertools.count()
+        self._paused_until = 0.0
+        self.retries = 0
+
+    def _delay(self, tokens: int) -> float:
+        # Caller holds self._cond
+        delay = self._paused_until - self._clock()
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(tokens))
+        return delay
+
+    def _wake(self) -> None:
+        """Let every waiter re-check its turn; caller holds self._cond."""
+        self._cond.notify_all()
+        for loop, waker in self._waiters.values():
+            try:
+                loop.call_soon_threadsafe(_resolve, waker)
+            except RuntimeError:
+                # Loop already closed; its waiter is gone
+                pass
+
+    def _enqueue(self, level: int) -> tuple:
+        ticket = (level, next(self._arrivals))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            # A new head may be able to go now, or should make an old head wait
+            self._wake()
+        return ticket
+
+    def _leave(self, ticket: tuple) -> None:
+        # Caller holds self._cond
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+        self._wake()
+
+    def _turn(self, ticket: tuple, tokens: int, deadline: float) -> Optional[float]:
+        """Take the budget if it's ``ticket``'s turn (None), else seconds to wait.
+
+        Caller holds self._cond.
+        """
+        if self._queue[0] == ticket:
+            delay = self._delay(tokens)
+            if delay <= 0:
+                heapq.heappop(self._queue)
+                if self.requests is not None:
+                    self.requests.take(1)
+                if self.tokens is not None:
+                    self.tokens.take(tokens)
+                return None
+        else:
+            delay = None
+        remaining = deadline - self._clock()
+        if remaining <= 0 or (delay is not None and delay > remaining):
+            raise RateLimitTimeout(f"Waited over {self.max_wait:.0f}s for the Groq rate limit")
+        return remaining if delay is None else delay
+
+    def _waited(self, start: float, level: int) -> float:
+        waited = self._clock() - start
+        RATE_LIMIT_WAIT.observe(waited, priority=PRIORITY_NAMES.get(level, str(level)))
+        return waited
+
+    def acquire(self, tokens: int, level: Optional[int] = None) -> float:
+        """Block until this request may be sent; returns the seconds waited."""
+        level = current_priority() if level is None else level
+        start = self._clock()
+        deadline = start + self.max_wait
+        ticket = self._enqueue(level)
+        with self._cond:
+            try:
+                while True:
+                    wait = self._turn(ticket, tokens, deadline)
+                    if wait is None:
+                        break
+                    self._cond.wait(wait)
+            finally:
+                self._leave(ticket)
+        return self._waited(start, level)
+
+    async def aacquire(self, tokens: int, level: Optional[int] = None) -> float:
+        """Async ``acquire``: waits on the event loop, without a thread per waiter."""
+        level = current_priority() if level is None else level
+        loop = asyncio.get_running_loop()
+        start = self._clock()
+        deadline = start + self.max_wait
+        ticket = self._enqueue(level)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._turn(ticket, tokens, deadline)
+                    if wait is None:
+                        break
+                    waker = loop.create_future()
+                    self._waiters[ticket] = (loop, waker)
+                try:
+                    await asyncio.wait((waker,), timeout=wait)
+                finally:
+                    with self._cond:
+                        self._waiters.pop(ticket, None)
+        finally:
+            # Also runs on cancellation, so an abandoned ticket never takes budget later
+            with self._cond:
+                self._leave(ticket)
+        return self._waited(start, level)
+
+    def settle(self, reserved: int, used: Optional[int]) -> None:
+        """Return the part of a reservation the request didn't use (or charge the overrun)."""
+        if self.tokens is None or used is None:
+            return
+        with self._cond:
+            if used < reserved:
+                self.tokens.give(reserved - used)
+            else:
+                self.tokens.take(used - reserved)
+            self._wake()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for ``seconds``, e.g. after the server sent retry-after."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._wake()
+
+    def _retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to back off before retrying ``error``, or None to give up."""
+        if not is_rate_limited(error) or attempt >= self.max_retries:
+            return None
+        delay = retry_after(error)
+        if delay is None:
+            delay = backoff_delay(attempt, base=1.0, cap=30.0)
+        return delay if delay <= self.max_wait else None
+
+    def _retrying(self, error: BaseException, attempt: int, tokens: int, level: int) -> bool:
+        # Nothing was generated, so the tokens go back in the bucket
+        self.settle(tokens, 0)
+        delay = self._retry_delay(error, attempt)
+        if delay is None:
+            return False
+        with self._cond:
+            self.retries += 1
+        RATE_LIMIT_RETRIES.inc(priority=PRIORITY_NAMES.get(level, str(level)))
+        self.pause(delay)
+        return True
+
+    def call(self, fn: Callable[[], T], tokens: int, level: Optional[int] = None) -> T:
+        """Call ``fn`` once the budget allows, retrying 429s after their retry-after."""
+        level = current_priority() if level is None else level
+        for attempt in itertools.count():
+            self.acquire(tokens, level)
+            try:
+                return fn()
+            except Exception as e:
+                if not self._retrying(e, attempt, tokens, level):
+                    raise
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int,
+                    level: Optional[int] = None) -> T:
+        """Async version of ``call``; a cancelled caller gives up its place in the queue."""
+        level = current_priority() if level is None else level
+        for attempt in itertools.count():
+            await self.aacquire(tokens, level)
+            try:
+                return await fn()
+            except Exception as e:
+                if not self._retrying(e, attempt, tokens, level):
+                    raise
+
+
+def _resolve(waker: asyncio.Future) -> None:
+    if not waker.done():
+        waker.set_result(None)
+
+
+_default: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def _env_budget(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def groq_rate_limiter() -> RateLimiter:
+    """The process-wide limiter for the Groq API key.
+
+    Budgets come from ``GROQ_REQUESTS_PER_MINUTE`` and
+    ``GROQ_TOKENS_PER_MINUTE`` (0 turns a budget off).
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RateLimiter(
+                _env_budget("GROQ_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE),
+                _env_budget("GROQ_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE),
+            )
+        return _default
+
+
+def usage_tokens(usage: Any) -> Optional[int]:
+    """Total tokens from a Groq ``usage`` object, if it has one."""
+    if usage is None:
+        return None
+    total = getattr(usage, "total_tokens", None)
+    if total is None:
+        total = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+    return total
@@ -0,0 +1,246 @@
+"""Response caching for sommelier recommendations."""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace/punctuation so trivial variants share a key."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def make_cache_key(persona_key: str, model: str, temperature: float,
+                   template_hash: str, customer_name: str, dish: str) -> str:
+    """Stable cache key for one recommendation request."""
+    parts = {
+        "persona": persona_key,
+        "model": model,
+        "temperature": round(float(temperature), 3),
+        "template": template_hash,
+        "customer": normalize_text(customer_name),
+        "dish": normalize_text(dish),
+    }
+    raw = json.dumps(parts, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Base class for response caches; subclasses implement _get/_set."""
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._set(key, value)
+        with self._stats_lock:
+            self.writes += 1
+
+    def _evicted(self, count: int = 1) -> None:
+        with self._stats_lock:
+            self.evictions += count
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for monitoring."""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+
+class LRUCache(ResponseCache):
+    """In-memory least-recently-used cache with optional TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._evicted(evicted)
+
+
+class SQLiteCache(ResponseCache):
+    """On-disk cache that survives restarts, with TTL and size-based eviction.
+
+    Expired rows are dropped when read, or swept once the cache goes over
+    ``max_entries``; a running row count keeps writes under it from scanning.
+    """
+
+    def __init__(self, path: str = ".cache/responses.sqlite3",
+                 ttl: Optional[float] = 7 * 24 * 3600, max_entries: int = 100_000):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        evicted = 0
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE responses SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                (value, now, now, key)
+            ).rowcount
+            if not updated:
+                # OR REPLACE in case another process wrote the key in between
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self._count += 1
+                if self._count > self.max_entries:
+                    evicted = self._evict(now)
+            self._conn.commit()
+        if evicted:
+            self._evicted(evicted)
+
+    def _evict(self, now: float) -> int:
+        """Drop expired rows, then least recently used rows over max_entries."""
+        evicted = 0
+        if self.ttl is not None:
+            evicted += self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+            ).rowcount
+        if self._count - evicted > self.max_entries:
+            evicted += self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (self._count - evicted - self.max_entries,)
+            ).rowcount
+        self._count -= evicted
+        return evicted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache(ResponseCache):
+    """In-memory LRU in front of a persistent SQLite cache."""
+
+    def __init__(self, memory: Optional[LRUCache] = None, disk: Optional[SQLiteCache] = None):
+        super().__init__()
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk if disk is not None else SQLiteCache()
+
+    def _get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            # Promote so the next lookup skips the disk
+            self.memory.set(key, value)
+        return value
+
+    def _set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        stats["memory"] = self.memory.stats()
+        stats["disk"] = self.disk.stats()
+        return stats
@@ -0,0 +1,233 @@
+"""Near-duplicate dish lookup so similar requests can reuse a prior answer."""
+import re
+import threading
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+# Filler words that don't change what wine a dish calls for
+STOPWORDS = frozenset({
+    "a", "an", "and", "the", "with", "w", "of", "on", "in", "over", "some",
+    "served", "plus", "side", "my", "our", "i", "im", "am", "having", "for",
+})
+
+
+@dataclass
+class SemanticMatch:
+    """A stored recommendation whose dish is close enough to reuse."""
+    persona: Hashable
+    dish: str
+    response: str
+    score: float
+    query: str = ""
+
+
+class DishVectorizer:
+    """Hashed character n-gram vectors; local, deterministic and cheap."""
+
+    def __init__(self, dim: int = 256, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def tokens(self, text: str) -> List[str]:
+        """Content words of a dish description."""
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        return [w for w in words if w not in STOPWORDS]
+
+    def embed(self, text: str, tokens: Optional[List[str]] = None) -> np.ndarray:
+        """Unit-length vector for a dish description."""
+        n = self.ngram
+        indices = []
+        for token in tokens if tokens is not None else self.tokens(text):
+            padded = f" {token} "
+            grams = [padded[i:i + n] for i in range(max(1, len(padded) - n + 1))]
+            grams.append(padded)
+            indices.extend(zlib.crc32(g.encode("utf-8")) for g in grams)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not indices:
+            return vector
+        hashes = np.asarray(indices, dtype=np.uint32)
+        # The top bit picks a sign so hash collisions cancel instead of pile up
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dim, signs)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class _PersonaIndex:
+    """Vectors and a word-level inverted index for one persona."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((64, dim), dtype=np.float32)
+        self.size = 0
+        self.dishes: List[str] = []
+        self.responses: List[str] = []
+        self.postings: Dict[str, array] = {}
+        # Content words of every stored dish, to skip storing the same dish twice
+        self.seen = set()
+
+    def add(self, dish: str, response: str, tokens: List[str], vector: np.ndarray) -> bool:
+        """Store a dish; False if the same dish (ignoring filler words) is already there."""
+        signature = " ".join(tokens)
+        if signature in self.seen:
+            return False
+        self.seen.add(signature)
+        if self.size == len(self.vectors):
+            grown = np.zeros((len(self.vectors) * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            self.vectors = grown
+        row = self.size
+        self.vectors[row] = vector
+        self.dishes.append(dish)
+        self.responses.append(response)
+        for token in set(tokens):
+            self.postings.setdefault(token, array("q")).append(row)
+        self.size += 1
+        return True
+
+    def newest(self, keep: int, vectorizer: "DishVectorizer") -> "_PersonaIndex":
+        """A rebuilt index holding only the ``keep`` most recent entries."""
+        index = _PersonaIndex(self.vectors.shape[1])
+        for row in range(max(0, self.size - keep), self.size):
+            dish = self.dishes[row]
+            index.add(dish, self.responses[row], vectorizer.tokens(dish), self.vectors[row])
+        return index
+
+    def candidates(self, tokens: List[str], max_candidates: int) -> np.ndarray:
+        """Rows sharing words with the query, rarest words first.
+
+        When even the rarest word is too common, narrow down to rows that
+        share several of the query's words instead.
+        """
+        lists = sorted(
+            (np.frombuffer(self.postings[t], dtype=np.int64)
+             for t in set(tokens) if t in self.postings),
+            key=len
+        )
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        if len(lists[0]) > max_candidates:
+            rows = lists[0]
+            for other in lists[1:]:
+                rows = np.intersect1d(rows, other, assume_unique=True)
+                if len(rows) <= max_candidates:
+                    break
+            # Still too broad: the most recent entries are the likeliest repeats
+            return rows[-max_candidates:].copy()
+        chosen, total = [], 0
+        for rows in lists:
+            if chosen and total + len(rows) > max_candidates:
+                break
+            chosen.append(rows)
+            total += len(rows)
+        if len(chosen) == 1:
+            return chosen[0].copy()
+        return np.unique(np.concatenate(chosen))
+
+
+class SemanticIndex:
+    """Index of past (persona, dish) recommendations searched by cosine similarity.
+
+    ``persona`` is any hashable key; the sommelier passes the persona name
+    together with the model, temperature and prompt template hash, so an
+    answer is never reused across models or persona versions.
+
+    Candidate rows come from an inverted index over the dish's content words
+    (rarest first, capped at ``max_candidates``), so a lookup only scores a
+    small slice of the stored vectors even at 100k+ entries.
+
+    At most ``max_entries`` dishes are kept. Past that, the least recently
+    used persona key is dropped (typically a superseded persona version),
+    or, when only one is left, its oldest quarter.
+    """
+
+    def __init__(self, threshold: float = 0.85, dim: int = 256,
+                 max_candidates: int = 2048, audit_size: int = 1000,
+                 max_entries: int = 200_000):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.max_entries = max_entries
+        self.vectorizer = DishVectorizer(dim=dim)
+        self._indexes: "OrderedDict[Hashable, _PersonaIndex]" = OrderedDict()
+        self._size = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Recent reuses, so we can audit what was served in place of a fresh answer
+        self.reuse_log = deque(maxlen=audit_size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, persona: Hashable, dish: str, response: str) -> None:
+        """Store a recommendation for later reuse (a dish already stored is kept as is)."""
+        tokens = self.vectorizer.tokens(dish)
+        vector = self.vectorizer.embed(dish, tokens)
+        if not vector.any():
+            return
+        with self._lock:
+            index = self._indexes.get(persona)
+            if index is None:
+                index = self._indexes[persona] = _PersonaIndex(self.vectorizer.dim)
+            self._indexes.move_to_end(persona)
+            if index.add(dish, response, tokens, vector):
+                self._size += 1
+                if self._size > self.max_entries:
+                    self._evict()
+
+    def _evict(self) -> None:
+        # Caller holds self._lock
+        if len(self._indexes) > 1:
+            _, oldest = self._indexes.popitem(last=False)
+            removed = oldest.size
+        else:
+            persona, index = next(iter(self._indexes.items()))
+            kept = self._indexes[persona] = index.newest(self.max_entries * 3 // 4, self.vectorizer)
+            removed = index.size - kept.size
+        self._size -= removed
+        self.evictions += removed
+
+    def lookup(self, persona: Hashable, dish: str, threshold: Optional[float] = None) -> Optional[SemanticMatch]:
+        """Best stored match for this persona at or above the threshold."""
+        threshold = self.threshold if threshold is None else threshold
+        tokens = self.vectorizer.tokens(dish)
+        match = None
+        index = self._indexes.get(persona)
+        if index is not None and tokens:
+            vector = self.vectorizer.embed(dish, tokens)
+            with self._lock:
+                if persona in self._indexes:
+                    self._indexes.move_to_end(persona)
+                rows = index.candidates(tokens, self.max_candidates)
+                if len(rows):
+                    scores = index.vectors[rows] @ vector
+                    best = int(np.argmax(scores))
+                    score = float(scores[best])
+                    if score >= threshold:
+                        row = int(rows[best])
+                        match = SemanticMatch(
+                            persona, index.dishes[row], index.responses[row], score, dish
+                        )
+        with self._lock:
+            if match is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.reuse_log.append(match)
+        return match
+
+    def stats(self) -> Dict[str, float]:
+        """Reuse counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
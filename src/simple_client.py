@@ -1,17 +1,48 @@
 # src/simple_client.py
 import os
-import streamlit as st
+
+from src.config import fail, get_secret, report_error, report_info
+from src.generation import DEFAULT_NUM_CTX, WARMUP_PROFILE, groq_params, ollama_options
+from src.http_pool import DEFAULT_POOL_SIZE, LoopLocal, pool_limits
+from src.prompt_builder import to_messages
+from src.rate_limit import estimate_request_tokens, groq_rate_limiter, usage_tokens
+from src.usage import TokenUsage
+from src.warmup import DEFAULT_KEEP_ALIVE, timed_warmup
 
 class SimpleLLMClient:
-    def __init__(self, model="llama3.2"):
+    # Takes a per-request GenerationProfile (max tokens, stop, temperature, num_ctx)
+    accepts_generation_profile = True
+
+    def __init__(self, model="llama3.2", host=None, pool_size=DEFAULT_POOL_SIZE,
+                 keep_alive=DEFAULT_KEEP_ALIVE, rate_limiter=None):
         self.model = model
+        self.keep_alive = keep_alive
         self.is_cloud = os.getenv("STREAMLIT_CLOUD") == "true"
-        
+        self.pool_size = pool_size
+        self.usage = TokenUsage("groq" if self.is_cloud else "ollama", model)
+
         if self.is_cloud:
+            # Shared by every Groq client in the process unless one is passed in
+            self.rate_limiter = rate_limiter or groq_rate_limiter()
             try:
-                from groq import Groq
-                self.client = Groq(api_key=st.secrets["GROQ_API_KEY"])
-                
+                import httpx
+                from groq import AsyncGroq, Groq
+                api_key = get_secret("GROQ_API_KEY")
+                if not api_key:
+                    raise KeyError("GROQ_API_KEY is not configured")
+                # Reuse keep-alive connections across requests; 429s are
+                # retried by the rate limiter, not the SDK
+                self.client = Groq(
+                    api_key=api_key,
+                    max_retries=0,
+                    http_client=httpx.Client(limits=pool_limits(pool_size))
+                )
+                self._async_clients = LoopLocal(lambda: AsyncGroq(
+                    api_key=api_key,
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(limits=pool_limits(pool_size))
+                ))
+
                 # Only use WORKING Groq models (tested and confirmed)
                 self.model_map = {
                     "llama3.2": "llama-3.1-8b-instant",   # Fast model
@@ -22,32 +53,186 @@ class SimpleLLMClient:
                     "qwen": "llama-3.1-8b-instant"        # Default to Llama
                 }
                 self.groq_model = self.model_map.get(model, "llama-3.1-8b-instant")
-                st.sidebar.info(f"Using Groq model: {self.groq_model}")
+                self.usage.model = self.groq_model
+                report_info(f"Using Groq model: {self.groq_model}")
             except Exception as e:
-                st.error(f"Failed to initialize Groq: {str(e)}")
-                st.stop()
+                fail(f"Failed to initialize Groq: {str(e)}", e)
         else:
             import ollama
-            self.ollama = ollama
-    
-    def chat(self, prompt):
+            self.ollama = ollama.Client(host=host, limits=pool_limits(pool_size))
+            self._async_clients = LoopLocal(
+                lambda: ollama.AsyncClient(host=host, limits=pool_limits(pool_size))
+            )
+
+    def warm_up(self):
+        """Load the model (or open the Groq connection) with a one-token request."""
+        if self.is_cloud:
+            messages = [{"role": "user", "content": "Hi"}]
+            tokens = estimate_request_tokens(messages, WARMUP_PROFILE)
+
+            def request():
+                # Counts against the same budget as real requests
+                self.rate_limiter.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.groq_model,
+                        messages=messages,
+                        max_tokens=1
+                    ),
+                    tokens
+                )
+            return timed_warmup(self.groq_model, request)
+
+        def request():
+            response = self.ollama.generate(
+                model=self.model,
+                prompt="Hi",
+                # Same num_ctx as real requests, or the first one reloads the model
+                options={'num_predict': 1, 'num_ctx': DEFAULT_NUM_CTX},
+                keep_alive=self.keep_alive
+            )
+            load_duration = response.get('load_duration')
+            return load_duration / 1e9 if load_duration is not None else None
+        return timed_warmup(self.model, request)
+
+    def chat(self, prompt, profile=None):
         if self.is_cloud:
             try:
                 # Use Groq API with working model
-                response = self.client.chat.completions.create(
-                    model=self.groq_model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                    max_tokens=1000
+                messages = to_messages(prompt)
+                tokens = estimate_request_tokens(messages, profile)
+                response = self.rate_limiter.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.groq_model,
+                        messages=messages,
+                        **groq_params(profile)
+                    ),
+                    tokens
                 )
+                self.rate_limiter.settle(tokens, usage_tokens(response.usage))
+                self.usage.record_groq(response.usage)
                 return response.choices[0].message.content
             except Exception as e:
-                st.error(f"Groq API error: {str(e)}")
+                self.usage.record_error(e)
+                report_error(f"Groq API error: {str(e)}")
                 return "Sorry, I'm having trouble connecting. Please try again."
         else:
             # Use local Ollama
             response = self.ollama.chat(
                 model=self.model,
-                messages=[{'role': 'user', 'content': prompt}]
+                keep_alive=self.keep_alive,
+                messages=to_messages(prompt),
+                options=ollama_options(profile)
+            )
+            self.usage.record_ollama(response)
+            return response['message']['content']
+
+    def stream(self, prompt, profile=None):
+        if self.is_cloud:
+            try:
+                messages = to_messages(prompt)
+                tokens = estimate_request_tokens(messages, profile)
+                stream = self.rate_limiter.call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.groq_model,
+                        messages=messages,
+                        **groq_params(profile),
+                        stream=True
+                    ),
+                    tokens
+                )
+                for chunk in stream:
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        yield content
+                    if chunk.x_groq is not None and chunk.x_groq.usage is not None:
+                        self.rate_limiter.settle(tokens, usage_tokens(chunk.x_groq.usage))
+                        self.usage.record_groq(chunk.x_groq.usage)
+            except Exception as e:
+                self.usage.record_error(e)
+                report_error(f"Groq API error: {str(e)}")
+                yield "Sorry, I'm having trouble connecting. Please try again."
+        else:
+            for part in self.ollama.chat(
+                model=self.model,
+                keep_alive=self.keep_alive,
+                messages=to_messages(prompt),
+                options=ollama_options(profile),
+                stream=True
+            ):
+                content = part['message']['content']
+                if content:
+                    yield content
+                if part.get('done'):
+                    self.usage.record_ollama(part)
+
+    async def achat(self, prompt, profile=None):
+        client = self._async_clients.get()
+        if self.is_cloud:
+            try:
+                messages = to_messages(prompt)
+                tokens = estimate_request_tokens(messages, profile)
+                response = await self.rate_limiter.acall(
+                    lambda: client.chat.completions.create(
+                        model=self.groq_model,
+                        messages=messages,
+                        **groq_params(profile)
+                    ),
+                    tokens
+                )
+                self.rate_limiter.settle(tokens, usage_tokens(response.usage))
+                self.usage.record_groq(response.usage)
+                return response.choices[0].message.content
+            except Exception as e:
+                self.usage.record_error(e)
+                report_error(f"Groq API error: {str(e)}")
+                return "Sorry, I'm having trouble connecting. Please try again."
+        else:
+            response = await client.chat(
+                model=self.model,
+                keep_alive=self.keep_alive,
+                messages=to_messages(prompt),
+                options=ollama_options(profile)
+            )
+            self.usage.record_ollama(response)
+            return response['message']['content']
+
+    async def astream(self, prompt, profile=None):
+        client = self._async_clients.get()
+        if self.is_cloud:
+            try:
+                messages = to_messages(prompt)
+                tokens = estimate_request_tokens(messages, profile)
+                stream = await self.rate_limiter.acall(
+                    lambda: client.chat.completions.create(
+                        model=self.groq_model,
+                        messages=messages,
+                        **groq_params(profile),
+                        stream=True
+                    ),
+                    tokens
+                )
+                async for chunk in stream:
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        yield content
+                    if chunk.x_groq is not None and chunk.x_groq.usage is not None:
+                        self.rate_limiter.settle(tokens, usage_tokens(chunk.x_groq.usage))
+                        self.usage.record_groq(chunk.x_groq.usage)
+            except Exception as e:
+                self.usage.record_error(e)
+                report_error(f"Groq API error: {str(e)}")
+                yield "Sorry, I'm having trouble connecting. Please try again."
+        else:
+            stream = await client.chat(
+                model=self.model,
+                keep_alive=self.keep_alive,
+                messages=to_messages(prompt),
+                options=ollama_options(profile),
+                stream=True
             )
-            return response['message']['content']
\ No newline at end of file
+            async for part in stream:
+                content = part['message']['content']
+                if content:
+                    yield content
+                if part.get('done'):
+                    self.usage.record_ollama(part)
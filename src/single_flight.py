@@ -0,0 +1,128 @@
+"""Request coalescing: concurrent identical requests share one generation.
+
+The first caller for a key becomes the leader and produces the result; the
+others wait on the same Flight and read its text, or its chunks as they
+stream in. Waiters only ever read, so one of them giving up (closing its
+stream, being cancelled) never stops the generation the rest are waiting on.
+"""
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class Flight:
+    """One in-flight generation that any number of callers can wait on or stream."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._chunks: List[str] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+
+    def push(self, chunk: str) -> None:
+        with self._cond:
+            self._chunks.append(chunk)
+            self._cond.notify_all()
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """End the flight; only the first call counts."""
+        with self._cond:
+            if self._done:
+                return
+            self._done = True
+            self._error = error
+            self._cond.notify_all()
+
+    def stream(self) -> Iterator[str]:
+        """Every chunk from the start, then live ones until the generation ends."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self._chunks) and not self._done:
+                    self._cond.wait()
+                chunks = self._chunks[index:]
+                index += len(chunks)
+                finished = self._done and index >= len(self._chunks)
+                error = self._error
+            yield from chunks
+            if finished:
+                if error is not None:
+                    raise error
+                return
+
+    def result(self) -> str:
+        """Block until the generation ends and return its full text."""
+        with self._cond:
+            while not self._done:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+            return "".join(self._chunks)
+
+
+class SingleFlight:
+    """Registry of in-flight generations keyed by request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, Flight] = {}
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Task"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def join(self, key: Hashable) -> Tuple[Flight, bool]:
+        """The flight for ``key`` and whether the caller must produce it (is the leader)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self.leaders += 1
+            return flight, True
+
+    def finish(self, key: Hashable, flight: Flight, error: Optional[BaseException] = None) -> None:
+        """End a flight; later callers start a new one (or hit the cache)."""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.finish(error)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[str]]) -> Tuple[str, bool]:
+        """Await the shared task for ``key``, starting it if needed; returns (result, coalesced).
+
+        The task runs on its own, so cancelling one waiter leaves it running
+        for the others.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            coalesced = task is not None
+            if coalesced:
+                self.coalesced += 1
+            else:
+                task = self._tasks[task_key] = loop.create_task(factory())
+                task.add_done_callback(lambda t: self._forget(task_key, t))
+                self.leaders += 1
+        return await asyncio.shield(task), coalesced
+
+    def _forget(self, task_key, task) -> None:
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+        if not task.cancelled():
+            # Retrieve the exception so an unawaited failure isn't logged as lost
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights) + len(self._tasks),
+            }
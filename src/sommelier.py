@@ -1,76 +1,518 @@
 """Main sommelier system."""
+import asyncio
 import json
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
 from src.wine_api import WineDatabase
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 # Use absolute imports instead of relative
 from src.simple_client import SimpleLLMClient as LLMClient
 from src.personas import PERSONAS
+from src.config import get_secret
+from src.generation import (
+    DEFAULT_PROFILE, MAX_DISH_TOKENS, PROMPT_OVERHEAD_TOKENS, GenerationProfile, trim_to_tokens
+)
+from src.fused import fused_prompt, parse_fused_response
+from src.history import JSONLHistorySink, get_history_sink
+from src.metrics import REGISTRY, RequestMetrics
 from src.prompt_builder import PromptBuilder
+from src.rate_limit import BULK, priority
+from src.response_cache import ResponseCache, make_cache_key
+from src.single_flight import SingleFlight
+from src.varietals import VarietalMatch, get_matcher
+from src.warmup import WarmupReport
+
+if TYPE_CHECKING:
+    # NumPy-backed; only loaded by callers that build an index
+    from src.semantic_cache import SemanticIndex
+
+# Stands in for the customer's name in responses shared across customers
+CUSTOMER_SLOT = "[[customer]]"
+
+@dataclass
+class PersonaResult:
+    """Outcome of one persona's recommendation during a comparison."""
+    persona: str
+    response: str
+    elapsed: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class InvalidRequest(ValueError):
+    """A batch item that can't become a request, such as an unparseable input row.
+
+    Yielded in place of a request, it becomes that item's error result instead
+    of stopping the batch; ``tag`` is passed through like a request's.
+    """
+
+    def __init__(self, message: str, tag: Any = None):
+        super().__init__(message)
+        self.tag = tag
+
+
+@dataclass
+class RecommendationRequest:
+    """One item of a recommend_many batch."""
+    customer_name: str
+    dish_description: str
+    persona: str = "professional"
+    include_bottles: bool = False
+    save_response: bool = False
+    # Free-form caller bookkeeping (row id, index...), passed through untouched
+    tag: Any = None
+
+    @classmethod
+    def coerce(cls, item) -> "RecommendationRequest":
+        """Accept a RecommendationRequest, a dict, or a (name, dish[, persona]) tuple."""
+        if isinstance(item, cls):
+            return item
+        if isinstance(item, InvalidRequest):
+            raise item
+        if isinstance(item, dict):
+            return cls(
+                customer_name=item.get("customer_name", item.get("name", "Guest")),
+                dish_description=item.get("dish_description", item.get("dish", "")),
+                persona=item.get("persona") or "professional",
+                include_bottles=item.get("include_bottles", False),
+                save_response=item.get("save_response", False),
+                tag=item.get("tag"),
+            )
+        try:
+            return cls(*item)
+        except TypeError as e:
+            raise InvalidRequest(f"Can't make a request from {item!r}") from e
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one request in a recommend_many batch."""
+    index: int
+    request: RecommendationRequest
+    response: Optional[str]
+    latency: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class RecommendationStream:
+    """Iterable of response chunks that records latency as it is consumed.
+
+    ``time_to_first_token`` and ``total_latency`` (seconds) are filled in
+    while iterating; ``text`` holds everything streamed so far.
+    """
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._parts: List[str] = []
+        self.time_to_first_token: Optional[float] = None
+        self.total_latency: Optional[float] = None
+
+    def __iter__(self) -> Iterator[str]:
+        start = time.perf_counter()
+        for chunk in self._chunks:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - start
+            self._parts.append(chunk)
+            yield chunk
+        self.total_latency = time.perf_counter() - start
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
 
 class WineSommelier:
-    def __init__(self, llm_client=None):
+    def __init__(self, llm_client=None, cache: Optional[ResponseCache] = None,
+                 semantic_index: Optional["SemanticIndex"] = None, warm_up: bool = False,
+                 history_size: int = 1000, history_sink: Optional[JSONLHistorySink] = None,
+                 wine_db: Optional[WineDatabase] = None, prompt_builder: Optional[PromptBuilder] = None):
         if llm_client is None:
             from src.simple_client import SimpleLLMClient
             llm_client = SimpleLLMClient()
         self.llm = llm_client
-        self.prompt_builder = PromptBuilder()
-        self.wine_db = WineDatabase()
-        self.conversation_history = []
+        # Both are stateless and safe to share between sommeliers
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.wine_db = wine_db or WineDatabase()
+        # Recent interactions only; the full record goes to the history sink
+        self.conversation_history = deque(maxlen=history_size)
+        if history_sink is None and get_secret("SOMMELIER_HISTORY_DIR"):
+            # Shared by every sommelier (e.g. one per Streamlit session) writing there
+            history_sink = get_history_sink(get_secret("SOMMELIER_HISTORY_DIR"))
+        self.history_sink = history_sink
+        self.cache = cache
+        self.semantic_index = semantic_index
+        self.warmup_report: Optional[WarmupReport] = None
+        # Identical concurrent requests share one generation
+        self.single_flight = SingleFlight()
+        # Bound metric series per (persona, model), so requests skip label checks
+        self._request_metrics: Dict[Tuple[str, str], RequestMetrics] = {}
+        if warm_up:
+            self.warm_up()
     
-    def recommend(self, customer_name, dish_description, persona, save_response=True, include_bottles=False):
-        """Generate wine recommendation for a given dish and persona"""
+    def warm_up(self) -> Optional[WarmupReport]:
+        """Preload the backend model so the first customer doesn't pay the load time."""
+        if hasattr(self.llm, 'warm_up'):
+            self.warmup_report = self.llm.warm_up()
+        return self.warmup_report
+
+    def recommend(self, customer_name, dish_description, persona, save_response=True, include_bottles=False,
+                  use_cache=True, refresh_cache=False):
+        """Generate wine recommendation for a given dish and persona
+
+        With a cache configured, ``use_cache=False`` bypasses it entirely and
+        ``refresh_cache=True`` skips the lookup but stores the fresh response.
+        """
         
         # Store the original persona string for saving
         persona_key = persona if isinstance(persona, str) else persona
+        metrics = self._metrics_for(persona)
         
-        # Get the persona object if a string key was passed
-        if isinstance(persona, str):
-            persona_obj = PERSONAS[persona]
-        else:
-            persona_obj = persona
+        with metrics.prompt_build.time():
+            prompt = self._build_prompt(customer_name, dish_description, persona)
         
-        # Pass the persona object to prompt_builder
-        prompt = self.prompt_builder.build(
-            persona_obj,
-            customer_name,
-            dish_description
+        cache_key, response = self._cached_response(
+            customer_name, dish_description, persona, use_cache, refresh_cache
         )
-        
-        response = self.llm.chat(prompt)
+        if response is None:
+            response = self._generate(
+                prompt, metrics, customer_name, dish_description, persona, cache_key, use_cache
+            )
+        else:
+            metrics.from_cache.inc()
         
         # Only add bottle recommendations if requested
         if include_bottles and hasattr(self, 'wine_db'):
-            wine_type = self._extract_wine_type(response)
-            if wine_type:
-                bottles = self.wine_db.search_wines(wine_type, dish_description)
-                if bottles:
-                    bottle_text = self.wine_db.format_bottle_recommendations(bottles)
-                    response += "\n\n---\n\n" + bottle_text
+            response += self._bottle_appendix(response, dish_description, metrics)
         
         if save_response:
             # Use the string key for saving, not the object
-            self._save_interaction(customer_name, dish_description, persona_key, response)
+            self.save_interaction(customer_name, dish_description, persona_key, response)
         
         return response
 
-    def _extract_wine_type(self, text: str) -> str:
-        """Extract the wine type from the recommendation text"""
-        wine_types = [
-            "Cabernet Sauvignon", "Merlot", "Pinot Noir", "Syrah", "Malbec",
-            "Chardonnay", "Sauvignon Blanc", "Pinot Grigio", "Riesling",
-            "Rosé", "Prosecco", "Champagne", "Chianti", "Bordeaux"
-        ]
+    async def arecommend(self, customer_name, dish_description, persona, save_response=True, include_bottles=False,
+                         use_cache=True, refresh_cache=False):
+        """Async version of recommend that keeps many requests in flight."""
+        persona_key = persona if isinstance(persona, str) else persona
+        metrics = self._metrics_for(persona)
+        
+        with metrics.prompt_build.time():
+            prompt = self._build_prompt(customer_name, dish_description, persona)
+        
+        cache_key, response = self._cached_response(
+            customer_name, dish_description, persona, use_cache, refresh_cache
+        )
+        if response is None:
+            async def generate() -> str:
+                llm_kwargs = self._llm_kwargs(persona)
+                with metrics.llm_call():
+                    if hasattr(self.llm, 'achat'):
+                        text = await self.llm.achat(prompt, **llm_kwargs)
+                    else:
+                        # Blocking-only clients still work, just on a worker thread
+                        text = await asyncio.to_thread(self.llm.chat, prompt, **llm_kwargs)
+                self._count_response(text, metrics)
+                if use_cache:
+                    self._store_response(cache_key, customer_name, dish_description, persona, text)
+                return text
+
+            key = self._flight_key(cache_key, customer_name, dish_description, persona)
+            response, coalesced = await self.single_flight.run(key, generate)
+            if coalesced:
+                metrics.coalesced.inc()
+        else:
+            metrics.from_cache.inc()
+        
+        if include_bottles and hasattr(self, 'wine_db'):
+            response += await asyncio.to_thread(self._bottle_appendix, response, dish_description, metrics)
+        
+        if save_response:
+            self.save_interaction(customer_name, dish_description, persona_key, response)
+        
+        return response
+
+    def recommend_stream(self, customer_name, dish_description, persona, save_response=True,
+                         include_bottles=False, use_cache=True, refresh_cache=False) -> RecommendationStream:
+        """Like recommend, but yields the response text as the LLM generates it.
+
+        Caching, the bottle appendix and history saving happen once the LLM
+        stream ends.
+        """
+        return RecommendationStream(self._stream_chunks(
+            customer_name, dish_description, persona, save_response,
+            include_bottles, use_cache, refresh_cache
+        ))
+
+    def _stream_chunks(self, customer_name, dish_description, persona, save_response,
+                       include_bottles, use_cache, refresh_cache) -> Iterator[str]:
+        persona_key = persona if isinstance(persona, str) else persona
+        metrics = self._metrics_for(persona)
+        
+        with metrics.prompt_build.time():
+            prompt = self._build_prompt(customer_name, dish_description, persona)
+        
+        cache_key, response = self._cached_response(
+            customer_name, dish_description, persona, use_cache, refresh_cache
+        )
+        if response is not None:
+            metrics.from_cache.inc()
+            yield response
+        else:
+            key = self._flight_key(cache_key, customer_name, dish_description, persona)
+            flight, leader = self.single_flight.join(key)
+            if leader:
+                # Generate on a thread of its own so the stream keeps going for
+                # other waiters even if this caller stops reading
+                threading.Thread(
+                    target=self._produce_stream,
+                    args=(key, flight, prompt, metrics, customer_name, dish_description,
+                          persona, cache_key, use_cache),
+                    name="stream-flight",
+                    daemon=True,
+                ).start()
+            else:
+                metrics.coalesced.inc()
+            parts = []
+            for chunk in flight.stream():
+                parts.append(chunk)
+                yield chunk
+            response = "".join(parts)
+        
+        if include_bottles and hasattr(self, 'wine_db'):
+            appendix = self._bottle_appendix(response, dish_description, metrics)
+            if appendix:
+                response += appendix
+                yield appendix
         
-        text_lower = text.lower()
-        for wine in wine_types:
-            if wine.lower() in text_lower:
-                return wine
+        if save_response:
+            self.save_interaction(customer_name, dish_description, persona_key, response)
+
+    def _generate(self, prompt, metrics, customer_name, dish_description, persona, cache_key, use_cache) -> str:
+        """Call the LLM, or wait for an identical request already in flight."""
+        key = self._flight_key(cache_key, customer_name, dish_description, persona)
+        flight, leader = self.single_flight.join(key)
+        if not leader:
+            metrics.coalesced.inc()
+            return flight.result()
+        try:
+            with metrics.llm_call():
+                response = self.llm.chat(prompt, **self._llm_kwargs(persona))
+            self._count_response(response, metrics)
+            if use_cache:
+                # Stored before the flight ends, so later callers hit the cache
+                self._store_response(cache_key, customer_name, dish_description, persona, response)
+            flight.push(response)
+        except BaseException as e:
+            self.single_flight.finish(key, flight, e)
+            raise
+        self.single_flight.finish(key, flight)
+        return response
+
+    def _produce_stream(self, key, flight, prompt, metrics, customer_name, dish_description,
+                        persona, cache_key, use_cache) -> None:
+        """Stream the LLM response into a shared flight."""
+        try:
+            parts = []
+            llm_kwargs = self._llm_kwargs(persona)
+            with metrics.llm_call():
+                if hasattr(self.llm, 'stream'):
+                    for chunk in self.llm.stream(prompt, **llm_kwargs):
+                        parts.append(chunk)
+                        flight.push(chunk)
+                else:
+                    parts.append(self.llm.chat(prompt, **llm_kwargs))
+                    flight.push(parts[-1])
+            response = "".join(parts)
+            self._count_response(response, metrics)
+            if use_cache:
+                self._store_response(cache_key, customer_name, dish_description, persona, response)
+        except BaseException as e:
+            self.single_flight.finish(key, flight, e)
+            return
+        self.single_flight.finish(key, flight)
+
+    def _cached_response(self, customer_name, dish_description, persona, use_cache, refresh_cache):
+        """Look up (cache_key, response) in the exact cache, then the semantic index."""
+        if not use_cache:
+            return None, None
+        cache_key = self._cache_key(customer_name, dish_description, persona)
+        if refresh_cache:
+            return cache_key, None
+        if cache_key:
+            response = self.cache.get(cache_key)
+            if response is not None:
+                return cache_key, response
+        if self.semantic_index is not None:
+            match = self.semantic_index.lookup(self._semantic_key(persona), dish_description)
+            if match is not None:
+                return cache_key, match.response.replace(CUSTOMER_SLOT, customer_name)
+        return cache_key, None
+
+    def _store_response(self, cache_key, customer_name, dish_description, persona, response):
+        """Remember a fresh LLM response in the configured caches."""
+        if self.is_error_response(response):
+            return
+        if cache_key:
+            self.cache.set(cache_key, response)
+        if self.semantic_index is not None:
+            self.semantic_index.add(
+                self._semantic_key(persona), dish_description, self._response_template(response, customer_name)
+            )
+
+    @staticmethod
+    def _response_template(response: str, customer_name: str) -> str:
+        """The response with the customer's name, as a whole word, replaced by CUSTOMER_SLOT.
+
+        "Al" must not turn "Alsace" into a slot, so only standalone
+        occurrences count.
+        """
+        name = customer_name.strip()
+        if not name:
+            return response
+        return re.sub(rf"(?<!\w){re.escape(name)}(?!\w)", CUSTOMER_SLOT, response)
+
+    def _semantic_key(self, persona) -> Tuple:
+        """Semantic index key: the exact cache key's parts, minus customer and dish."""
+        persona_obj = PERSONAS[persona] if isinstance(persona, str) else persona
+        persona_key = persona if isinstance(persona, str) else persona_obj.name
+        return (
+            persona_key,
+            self._model_name(),
+            round(float(self._generation_profile(persona_obj).temperature), 3),
+            self.prompt_builder.template_hash(persona_obj),
+        )
+
+    def _flight_key(self, cache_key, customer_name, dish_description, persona):
+        """Key under which identical concurrent requests are coalesced."""
+        if cache_key:
+            return cache_key
+        # No cache: the raw request is cheaper to build than a hashed key
+        persona_key = persona if isinstance(persona, str) else (
+            persona.name, self.prompt_builder.template_hash(persona)
+        )
+        return (persona_key, self._model_name(), customer_name, dish_description)
+
+    def _model_name(self) -> str:
+        return getattr(self.llm, 'groq_model', None) or getattr(self.llm, 'model', type(self.llm).__name__)
+
+    @staticmethod
+    def _generation_profile(persona) -> GenerationProfile:
+        persona_obj = PERSONAS[persona] if isinstance(persona, str) else persona
+        return getattr(persona_obj, 'generation', None) or DEFAULT_PROFILE
+
+    def _llm_kwargs(self, persona) -> Dict[str, Any]:
+        """Per-persona generation settings, for clients that take them."""
+        if getattr(self.llm, 'accepts_generation_profile', False):
+            return {"profile": self._generation_profile(persona)}
+        return {}
+
+    def _metrics_for(self, persona) -> RequestMetrics:
+        key = (persona if isinstance(persona, str) else persona.name, self._model_name())
+        metrics = self._request_metrics.get(key)
+        if metrics is None:
+            metrics = self._request_metrics[key] = RequestMetrics(*key)
+        return metrics
+
+    def _count_response(self, response: str, metrics: RequestMetrics) -> None:
+        metrics.from_llm.inc()
+        if self.is_error_response(response):
+            metrics.errors.inc()
+
+    def metrics(self) -> Dict[str, Dict[str, object]]:
+        """Snapshot of the process-wide metrics registry."""
+        return REGISTRY.snapshot()
+
+    def _cache_key(self, customer_name, dish_description, persona) -> Optional[str]:
+        """Cache key for a request, or None when no cache is configured."""
+        if self.cache is None:
+            return None
+        persona_obj = PERSONAS[persona] if isinstance(persona, str) else persona
+        persona_key = persona if isinstance(persona, str) else persona_obj.name
+        return make_cache_key(
+            persona_key,
+            self._model_name(),
+            self._generation_profile(persona_obj).temperature,
+            self.prompt_builder.template_hash(persona_obj),
+            customer_name,
+            dish_description
+        )
+
+    @staticmethod
+    def is_error_response(response: str) -> bool:
+        """The clients turn failures into friendly text; never cache those."""
+        return response.startswith("Error:") or "having trouble connecting" in response
+
+    def token_usage(self) -> Dict[str, Any]:
+        """Prompt/completion token totals reported by the backend, if it tracks them."""
+        usage = getattr(self.llm, 'usage', None)
+        return usage.snapshot() if usage is not None else {}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the response caches (empty if disabled)."""
+        stats = self.cache.stats() if self.cache is not None else {}
+        if self.semantic_index is not None:
+            stats = dict(stats, semantic=self.semantic_index.stats())
+        return stats
+
+    def _build_prompt(self, customer_name, dish_description, persona) -> List[Dict[str, str]]:
+        """Build the LLM prompt for a persona key or PersonaConfig."""
+        # Get the persona object if a string key was passed
+        if isinstance(persona, str):
+            persona_obj = PERSONAS[persona]
+        else:
+            persona_obj = persona
         
-        return None
+        # Persona goes in a cached system message, the request in the user turn
+        return self.prompt_builder.build_messages(
+            persona_obj,
+            customer_name,
+            self._fit_dish(persona_obj, dish_description)
+        )
+
+    def _fit_dish(self, persona_obj, dish_description: str) -> str:
+        """Trim a dish description too long for the prompt, leaving room for the reply."""
+        profile = self._generation_profile(persona_obj)
+        budget = (profile.num_ctx - profile.max_tokens - PROMPT_OVERHEAD_TOKENS
+                  - self.prompt_builder.system_tokens(persona_obj))
+        return trim_to_tokens(dish_description, min(MAX_DISH_TOKENS, budget))
+
+    def _bottle_appendix(self, response: str, dish_description: str,
+                         metrics: Optional[RequestMetrics] = None) -> str:
+        """Specific bottle suggestions for the wine named in a response."""
+        metrics = metrics or self._metrics_for("unknown")
+        with metrics.varietal_extraction.time():
+            wine_type = self._extract_wine_type(response)
+        if wine_type:
+            with metrics.bottle_lookup.time():
+                bottles = self.wine_db.search_wines(wine_type, dish_description)
+                bottle_text = self.wine_db.format_bottle_recommendations(bottles) if bottles else ""
+            if bottle_text:
+                return "\n\n---\n\n" + bottle_text
+        return ""
+
+    def _extract_wine_type(self, text: str) -> Optional[str]:
+        """Canonical varietal of the first wine named in the recommendation text"""
+        match = get_matcher().first(text)
+        return match.varietal if match else None
+
+    def mentioned_wines(self, text: str) -> List[VarietalMatch]:
+        """Every wine named in a response, with offsets and canonical varietal."""
+        return get_matcher().find_all(text)
     
-    def _save_interaction(self, name: str, dish: str, persona: str, response: str):
+    def save_interaction(self, name: str, dish: str, persona: str, response: str):
         """Save interaction to history."""
         interaction = {
             "timestamp": datetime.now().isoformat(),
@@ -80,16 +522,251 @@ class WineSommelier:
             "response": response
         }
         self.conversation_history.append(interaction)
+        if self.history_sink is not None:
+            self.history_sink.write(interaction)
     
-    def compare_personas(self, customer_name: str, dish: str) -> Dict[str, str]:
-        """Get recommendations from all personas for comparison."""
-        results = {}
-        for persona_name in PERSONAS.keys():
-            results[persona_name] = self.recommend(
-                customer_name, 
-                dish, 
-                persona_name,  # Pass the string key
-                save_response=False, 
-                include_bottles=False
+    def compare_personas(
+        self,
+        customer_name: str,
+        dish: str,
+        personas: Optional[Sequence[str]] = None,
+        max_workers: int = 6,
+        timeout: Optional[float] = 60.0,
+        mode: str = "fanout",
+    ) -> Dict[str, str]:
+        """Get recommendations from all personas for comparison.
+
+        Personas run concurrently; results come back in PERSONAS order. A
+        persona that fails or exceeds ``timeout`` gets an error message instead
+        of blocking the others. ``mode="fused"`` asks for every persona in a
+        single LLM call (see iter_compare_personas).
+        """
+        keys = list(personas) if personas is not None else list(PERSONAS.keys())
+        results = {
+            result.persona: result.response
+            for result in self.iter_compare_personas(
+                customer_name, dish, keys, max_workers=max_workers, timeout=timeout, mode=mode
             )
-        return results
\ No newline at end of file
+        }
+        return {key: results[key] for key in keys}
+
+    def iter_compare_personas(
+        self,
+        customer_name: str,
+        dish: str,
+        personas: Optional[Sequence[str]] = None,
+        max_workers: int = 6,
+        timeout: Optional[float] = 60.0,
+        refresh_cache: bool = False,
+        mode: str = "fanout",
+    ) -> Iterator[PersonaResult]:
+        """Yield a PersonaResult for each persona as soon as it finishes.
+
+        At most ``max_workers`` personas are generated at once. ``timeout`` is
+        measured per persona from the moment its generation starts.
+        ``refresh_cache=True`` regenerates instead of reusing cached responses.
+
+        ``mode="fanout"`` makes one LLM call per persona. ``mode="fused"``
+        makes a single call for all of them and falls back to per-persona
+        calls only for personas missing from its reply. The fused call
+        bypasses the response cache, and ``timeout`` applies to the
+        fallback calls.
+        """
+        if mode not in ("fanout", "fused"):
+            raise ValueError(f"Unknown compare mode {mode!r}; use 'fanout' or 'fused'")
+        keys = list(personas) if personas is not None else list(PERSONAS.keys())
+        if not keys:
+            return
+        if mode == "fused" and len(keys) > 1:
+            parsed, elapsed = self._fused_compare(customer_name, dish, keys)
+            for key in keys:
+                if key in parsed:
+                    yield PersonaResult(key, parsed[key], elapsed)
+            keys = [key for key in keys if key not in parsed]
+            if not keys:
+                return
+        started: Dict[str, float] = {}
+
+        def run(key: str) -> str:
+            started[key] = time.perf_counter()
+            # Queued behind single recommendations by a rate-limited backend
+            with priority(BULK):
+                return self.recommend(
+                    customer_name,
+                    dish,
+                    key,  # Pass the string key
+                    save_response=False,
+                    include_bottles=False,
+                    refresh_cache=refresh_cache
+                )
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(keys))),
+            thread_name_prefix="compare-persona",
+        )
+        try:
+            pending = {executor.submit(run, key): key for key in keys}
+            while pending:
+                done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    elapsed = time.perf_counter() - started.get(key, time.perf_counter())
+                    try:
+                        yield PersonaResult(key, future.result(), elapsed)
+                    except Exception as e:
+                        message = f"Error: {str(e)}"
+                        yield PersonaResult(key, message, elapsed, error=message)
+                if timeout is None:
+                    continue
+                now = time.perf_counter()
+                for future, key in list(pending.items()):
+                    if key in started and now - started[key] > timeout:
+                        del pending[future]
+                        future.cancel()
+                        message = f"Error: {PERSONAS[key].name} timed out after {timeout:g}s"
+                        yield PersonaResult(key, message, now - started[key], error=message)
+        finally:
+            # Don't wait for stragglers that already timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fused_compare(self, customer_name: str, dish: str, keys: List[str]) -> Tuple[Dict[str, str], float]:
+        """One LLM call answering as every persona in ``keys``; returns (parsed replies, seconds)."""
+        start = time.perf_counter()
+        metrics = self._metrics_for("fused")
+        with metrics.prompt_build.time():
+            prompt, profile = fused_prompt({key: PERSONAS[key] for key in keys}, customer_name, dish)
+        kwargs = {"profile": profile} if getattr(self.llm, 'accepts_generation_profile', False) else {}
+        try:
+            with metrics.llm_call(), priority(BULK):
+                response = self.llm.chat(prompt, **kwargs)
+        except Exception:
+            # Every persona falls back to its own call
+            return {}, time.perf_counter() - start
+        self._count_response(response, metrics)
+        parsed = {} if self.is_error_response(response) else parse_fused_response(response, keys)
+        return parsed, time.perf_counter() - start
+
+    async def acompare_personas(
+        self,
+        customer_name: str,
+        dish: str,
+        personas: Optional[Sequence[str]] = None,
+        max_concurrency: int = 6,
+        timeout: Optional[float] = 60.0,
+    ) -> Dict[str, str]:
+        """Async version of compare_personas; results come back in PERSONAS order."""
+        keys = list(personas) if personas is not None else list(PERSONAS.keys())
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(key: str) -> str:
+            async with semaphore:
+                try:
+                    with priority(BULK):
+                        return await asyncio.wait_for(
+                            self.arecommend(customer_name, dish, key,
+                                            save_response=False, include_bottles=False),
+                            timeout
+                        )
+                except asyncio.TimeoutError:
+                    return f"Error: {PERSONAS[key].name} timed out after {timeout:g}s"
+                except Exception as e:
+                    return f"Error: {str(e)}"
+
+        responses = await asyncio.gather(*(run(key) for key in keys))
+        return dict(zip(keys, responses))
+
+    def recommend_many(
+        self,
+        requests: Iterable[Union[RecommendationRequest, dict, tuple]],
+        max_concurrency: int = 8,
+        return_exceptions: bool = False,
+    ) -> List[Union[str, BaseException]]:
+        """Run many recommendations concurrently; responses come back in input order.
+
+        With ``return_exceptions=True`` a failed request yields its exception in
+        place of a response; otherwise the first failure is raised.
+        """
+        results: Dict[int, Union[str, BaseException]] = {}
+        for result in self.iter_recommend_many(requests, max_concurrency, return_exceptions=True):
+            if result.error is not None and not return_exceptions:
+                raise result.error
+            results[result.index] = result.error if result.error is not None else result.response
+        return [results[i] for i in range(len(results))]
+
+    def iter_recommend_many(
+        self,
+        requests: Iterable[Union[RecommendationRequest, dict, tuple]],
+        max_concurrency: int = 8,
+        return_exceptions: bool = False,
+        ordered: bool = False,
+    ) -> Iterator[BatchResult]:
+        """Yield a BatchResult per request, as each completes (or in input order).
+
+        ``requests`` is consumed lazily: a new request is only pulled once one
+        of the ``max_concurrency`` slots frees up and the caller has taken the
+        previous result, so a generator of millions of requests is never
+        materialized and a slow consumer throttles the producer. Every request
+        shares this sommelier's client and its connection pool. An item that
+        can't be read or turned into a request becomes its own error result.
+        """
+        max_concurrency = max(1, max_concurrency)
+        source = iter(requests)
+
+        def run(index: int, request: RecommendationRequest) -> BatchResult:
+            start = time.perf_counter()
+            try:
+                if isinstance(request.persona, str) and request.persona not in PERSONAS:
+                    raise KeyError(f"Unknown persona: {request.persona}")
+                if not request.dish_description.strip():
+                    raise ValueError("Request has no dish description")
+                with priority(BULK):
+                    response = self.recommend(
+                        request.customer_name,
+                        request.dish_description,
+                        request.persona,
+                        save_response=request.save_response,
+                        include_bottles=request.include_bottles
+                    )
+                return BatchResult(index, request, response, time.perf_counter() - start)
+            except Exception as e:
+                return BatchResult(index, request, None, time.perf_counter() - start, error=e)
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="recommend-many")
+        in_flight = deque()
+        next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < max_concurrency:
+                    try:
+                        request = RecommendationRequest.coerce(next(source))
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    except Exception as e:
+                        # Queued in line so ordered results keep their place
+                        failed = Future()
+                        failed.set_result(BatchResult(
+                            next_index, RecommendationRequest("", "", tag=getattr(e, "tag", None)),
+                            None, 0.0, error=e
+                        ))
+                        in_flight.append(failed)
+                    else:
+                        in_flight.append(executor.submit(run, next_index, request))
+                    next_index += 1
+                if not in_flight:
+                    return
+                if ordered:
+                    finished = [in_flight.popleft()]
+                else:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    finished = [f for f in in_flight if f in done]
+                    for future in finished:
+                        in_flight.remove(future)
+                for future in finished:
+                    result = future.result()
+                    if result.error is not None and not return_exceptions:
+                        raise result.error
+                    yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,156 @@
+"""Speculative generation: start a recommendation before the user asks for it.
+
+Once name, dish and persona have stayed the same for ``debounce`` seconds
+a background worker starts generating. Clicking the button then claims
+that work, finished or still in flight, instead of starting from scratch.
+When the inputs change, the speculation is discarded.
+
+    pool = SpeculationPool(max_concurrent=1)        # one per process
+    speculator = Speculator(pool, generate)         # one per user session
+    speculator.observe(name, dish, persona)         # on every UI refresh
+    flight = speculator.claim(name, dish, persona)  # on click; None means generate normally
+"""
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from src.metrics import SPECULATIONS
+from src.single_flight import Flight
+
+Inputs = Tuple[str, str, str]
+
+
+class SpeculationDiscarded(Exception):
+    """The inputs changed while a speculative generation was running."""
+
+
+class SpeculationPool:
+    """Process-wide cap on speculative generations, plus hit-rate counters.
+
+    A speculation that finds every slot taken is skipped rather than queued,
+    so speculative work never waits in line ahead of real requests.
+    """
+
+    def __init__(self, max_concurrent: int = 1):
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {
+            "started": 0, "skipped": 0, "discarded": 0, "hits": 0, "misses": 0,
+        }
+
+    def try_acquire(self) -> bool:
+        if self._slots.acquire(blocking=False):
+            self.record("started")
+            return True
+        self.record("skipped")
+        return False
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+        SPECULATIONS.inc(outcome=outcome)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of requests answered by a speculation (0.0 before any request)."""
+        with self._lock:
+            asked = self.counts["hits"] + self.counts["misses"]
+            return self.counts["hits"] / asked if asked else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.counts)
+        return dict(stats, hit_rate=self.hit_rate)
+
+
+class Speculator:
+    """Speculative generation for one user session.
+
+    ``generate(name, dish, persona)`` returns the response chunks, e.g. a
+    ``WineSommelier.recommend_stream`` with ``save_response=False``.
+    """
+
+    def __init__(self, pool: SpeculationPool, generate: Callable[[str, str, str], Iterable[str]],
+                 debounce: float = 1.0, timer: Callable[..., threading.Timer] = threading.Timer):
+        self.pool = pool
+        self.generate = generate
+        self.debounce = debounce
+        self._timer_factory = timer
+        self._lock = threading.Lock()
+        self._inputs: Optional[Inputs] = None
+        self._timer: Optional[threading.Timer] = None
+        self._flight: Optional[Flight] = None
+
+    def observe(self, name: str, dish: str, persona: str) -> None:
+        """Report the current inputs; unchanged inputs leave the running speculation alone."""
+        inputs = (name.strip(), dish.strip(), persona)
+        with self._lock:
+            if inputs == self._inputs:
+                return
+            self._discard()
+            if not (inputs[0] and inputs[1]):
+                return
+            self._inputs = inputs
+            self._timer = self._timer_factory(self.debounce, self._start, args=(inputs,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def claim(self, name: str, dish: str, persona: str) -> Optional[Flight]:
+        """The speculative flight for these inputs, or None (a miss) if there is none."""
+        inputs = (name.strip(), dish.strip(), persona)
+        with self._lock:
+            flight = self._flight if inputs == self._inputs else None
+            if flight is None:
+                self._discard()
+            else:
+                # Handed over; the next change of inputs must not discard it
+                self._flight = None
+                self._inputs = None
+        self.pool.record("hits" if flight is not None else "misses")
+        return flight
+
+    def cancel(self) -> None:
+        """Drop any pending or running speculation."""
+        with self._lock:
+            self._discard()
+
+    def _discard(self) -> None:
+        # Caller holds self._lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flight is not None:
+            self.pool.record("discarded")
+            self._flight.finish(SpeculationDiscarded())
+            self._flight = None
+        self._inputs = None
+
+    def _start(self, inputs: Inputs) -> None:
+        """Debounce elapsed: start generating if the inputs are still current."""
+        with self._lock:
+            if inputs != self._inputs or self._flight is not None:
+                return
+            self._timer = None
+            if not self.pool.try_acquire():
+                return
+            flight = self._flight = Flight()
+        threading.Thread(
+            target=self._run, args=(inputs, flight), name="speculation", daemon=True
+        ).start()
+
+    def _run(self, inputs: Inputs, flight: Flight) -> None:
+        try:
+            for chunk in self.generate(*inputs):
+                # A discarded flight takes no more chunks, but the generation
+                # is drained so the slot stays taken until the backend is free
+                if not flight.done:
+                    flight.push(chunk)
+        except Exception as e:
+            flight.finish(e)
+        else:
+            flight.finish()
+        finally:
+            self.pool.release()
@@ -0,0 +1,66 @@
+"""Token usage accounting reported by the LLM backends."""
+import threading
+from typing import Dict, Optional
+
+from src.metrics import LLM_ERRORS, TOKENS_PER_SECOND
+
+
+class TokenUsage:
+    """Running totals of prompt/completion tokens for one client.
+
+    ``backend`` and ``model`` label the generation speed and error metrics.
+    """
+
+    def __init__(self, backend: str = "unknown", model: str = "unknown"):
+        self.backend = backend
+        self.model = model
+        self.errors = 0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.last: Dict[str, int] = {}
+
+    def record(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+        """Add one request's counts; backends that don't report them pass None."""
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens or 0
+            self.completion_tokens += completion_tokens or 0
+            self.last = {
+                "prompt_tokens": prompt_tokens or 0,
+                "completion_tokens": completion_tokens or 0,
+            }
+
+    def record_ollama(self, response) -> None:
+        """Record counts from an Ollama chat response (or final stream chunk)."""
+        self.record(response.get('prompt_eval_count'), response.get('eval_count'))
+        # Ollama reports generation time in nanoseconds
+        self.record_rate(response.get('eval_count'), (response.get('eval_duration') or 0) / 1e9)
+
+    def record_groq(self, usage) -> None:
+        """Record counts from a Groq ``usage`` object."""
+        if usage is not None:
+            self.record(usage.prompt_tokens, usage.completion_tokens)
+            self.record_rate(usage.completion_tokens, getattr(usage, 'completion_time', None))
+
+    def record_rate(self, completion_tokens: Optional[int], seconds: Optional[float]) -> None:
+        """Observe tokens/sec when the backend reports how long generation took."""
+        if completion_tokens and seconds:
+            TOKENS_PER_SECOND.observe(completion_tokens / seconds, backend=self.backend, model=self.model)
+
+    def record_error(self, error: BaseException) -> None:
+        """Count a failed call, even if the client answers with a friendly message."""
+        with self._lock:
+            self.errors += 1
+        LLM_ERRORS.inc(backend=self.backend, model=self.model, error=type(error).__name__)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "avg_prompt_tokens": self.prompt_tokens / self.requests if self.requests else 0.0,
+                "errors": self.errors,
+            }
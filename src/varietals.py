@@ -0,0 +1,311 @@
+"""Find every wine mentioned in a text and map it to a canonical varietal.
+
+Aliases cover grape synonyms, regions and appellations ("Sancerre" ->
+Sauvignon Blanc, "Barolo" -> Nebbiolo). Matching is one Aho-Corasick pass
+over the text, so cost is linear in its length however large the table.
+Extra aliases can be loaded from a file:
+
+    JSON: {"Nebbiolo": ["Barolo", "Barbaresco"], ...}
+    CSV:  alias,varietal
+"""
+import csv
+import json
+import threading
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from src.config import get_secret
+
+# Canonical varietal -> aliases (the canonical name always matches itself).
+# Unaccented spellings are matched automatically.
+VARIETAL_SYNONYMS: Dict[str, List[str]] = {
+    # Red
+    "Cabernet Sauvignon": ["Cabernet", "Cab Sauv", "Napa Cab", "Pauillac", "Margaux", "Saint-Julien",
+                           "St-Julien", "Saint-Estèphe", "St-Estèphe", "Coonawarra"],
+    "Merlot": ["Pomerol", "Saint-Émilion", "St-Émilion", "Saint-Emilion"],
+    "Bordeaux Blend": ["Bordeaux", "Claret", "Meritage", "Médoc", "Haut-Médoc",
+                       "Pessac-Léognan", "Super Tuscan", "Bolgheri"],
+    "Cabernet Franc": ["Chinon", "Bourgueil", "Saumur-Champigny"],
+    "Pinot Noir": ["Pinot Nero", "Spätburgunder", "Blauburgunder", "Red Burgundy", "Bourgogne Rouge",
+                   "Gevrey-Chambertin", "Chambertin", "Vosne-Romanée", "Nuits-Saint-Georges",
+                   "Chambolle-Musigny", "Volnay", "Pommard", "Côte de Nuits", "Côte de Beaune",
+                   "Santenay", "Mercurey", "Sancerre Rouge", "Central Otago"],
+    "Syrah": ["Shiraz", "Hermitage", "Crozes-Hermitage", "Côte-Rôtie", "Cornas", "Saint-Joseph",
+              "Barossa Shiraz"],
+    "Grenache": ["Garnacha", "Cannonau", "Grenache Noir", "Garnatxa", "Priorat", "Priorato"],
+    "Rhône Blend": ["GSM", "Châteauneuf-du-Pape", "Chateauneuf-du-Pape", "Gigondas", "Vacqueyras",
+                    "Côtes du Rhône", "Cotes du Rhone", "Rasteau", "Lirac"],
+    "Mourvèdre": ["Mourvedre", "Monastrell", "Mataro", "Bandol"],
+    "Malbec": ["Cahors", "Auxerrois Noir"],
+    "Zinfandel": ["Primitivo", "Zin", "Crljenak Kaštelanski", "Tribidrag"],
+    "Tempranillo": ["Tinto Fino", "Tinta del País", "Tinta de Toro", "Tinta Roriz", "Aragonez",
+                    "Cencibel", "Ull de Llebre", "Rioja", "Ribera del Duero"],
+    "Sangiovese": ["Chianti", "Chianti Classico", "Brunello", "Brunello di Montalcino",
+                   "Rosso di Montalcino", "Vino Nobile di Montepulciano", "Morellino di Scansano",
+                   "Prugnolo Gentile", "Sangiovese Grosso", "Montefalco Rosso"],
+    "Nebbiolo": ["Barolo", "Barbaresco", "Spanna", "Chiavennasca", "Gattinara", "Ghemme",
+                 "Roero", "Langhe Nebbiolo", "Valtellina"],
+    "Barbera": ["Barbera d'Asti", "Barbera d'Alba"],
+    "Dolcetto": ["Dolcetto d'Alba", "Dogliani"],
+    "Corvina Blend": ["Amarone", "Amarone della Valpolicella", "Valpolicella", "Ripasso",
+                      "Bardolino", "Corvina", "Recioto della Valpolicella"],
+    "Montepulciano": ["Montepulciano d'Abruzzo"],
+    "Aglianico": ["Taurasi", "Aglianico del Vulture"],
+    "Nero d'Avola": [],
+    "Negroamaro": ["Salice Salentino"],
+    "Gamay": ["Beaujolais", "Beaujolais-Villages", "Beaujolais Nouveau", "Morgon", "Fleurie",
+              "Moulin-à-Vent", "Brouilly", "Juliénas", "Chiroubles", "Régnié", "Saint-Amour"],
+    "Carménère": ["Carmenere", "Carmenère"],
+    "Petite Sirah": ["Durif", "Petite Syrah"],
+    "Pinotage": [],
+    "Touriga Nacional": ["Douro Red"],
+    "Blaufränkisch": ["Blaufrankisch", "Lemberger", "Kékfrankos", "Kekfrankos"],
+    "Zweigelt": ["Blauer Zweigelt", "Rotburger"],
+    "Tannat": ["Madiran"],
+    "Carignan": ["Cariñena", "Carignano", "Mazuelo", "Samsó"],
+    "Xinomavro": ["Naoussa"],
+    "Agiorgitiko": ["Nemea"],
+    "Saperavi": [],
+    "Mencía": ["Mencia", "Jaen", "Bierzo"],
+    "Lambrusco": [],
+    "Teroldego": [],
+    "Lagrein": [],
+    "Bonarda": ["Douce Noir", "Charbono"],
+    "Cinsault": ["Cinsaut"],
+    "Petit Verdot": [],
+    # White
+    "Chardonnay": ["Chablis", "White Burgundy", "Bourgogne Blanc", "Meursault", "Puligny-Montrachet",
+                   "Chassagne-Montrachet", "Montrachet", "Corton-Charlemagne", "Pouilly-Fuissé",
+                   "Pouilly-Fuisse", "Mâcon-Villages", "Saint-Véran", "Morillon", "Chard"],
+    "Sauvignon Blanc": ["Sauv Blanc", "Sancerre", "Pouilly-Fumé", "Pouilly-Fume", "Fumé Blanc",
+                        "Fume Blanc", "Menetou-Salon", "Reuilly", "Touraine Sauvignon",
+                        "Marlborough Sauvignon", "Muskat-Silvaner"],
+    "White Bordeaux": ["Entre-Deux-Mers", "Bordeaux Blanc", "Graves Blanc"],
+    "Sauternes": ["Barsac"],
+    "Pinot Grigio": ["Pinot Gris", "Grauburgunder", "Ruländer", "Szürkebarát"],
+    "Pinot Blanc": ["Pinot Bianco", "Weissburgunder", "Weißburgunder", "Klevner"],
+    "Riesling": ["Rhine Riesling", "Johannisberg Riesling", "White Riesling", "Kabinett", "Spätlese",
+                 "Auslese", "Mosel Riesling", "Clare Valley Riesling"],
+    "Gewürztraminer": ["Gewurztraminer", "Gewurz", "Traminer", "Savagnin Rosé"],
+    "Chenin Blanc": ["Chenin", "Pineau de la Loire", "Vouvray", "Savennières", "Savennieres",
+                     "Montlouis", "Anjou Blanc", "Saumur Blanc", "Coteaux du Layon", "Quarts de Chaume",
+                     "Bonnezeaux"],
+    "Viognier": ["Condrieu", "Château-Grillet"],
+    "Albariño": ["Albarino", "Alvarinho", "Rías Baixas", "Rias Baixas"],
+    "Grüner Veltliner": ["Gruner Veltliner", "Grüner", "Gruner", "GrüVe", "Weissgipfler"],
+    "Verdejo": ["Rueda"],
+    "Vermentino": ["Pigato", "Favorita"],
+    "Moscato": ["Muscat", "Moscatel", "Muskateller", "Muscat Blanc à Petits Grains", "Moscato d'Asti",
+                "Asti Spumante", "Muscat de Beaumes-de-Venise", "Zibibbo"],
+    "Muscadet": ["Melon de Bourgogne", "Muscadet Sèvre et Maine"],
+    "Sémillon": ["Semillon", "Hunter Valley Semillon"],
+    "Torrontés": ["Torrontes"],
+    "Garganega": ["Soave", "Recioto di Soave"],
+    "Trebbiano": ["Ugni Blanc", "Trebbiano d'Abruzzo", "Lugana"],
+    "Cortese": ["Gavi", "Gavi di Gavi"],
+    "Fiano": ["Fiano di Avellino"],
+    "Greco": ["Greco di Tufo"],
+    "Falanghina": [],
+    "Verdicchio": ["Verdicchio dei Castelli di Jesi"],
+    "Arneis": ["Roero Arneis"],
+    "Assyrtiko": ["Santorini"],
+    "Marsanne": [],
+    "Roussanne": [],
+    "Furmint": ["Tokaji", "Tokaji Aszú", "Tokay"],
+    "Godello": ["Valdeorras"],
+    "Silvaner": ["Sylvaner", "Franken Silvaner"],
+    "Müller-Thurgau": ["Muller-Thurgau", "Rivaner"],
+    "Picpoul": ["Picpoul de Pinet", "Piquepoul"],
+    "Txakoli": ["Txakolina", "Hondarrabi Zuri"],
+    "Vinho Verde": ["Loureiro"],
+    "Savagnin": ["Vin Jaune", "Château-Chalon"],
+    # Rosé and sparkling
+    "Rosé": ["Rosado", "Rosato", "Provence Rosé", "Tavel", "White Zinfandel"],
+    "Champagne": ["Blanc de Blancs", "Blanc de Noirs", "Brut Nature", "Grower Champagne"],
+    "Prosecco": ["Glera", "Prosecco Superiore", "Valdobbiadene", "Conegliano"],
+    "Cava": [],
+    "Crémant": ["Cremant", "Crémant de Bourgogne", "Crémant d'Alsace", "Crémant de Loire"],
+    "Franciacorta": [],
+    "Sparkling Wine": ["Sekt", "Spumante", "Pét-Nat", "Pet-Nat", "Pétillant Naturel",
+                       "Méthode Champenoise", "Traditional Method"],
+    # Fortified and dessert
+    "Port": ["Porto", "Tawny Port", "Ruby Port", "Vintage Port", "LBV", "Late Bottled Vintage"],
+    "Sherry": ["Jerez", "Fino", "Manzanilla", "Amontillado", "Oloroso", "Palo Cortado",
+               "Pedro Ximénez", "Pedro Ximenez", "PX"],
+    "Madeira": ["Malmsey", "Sercial", "Verdelho", "Bual", "Boal"],
+    "Marsala": [],
+    "Ice Wine": ["Icewine", "Eiswein"],
+    "Vin Santo": [],
+}
+
+# Alias spellings that are everyday words ("notes of rose", "a port city");
+# they show up in tasting notes far more often than as wines, so never match.
+PLAIN_WORDS = {"rose", "port"}
+
+
+@dataclass(frozen=True)
+class VarietalMatch:
+    """One wine mention: ``text[start:end]`` names ``varietal``."""
+    start: int
+    end: int
+    text: str
+    varietal: str
+
+
+_FOLD_CACHE: Dict[str, str] = {}
+
+
+def _fold(char: str) -> str:
+    """Lowercase one character, keeping it one character."""
+    folded = _FOLD_CACHE.get(char)
+    if folded is None:
+        lower = char.lower()
+        if len(lower) != 1:
+            lower = char
+        # Treat typographic apostrophes and dashes like their ASCII forms
+        folded = {"’": "'", "‘": "'", "‐": "-", "‑": "-", "–": "-"}.get(lower, lower)
+        _FOLD_CACHE[char] = folded
+    return folded
+
+
+def fold_text(text: str) -> str:
+    """Case-folded copy of ``text`` with identical offsets."""
+    return "".join(_fold(c) for c in text)
+
+
+def strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+
+
+class VarietalMatcher:
+    """Aho-Corasick automaton over varietal aliases.
+
+    ``find_all`` scans the text once and returns leftmost-longest,
+    whole-word, non-overlapping matches in text order.
+    """
+
+    def __init__(self, synonyms: Dict[str, str]):
+        # Trie as parallel lists: goto edges, failure links, and the
+        # (length, varietal) outputs ending at each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+        self.size = 0
+        for alias, varietal in synonyms.items():
+            folded = fold_text(alias.strip())
+            for spelling in dict.fromkeys((folded, strip_accents(folded))):
+                if spelling not in PLAIN_WORDS:
+                    self._add(spelling, varietal)
+        self._link()
+
+    @classmethod
+    def from_table(cls, table: Dict[str, Iterable[str]]) -> "VarietalMatcher":
+        return cls(table_to_synonyms(table))
+
+    def _add(self, alias: str, varietal: str) -> None:
+        if not alias:
+            return
+        state = 0
+        for char in alias:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        # A later alias for the same text replaces the earlier one
+        if not self._out[state]:
+            self.size += 1
+        self._out[state] = [(len(alias), varietal)]
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[VarietalMatch]:
+        """Every wine mentioned in ``text``, in order of appearance."""
+        if not text:
+            return []
+        folded = fold_text(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates = []
+        state = 0
+        for end, char in enumerate(folded, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, varietal in out[state]:
+                start = end - length
+                if _is_boundary(folded, start - 1) and _is_boundary(folded, end):
+                    candidates.append((start, end, varietal))
+
+        # Leftmost-longest selection of non-overlapping matches
+        candidates.sort(key=lambda m: (m[0], -m[1]))
+        matches = []
+        taken_until = 0
+        for start, end, varietal in candidates:
+            if start >= taken_until:
+                matches.append(VarietalMatch(start, end, text[start:end], varietal))
+                taken_until = end
+        return matches
+
+    def first(self, text: str) -> Optional[VarietalMatch]:
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+    def varietals(self, text: str) -> List[str]:
+        """Distinct canonical varietals mentioned, in order of first mention."""
+        return list(dict.fromkeys(m.varietal for m in self.find_all(text)))
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+def table_to_synonyms(table: Dict[str, Iterable[str]]) -> Dict[str, str]:
+    """Flatten ``{varietal: [aliases]}`` into ``{alias: varietal}``."""
+    synonyms = {}
+    for varietal, aliases in table.items():
+        synonyms[varietal] = varietal
+        for alias in aliases:
+            synonyms[alias] = varietal
+    return synonyms
+
+
+def load_synonyms(path: str) -> Dict[str, str]:
+    """Read ``{alias: varietal}`` from a JSON table or an alias,varietal CSV."""
+    if str(path).lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return {row[0]: row[1] for row in csv.reader(f) if len(row) >= 2 and row[0] != "alias"}
+    with open(path, encoding="utf-8") as f:
+        return table_to_synonyms(json.load(f))
+
+
+_matcher: Optional[VarietalMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher() -> VarietalMatcher:
+    """Process-wide matcher for the built-in table plus VARIETAL_SYNONYMS_PATH, built once."""
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            synonyms = table_to_synonyms(VARIETAL_SYNONYMS)
+            path = get_secret("VARIETAL_SYNONYMS_PATH")
+            if path:
+                synonyms.update(load_synonyms(path))
+            _matcher = VarietalMatcher(synonyms)
+        return _matcher
@@ -0,0 +1,87 @@
+"""Model warm-up and keep-warm scheduling for the LLM backends."""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+# How long Ollama keeps a model in memory after each request (Ollama's default is 5m)
+DEFAULT_KEEP_ALIVE = "30m"
+
+
+@dataclass
+class WarmupReport:
+    """What a warm-up request observed."""
+    model: str
+    load_seconds: float
+    total_seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"{self.model}: warm-up failed ({self.error})"
+        return f"{self.model}: loaded in {self.load_seconds:.1f}s (warm-up {self.total_seconds:.1f}s)"
+
+
+def timed_warmup(model: str, request: Callable[[], Optional[float]]) -> WarmupReport:
+    """Run a tiny warm-up request; ``request`` returns the backend's load time if known."""
+    start = time.perf_counter()
+    try:
+        load_seconds = request()
+    except Exception as e:
+        return WarmupReport(model, 0.0, time.perf_counter() - start, error=str(e))
+    total = time.perf_counter() - start
+    return WarmupReport(model, total if load_seconds is None else load_seconds, total)
+
+
+class KeepWarm:
+    """Background thread that re-warms clients periodically during business hours.
+
+    Pinging more often than the backend's keep_alive means the model never
+    gets unloaded while customers might be ordering.
+    """
+
+    def __init__(self, clients: Sequence, interval: float = 240.0,
+                 start_hour: int = 11, end_hour: int = 23,
+                 days: Sequence[int] = (0, 1, 2, 3, 4, 5, 6)):
+        self.clients = list(clients)
+        self.interval = interval
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.days = set(days)
+        self.reports: List[WarmupReport] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def in_business_hours(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now()
+        return now.weekday() in self.days and self.start_hour <= now.hour < self.end_hour
+
+    def ping(self) -> List[WarmupReport]:
+        """Warm every client once."""
+        reports = [client.warm_up() for client in self.clients if hasattr(client, 'warm_up')]
+        # Keep only the latest round
+        self.reports = reports
+        return reports
+
+    def start(self) -> "KeepWarm":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="keep-warm", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.in_business_hours():
+                self.ping()
+            self._stop.wait(self.interval)
@@ -1,113 +1,225 @@
 # src/wine_api.py
-import requests
-import streamlit as st
+import re
+import threading
 from typing import List, Dict, Optional
 
+from src.config import get_secret
+from src.resilience import CircuitBreaker, retry_call
+from src.response_cache import LRUCache
+from src.wine_catalog import WineCatalog, get_catalog
+
+SPOONACULAR_URL = "https://api.spoonacular.com/food/wine/recommendation"
+
+# Query strings carry the API key, so they never reach logs or stats
+_QUERY = re.compile(r"\?[^\s'\"]*")
+
+
+def _redact(text: str) -> str:
+    return _QUERY.sub("?...", text)
+
+
+class TransientHTTPError(Exception):
+    """A response worth retrying (rate limited or server error)."""
+
+
+class SpoonacularClient:
+    """Spoonacular wine lookups over a pooled session, with a TTL cache,
+    jittered retries and a circuit breaker so a degraded API can't stall
+    every bottle lookup."""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 timeout: float = 5.0, cache_ttl: float = 3600.0, cache_size: int = 2048,
+                 retries: int = 2, failure_threshold: int = 3, cooldown: float = 60.0,
+                 pool_size: int = 10):
+        self.api_key = api_key
+        self.base_url = base_url or get_secret("SPOONACULAR_BASE_URL") or SPOONACULAR_URL
+        self.timeout = timeout
+        self.retries = retries
+        self.pool_size = pool_size
+        self.cache = LRUCache(max_entries=cache_size, ttl=cache_ttl)
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown=cooldown)
+        self._session = None
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "breaker_skips": 0}
+        self.last_error: Optional[str] = None
+
+    @property
+    def session(self):
+        """Shared requests session with a keep-alive connection pool."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def recommend(self, wine_type: str, max_price: int) -> List[Dict]:
+        """Bottles for a wine type; [] when unconfigured, failing or breaker-open."""
+        api_key = self.api_key or get_secret("SPOONACULAR_API_KEY")
+        if not api_key:
+            return []
+
+        cache_key = f"{wine_type.strip().lower()}|{max_price}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if not self.breaker.allow():
+            self._count("breaker_skips")
+            return []
+
+        try:
+            data = retry_call(
+                lambda: self._fetch(wine_type, max_price, api_key),
+                attempts=self.retries + 1,
+                retry_on=(TransientHTTPError,) + self._transient_errors(),
+                on_retry=lambda attempt, e: self._count("retries"),
+            )
+        except Exception as e:
+            if _is_client_error(e):
+                # A 4xx (bad key, bad request) still proves the API is up
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            self._count("failures")
+            self.last_error = _redact(f"{type(e).__name__}: {e}")
+            return []
+
+        self.breaker.record_success()
+        wines = [
+            {
+                "name": wine.get("title", "Unknown"),
+                "description": wine.get("description", ""),
+                "price": wine.get("price", "N/A"),
+                "rating": wine.get("averageRating", 0),
+                "image": wine.get("imageUrl", ""),
+                "link": wine.get("link", "")
+            }
+            for wine in data.get("recommendedWines", [])[:3]
+        ]
+        self.cache.set(cache_key, wines)
+        return wines
+
+    @staticmethod
+    def _transient_errors() -> tuple:
+        """Connection and timeout errors; other HTTP errors won't go away on a retry."""
+        import requests
+        return (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)
+
+    def _fetch(self, wine_type: str, max_price: int, api_key: str) -> Dict:
+        self._count("requests")
+        response = self.session.get(
+            self.base_url,
+            params={"wine": wine_type, "maxPrice": max_price, "apiKey": api_key},
+            timeout=(min(2.0, self.timeout), self.timeout)
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientHTTPError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self) -> Dict:
+        """Counters for cache hits, remote calls, failures and breaker state."""
+        with self._lock:
+            stats = dict(self.counters)
+        cache = self.cache.stats()
+        stats.update(
+            cache_hits=cache["hits"],
+            cache_misses=cache["misses"],
+            breaker_state=self.breaker.state,
+            breaker_opened=self.breaker.times_opened,
+            last_error=self.last_error,
+        )
+        return stats
+
+
+def _is_client_error(error: BaseException) -> bool:
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500
+
+
+_spoonacular: Optional[SpoonacularClient] = None
+_spoonacular_lock = threading.Lock()
+
+
+def get_spoonacular_client() -> SpoonacularClient:
+    """Process-wide client so the pool, cache and breaker are shared."""
+    global _spoonacular
+    with _spoonacular_lock:
+        if _spoonacular is None:
+            _spoonacular = SpoonacularClient()
+        return _spoonacular
+
+
 class WineDatabase:
     """Interface to wine database APIs for specific bottle recommendations"""
     
-    def __init__(self):
+    def __init__(self, catalog: Optional[WineCatalog] = None, catalog_path: Optional[str] = None,
+                 spoonacular: Optional[SpoonacularClient] = None):
         # We'll use multiple free APIs as fallbacks
         self.apis = {
             'spoonacular': self._search_spoonacular,
             'open_wine': self._search_open_wine
         }
+        # Local catalog is opened once per process and shared by every instance
+        self.catalog = catalog or get_catalog(catalog_path or get_secret("WINE_CATALOG_PATH"))
+        self.spoonacular = spoonacular or get_spoonacular_client()
         
-    def search_wines(self, wine_type: str, food_pairing: str = None, max_price: int = 100) -> List[Dict]:
+    def search_wines(self, wine_type: str, food_pairing: str = None, max_price: int = 100,
+                     min_price: Optional[float] = None, min_rating: Optional[float] = None) -> List[Dict]:
         """
         Search for specific wine bottles based on criteria
         Returns list of wine recommendations with details
         """
         wines = []
         
-        # Try Spoonacular API first (free tier available)
-        try:
-            wines = self._search_spoonacular(wine_type, food_pairing, max_price)
-        except:
-            pass
+        # Try Spoonacular API first (free tier available); it never raises
+        wines = self._search_spoonacular(wine_type, food_pairing, max_price)
         
         # If no results, try backup method
         if not wines:
-            wines = self._get_fallback_recommendations(wine_type, food_pairing)
+            wines = self._get_fallback_recommendations(
+                wine_type, food_pairing, max_price, min_price, min_rating
+            )
         
         return wines
     
     def _search_spoonacular(self, wine_type: str, food: str, max_price: int) -> List[Dict]:
         """Search using Spoonacular API (requires free API key)"""
         # Note: User needs to get free key from https://spoonacular.com/food-api
-        api_key = st.secrets.get("SPOONACULAR_API_KEY", None)
-        
-        if not api_key:
-            return []
-        
-        url = "https://api.spoonacular.com/food/wine/recommendation"
-        params = {
-            "wine": wine_type,
-            "maxPrice": max_price,
-            "apiKey": api_key
-        }
-        
-        try:
-            response = requests.get(url, params=params, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                return [
-                    {
-                        "name": wine.get("title", "Unknown"),
-                        "description": wine.get("description", ""),
-                        "price": wine.get("price", "N/A"),
-                        "rating": wine.get("averageRating", 0),
-                        "image": wine.get("imageUrl", ""),
-                        "link": wine.get("link", "")
-                    }
-                    for wine in data.get("recommendedWines", [])[:3]
-                ]
-        except:
-            pass
-        
-        return []
+        return self.spoonacular.recommend(wine_type, max_price)
+
+    def stats(self) -> Dict:
+        """Spoonacular lookup counters (cache, failures, breaker state)."""
+        return self.spoonacular.stats()
     
     def _search_open_wine(self, wine_type: str, food: str, max_price: int) -> List[Dict]:
         """Search using Open Wine Database (no key required)"""
         # This is a simplified example - you'd need to implement based on actual API
         return []
     
-    def _get_fallback_recommendations(self, wine_type: str, food: str) -> List[Dict]:
-        """Provide curated recommendations when APIs are unavailable"""
-        
-        # Curated recommendations based on wine type
-        recommendations = {
-            "Pinot Noir": [
-                {"name": "Meiomi Pinot Noir", "price": "$18-22", "description": "Smooth, versatile California Pinot with notes of berry and vanilla", "rating": 4.2},
-                {"name": "La Crema Pinot Noir", "price": "$15-20", "description": "Elegant Sonoma Coast Pinot with cherry and spice notes", "rating": 4.1},
-                {"name": "Böen Pinot Noir", "price": "$25-30", "description": "Rich, complex California Pinot with dark fruit flavors", "rating": 4.3}
-            ],
-            "Cabernet Sauvignon": [
-                {"name": "Josh Cellars Cabernet", "price": "$12-15", "description": "Bold, approachable Cab with blackberry and vanilla", "rating": 4.0},
-                {"name": "Decoy Cabernet Sauvignon", "price": "$20-25", "description": "Napa Valley Cab with rich fruit and soft tannins", "rating": 4.3},
-                {"name": "The Prisoner Cabernet", "price": "$45-50", "description": "Premium Napa blend with complex dark fruit", "rating": 4.5}
-            ],
-            "Chardonnay": [
-                {"name": "Kendall-Jackson Chardonnay", "price": "$12-15", "description": "Classic California Chard with tropical fruit and oak", "rating": 4.0},
-                {"name": "Sonoma-Cutrer Chardonnay", "price": "$20-25", "description": "Elegant Russian River Valley Chard", "rating": 4.2},
-                {"name": "Rombauer Chardonnay", "price": "$30-35", "description": "Rich, buttery Carneros Chardonnay", "rating": 4.4}
-            ],
-            "Sauvignon Blanc": [
-                {"name": "Oyster Bay Sauvignon Blanc", "price": "$8-10", "description": "Crisp New Zealand Sauv Blanc with citrus notes", "rating": 3.9},
-                {"name": "Whitehaven Sauvignon Blanc", "price": "$12-15", "description": "Vibrant Marlborough wine with tropical flavors", "rating": 4.2},
-                {"name": "Cloudy Bay Sauvignon Blanc", "price": "$25-30", "description": "Premium New Zealand icon with complex aromatics", "rating": 4.4}
-            ]
-        }
-        
-        # Extract wine type from the recommendation text
-        wine_key = None
-        for key in recommendations.keys():
-            if key.lower() in wine_type.lower():
-                wine_key = key
-                break
-        
-        if wine_key:
-            return recommendations[wine_key]
+    def _get_fallback_recommendations(self, wine_type: str, food: str, max_price: Optional[float] = None,
+                                      min_price: Optional[float] = None,
+                                      min_rating: Optional[float] = None) -> List[Dict]:
+        """Provide catalog recommendations when APIs are unavailable"""
+        wines = self.catalog.search(
+            varietal=wine_type,
+            food=food,
+            min_price=min_price,
+            max_price=max_price,
+            min_rating=min_rating
+        )
+        if wines:
+            return wines
         
         # Default recommendations if no match
         return [
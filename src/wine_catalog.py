@@ -0,0 +1,352 @@
+"""Indexed on-disk wine catalog (SQLite + FTS5) behind WineDatabase searches.
+
+Build a catalog once from CSV/JSONL:
+
+    python -m src.wine_catalog wines.sqlite3 catalog.csv more_wines.jsonl
+
+Columns: name, varietal, description, food_pairing, price (e.g. "$18-22" or
+18.5), rating, region, link. Unknown columns are ignored.
+"""
+import csv
+import json
+import re
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bottles shipped with the app, used when no catalog file is configured
+CURATED_WINES = [
+    {"name": "Meiomi Pinot Noir", "varietal": "Pinot Noir", "price": "$18-22", "description": "Smooth, versatile California Pinot with notes of berry and vanilla", "rating": 4.2, "food_pairing": "salmon duck mushroom pork chicken"},
+    {"name": "La Crema Pinot Noir", "varietal": "Pinot Noir", "price": "$15-20", "description": "Elegant Sonoma Coast Pinot with cherry and spice notes", "rating": 4.1, "food_pairing": "salmon tuna turkey mushroom risotto"},
+    {"name": "Böen Pinot Noir", "varietal": "Pinot Noir", "price": "$25-30", "description": "Rich, complex California Pinot with dark fruit flavors", "rating": 4.3, "food_pairing": "duck lamb pork roast"},
+    {"name": "Josh Cellars Cabernet", "varietal": "Cabernet Sauvignon", "price": "$12-15", "description": "Bold, approachable Cab with blackberry and vanilla", "rating": 4.0, "food_pairing": "burger steak barbecue beef"},
+    {"name": "Decoy Cabernet Sauvignon", "varietal": "Cabernet Sauvignon", "price": "$20-25", "description": "Napa Valley Cab with rich fruit and soft tannins", "rating": 4.3, "food_pairing": "steak lamb beef short ribs"},
+    {"name": "The Prisoner Cabernet", "varietal": "Cabernet Sauvignon", "price": "$45-50", "description": "Premium Napa blend with complex dark fruit", "rating": 4.5, "food_pairing": "ribeye steak venison braised beef"},
+    {"name": "Kendall-Jackson Chardonnay", "varietal": "Chardonnay", "price": "$12-15", "description": "Classic California Chard with tropical fruit and oak", "rating": 4.0, "food_pairing": "chicken pasta cream sauce"},
+    {"name": "Sonoma-Cutrer Chardonnay", "varietal": "Chardonnay", "price": "$20-25", "description": "Elegant Russian River Valley Chard", "rating": 4.2, "food_pairing": "halibut scallops chicken"},
+    {"name": "Rombauer Chardonnay", "varietal": "Chardonnay", "price": "$30-35", "description": "Rich, buttery Carneros Chardonnay", "rating": 4.4, "food_pairing": "lobster crab butter cream"},
+    {"name": "Oyster Bay Sauvignon Blanc", "varietal": "Sauvignon Blanc", "price": "$8-10", "description": "Crisp New Zealand Sauv Blanc with citrus notes", "rating": 3.9, "food_pairing": "oysters salad goat cheese"},
+    {"name": "Whitehaven Sauvignon Blanc", "varietal": "Sauvignon Blanc", "price": "$12-15", "description": "Vibrant Marlborough wine with tropical flavors", "rating": 4.2, "food_pairing": "thai curry shrimp asparagus"},
+    {"name": "Cloudy Bay Sauvignon Blanc", "varietal": "Sauvignon Blanc", "price": "$25-30", "description": "Premium New Zealand icon with complex aromatics", "rating": 4.4, "food_pairing": "seafood shellfish asparagus herbs"},
+    # At least one bottle for every canonical varietal in src.varietals
+    {"name": "Duckhorn Decoy Merlot", "varietal": "Merlot", "price": "$20-25", "description": "Plush Sonoma Merlot with plum and mocha", "rating": 4.1, "food_pairing": "pork roast chicken mushroom lamb"},
+    {"name": "Château Greysac Médoc", "varietal": "Bordeaux Blend", "price": "$18-22", "description": "Classic Left Bank blend with cassis and cedar", "rating": 4.0, "food_pairing": "steak lamb beef roast"},
+    {"name": "Charles Joguet Chinon Cuvée Terroir", "varietal": "Cabernet Franc", "price": "$20-25", "description": "Loire Cabernet Franc with red berries and a leafy edge", "rating": 4.1, "food_pairing": "pork charcuterie roast chicken mushroom"},
+    {"name": "E. Guigal Crozes-Hermitage Rouge", "varietal": "Syrah", "price": "$20-25", "description": "Northern Rhône Syrah with black pepper and olive", "rating": 4.1, "food_pairing": "lamb barbecue sausage beef"},
+    {"name": "Bodegas Borsao Garnacha", "varietal": "Grenache", "price": "$8-10", "description": "Juicy Spanish Garnacha with ripe raspberry", "rating": 3.9, "food_pairing": "barbecue pizza burger chorizo"},
+    {"name": "Famille Perrin Côtes du Rhône Réserve", "varietal": "Rhône Blend", "price": "$10-14", "description": "Grenache-Syrah blend with red fruit and garrigue", "rating": 4.0, "food_pairing": "stew lamb sausage roast chicken"},
+    {"name": "Juan Gil Monastrell", "varietal": "Mourvèdre", "price": "$15-18", "description": "Dark, spicy Jumilla Monastrell", "rating": 4.0, "food_pairing": "lamb barbecue game beef"},
+    {"name": "Catena Malbec", "varietal": "Malbec", "price": "$18-22", "description": "High-altitude Mendoza Malbec with violet and blackberry", "rating": 4.2, "food_pairing": "steak burger barbecue beef empanadas"},
+    {"name": "Seghesio Sonoma Zinfandel", "varietal": "Zinfandel", "price": "$22-26", "description": "Brambly Sonoma Zin with pepper spice", "rating": 4.1, "food_pairing": "barbecue ribs burger pizza"},
+    {"name": "Marqués de Cáceres Rioja Crianza", "varietal": "Tempranillo", "price": "$12-15", "description": "Rioja with cherry, vanilla and soft oak", "rating": 4.0, "food_pairing": "lamb chorizo tapas roast pork"},
+    {"name": "Castello di Volpaia Chianti Classico", "varietal": "Sangiovese", "price": "$22-26", "description": "Bright Chianti with sour cherry and herbs", "rating": 4.2, "food_pairing": "pasta tomato pizza lasagna steak"},
+    {"name": "G.D. Vajra Langhe Nebbiolo", "varietal": "Nebbiolo", "price": "$25-30", "description": "Rose and tar Nebbiolo from the Langhe", "rating": 4.2, "food_pairing": "truffle risotto mushroom braised beef"},
+    {"name": "Michele Chiarlo Barbera d'Asti Le Orme", "varietal": "Barbera", "price": "$14-17", "description": "Juicy, high-acid Barbera with dark cherry", "rating": 4.0, "food_pairing": "pizza pasta tomato sausage"},
+    {"name": "Marcarini Dolcetto d'Alba", "varietal": "Dolcetto", "price": "$18-22", "description": "Soft, grapey Piedmont red", "rating": 3.9, "food_pairing": "antipasti salami pasta pizza"},
+    {"name": "Zenato Valpolicella Ripasso", "varietal": "Corvina Blend", "price": "$20-25", "description": "Rich Ripasso with dried cherry and spice", "rating": 4.1, "food_pairing": "braised beef stew aged cheese mushroom"},
+    {"name": "Masciarelli Montepulciano d'Abruzzo", "varietal": "Montepulciano", "price": "$10-13", "description": "Rustic, fruity Abruzzo red", "rating": 3.9, "food_pairing": "pizza pasta tomato meatballs"},
+    {"name": "Feudi di San Gregorio Rubrato Aglianico", "varietal": "Aglianico", "price": "$18-22", "description": "Firm Campanian red with black cherry and smoke", "rating": 4.0, "food_pairing": "lamb braised beef game sausage"},
+    {"name": "Donnafugata Sherazade Nero d'Avola", "varietal": "Nero d'Avola", "price": "$18-22", "description": "Sicilian red with ripe plum and spice", "rating": 4.0, "food_pairing": "pasta eggplant tomato pizza"},
+    {"name": "Cantele Salice Salentino Riserva", "varietal": "Negroamaro", "price": "$12-15", "description": "Dark, earthy Puglian red", "rating": 3.9, "food_pairing": "barbecue sausage lamb pasta"},
+    {"name": "Georges Duboeuf Morgon", "varietal": "Gamay", "price": "$15-18", "description": "Cru Beaujolais with crunchy red fruit", "rating": 4.0, "food_pairing": "turkey charcuterie salmon roast chicken"},
+    {"name": "Concha y Toro Casillero del Diablo Carménère", "varietal": "Carménère", "price": "$10-12", "description": "Chilean Carménère with green pepper and plum", "rating": 3.8, "food_pairing": "barbecue burger empanadas"},
+    {"name": "Bogle Petite Sirah", "varietal": "Petite Sirah", "price": "$10-13", "description": "Inky California red with blueberry", "rating": 3.9, "food_pairing": "barbecue ribs brisket burger"},
+    {"name": "Kanonkop Kadette Pinotage", "varietal": "Pinotage", "price": "$12-15", "description": "Smoky South African Pinotage", "rating": 3.9, "food_pairing": "barbecue sausage game"},
+    {"name": "Quinta do Crasto Douro Red", "varietal": "Touriga Nacional", "price": "$15-18", "description": "Floral, dark-fruited Douro red", "rating": 4.0, "food_pairing": "lamb pork roast stew"},
+    {"name": "Moric Blaufränkisch", "varietal": "Blaufränkisch", "price": "$22-26", "description": "Peppery Austrian red with dark cherry", "rating": 4.1, "food_pairing": "duck game pork roast"},
+    {"name": "Zantho Zweigelt", "varietal": "Zweigelt", "price": "$12-15", "description": "Juicy Austrian red with sour cherry", "rating": 3.9, "food_pairing": "schnitzel sausage pork charcuterie"},
+    {"name": "Bodega Garzón Tannat", "varietal": "Tannat", "price": "$15-18", "description": "Uruguayan Tannat, dense and structured", "rating": 3.9, "food_pairing": "steak barbecue lamb"},
+    {"name": "Cline Ancient Vines Carignane", "varietal": "Carignan", "price": "$10-12", "description": "Spicy, rustic old-vine Carignan", "rating": 3.8, "food_pairing": "barbecue stew sausage"},
+    {"name": "Kir-Yianni Ramnista Xinomavro", "varietal": "Xinomavro", "price": "$20-25", "description": "Greek red with tomato leaf and cherry", "rating": 4.0, "food_pairing": "lamb moussaka tomato"},
+    {"name": "Skouras Saint George Agiorgitiko", "varietal": "Agiorgitiko", "price": "$14-17", "description": "Soft Nemea red with red plum", "rating": 3.9, "food_pairing": "lamb souvlaki tomato"},
+    {"name": "Teliani Valley Saperavi", "varietal": "Saperavi", "price": "$14-17", "description": "Deep-colored Georgian red", "rating": 3.9, "food_pairing": "lamb kebab stew"},
+    {"name": "Descendientes de J. Palacios Pétalos Bierzo", "varietal": "Mencía", "price": "$20-25", "description": "Bierzo Mencía with floral dark fruit", "rating": 4.1, "food_pairing": "pork roast chicken mushroom"},
+    {"name": "Cleto Chiarli Lambrusco di Sorbara", "varietal": "Lambrusco", "price": "$14-17", "description": "Dry, frothy red with tart berry", "rating": 4.0, "food_pairing": "pizza salami charcuterie pasta"},
+    {"name": "Foradori Teroldego", "varietal": "Teroldego", "price": "$25-30", "description": "Alpine Teroldego with blackberry and spice", "rating": 4.1, "food_pairing": "game duck mushroom"},
+    {"name": "Alois Lageder Lagrein", "varietal": "Lagrein", "price": "$20-25", "description": "Dark, velvety Alto Adige red", "rating": 4.0, "food_pairing": "sausage speck stew pork"},
+    {"name": "Colonia Las Liebres Bonarda", "varietal": "Bonarda", "price": "$10-12", "description": "Fruity Argentine Bonarda", "rating": 3.8, "food_pairing": "pizza burger empanadas"},
+    {"name": "Craven Cinsault", "varietal": "Cinsault", "price": "$25-30", "description": "Light, perfumed Stellenbosch Cinsault", "rating": 3.9, "food_pairing": "salad grilled fish tapas"},
+    {"name": "Michael David Petit Verdot", "varietal": "Petit Verdot", "price": "$20-25", "description": "Dark, violet-scented Lodi Petit Verdot", "rating": 4.1, "food_pairing": "steak lamb game"},
+    {"name": "Château Graville-Lacoste Graves Blanc", "varietal": "White Bordeaux", "price": "$18-22", "description": "Sémillon-Sauvignon blend with citrus and wax", "rating": 4.0, "food_pairing": "seafood fish shellfish salad"},
+    {"name": "Château Suduiraut Castelnau de Suduiraut", "varietal": "Sauternes", "price": "$30-35", "description": "Honeyed Sauternes with apricot", "rating": 4.2, "food_pairing": "foie gras blue cheese dessert"},
+    {"name": "Santa Margherita Pinot Grigio", "varietal": "Pinot Grigio", "price": "$20-25", "description": "Crisp Alto Adige Pinot Grigio", "rating": 4.0, "food_pairing": "salad seafood pasta fish"},
+    {"name": "Trimbach Pinot Blanc", "varietal": "Pinot Blanc", "price": "$15-18", "description": "Round Alsace white with apple and almond", "rating": 3.9, "food_pairing": "quiche chicken fish"},
+    {"name": "Dr. Loosen Dr. L Riesling", "varietal": "Riesling", "price": "$10-13", "description": "Off-dry Mosel Riesling with peach and lime", "rating": 4.0, "food_pairing": "thai curry spicy pork asian"},
+    {"name": "Trimbach Gewurztraminer", "varietal": "Gewürztraminer", "price": "$22-26", "description": "Aromatic Alsace white with lychee and rose", "rating": 4.1, "food_pairing": "curry spicy asian munster cheese"},
+    {"name": "Domaine Huet Le Haut-Lieu Vouvray Sec", "varietal": "Chenin Blanc", "price": "$35-40", "description": "Dry Vouvray with quince and honey", "rating": 4.4, "food_pairing": "pork chicken cream sauce goat cheese"},
+    {"name": "Yalumba Y Series Viognier", "varietal": "Viognier", "price": "$10-13", "description": "Apricot and honeysuckle Australian Viognier", "rating": 3.9, "food_pairing": "curry chicken lobster"},
+    {"name": "Martín Códax Albariño", "varietal": "Albariño", "price": "$14-17", "description": "Briny Rías Baixas white with citrus", "rating": 4.0, "food_pairing": "oysters seafood shellfish fish"},
+    {"name": "Laurenz V. Singing Grüner Veltliner", "varietal": "Grüner Veltliner", "price": "$14-17", "description": "Peppery Austrian Grüner", "rating": 4.0, "food_pairing": "asparagus schnitzel salad vegetables"},
+    {"name": "Marqués de Riscal Rueda Verdejo", "varietal": "Verdejo", "price": "$10-12", "description": "Zesty Rueda white with herbs", "rating": 3.9, "food_pairing": "tapas seafood salad"},
+    {"name": "Argiolas Costamolino Vermentino", "varietal": "Vermentino", "price": "$14-17", "description": "Sardinian white with citrus and sea salt", "rating": 3.9, "food_pairing": "seafood fish pasta pesto"},
+    {"name": "Saracco Moscato d'Asti", "varietal": "Moscato", "price": "$15-18", "description": "Lightly sparkling, peachy Moscato", "rating": 4.0, "food_pairing": "dessert fruit tart spicy"},
+    {"name": "Domaine de la Pépière Muscadet Sèvre et Maine", "varietal": "Muscadet", "price": "$14-17", "description": "Bone-dry Loire white for shellfish", "rating": 4.1, "food_pairing": "oysters mussels shellfish seafood"},
+    {"name": "Tyrrell's Hunter Valley Sémillon", "varietal": "Sémillon", "price": "$20-25", "description": "Lemony Hunter Semillon", "rating": 4.0, "food_pairing": "fish seafood salad"},
+    {"name": "Crios Torrontés", "varietal": "Torrontés", "price": "$12-15", "description": "Floral Argentine white", "rating": 3.8, "food_pairing": "spicy asian empanadas"},
+    {"name": "Pieropan Soave Classico", "varietal": "Garganega", "price": "$15-18", "description": "Almond-edged Soave from Garganega", "rating": 4.0, "food_pairing": "risotto fish seafood"},
+    {"name": "Falesco Est! Est!! Est!!! di Montefiascone", "varietal": "Trebbiano", "price": "$10-12", "description": "Light, fresh Lazio white", "rating": 3.7, "food_pairing": "pasta fish salad"},
+    {"name": "La Scolca Gavi", "varietal": "Cortese", "price": "$20-25", "description": "Crisp Gavi with pear and citrus", "rating": 3.9, "food_pairing": "fish seafood pesto pasta"},
+    {"name": "Mastroberardino Fiano di Avellino", "varietal": "Fiano", "price": "$25-30", "description": "Textured Campanian white with hazelnut", "rating": 4.0, "food_pairing": "seafood pasta chicken"},
+    {"name": "Feudi di San Gregorio Greco di Tufo", "varietal": "Greco", "price": "$20-25", "description": "Mineral Campanian white", "rating": 4.0, "food_pairing": "seafood fish shellfish"},
+    {"name": "Terredora Falanghina", "varietal": "Falanghina", "price": "$14-17", "description": "Citrusy southern Italian white", "rating": 3.9, "food_pairing": "seafood pizza fish"},
+    {"name": "Garofoli Verdicchio dei Castelli di Jesi", "varietal": "Verdicchio", "price": "$12-15", "description": "Crisp Marche white with almond", "rating": 3.9, "food_pairing": "fish seafood pasta"},
+    {"name": "Vietti Roero Arneis", "varietal": "Arneis", "price": "$20-25", "description": "Pear and almond Piedmont white", "rating": 4.0, "food_pairing": "salad fish risotto"},
+    {"name": "Santo Wines Assyrtiko", "varietal": "Assyrtiko", "price": "$20-25", "description": "Volcanic Santorini white, salty and taut", "rating": 4.2, "food_pairing": "grilled fish seafood octopus"},
+    {"name": "Tahbilk Marsanne", "varietal": "Marsanne", "price": "$15-18", "description": "Honeysuckle-scented Victorian Marsanne", "rating": 3.9, "food_pairing": "chicken fish cream sauce"},
+    {"name": "Tablas Creek Roussanne", "varietal": "Roussanne", "price": "$35-40", "description": "Rich Paso Robles Roussanne", "rating": 4.1, "food_pairing": "lobster chicken pork"},
+    {"name": "Royal Tokaji Dry Furmint", "varietal": "Furmint", "price": "$15-18", "description": "Smoky, dry Tokaj white", "rating": 3.9, "food_pairing": "pork fish spicy"},
+    {"name": "Rafael Palacios Louro Godello", "varietal": "Godello", "price": "$25-30", "description": "Textured Valdeorras white", "rating": 4.2, "food_pairing": "seafood fish chicken"},
+    {"name": "Juliusspital Silvaner Trocken", "varietal": "Silvaner", "price": "$18-22", "description": "Dry Franken Silvaner", "rating": 3.9, "food_pairing": "asparagus fish vegetables"},
+    {"name": "Kettmeir Müller-Thurgau", "varietal": "Müller-Thurgau", "price": "$15-18", "description": "Aromatic Alto Adige white", "rating": 3.8, "food_pairing": "salad asian fish"},
+    {"name": "Hugues Beaulieu Picpoul de Pinet", "varietal": "Picpoul", "price": "$10-13", "description": "Zesty Languedoc white for oysters", "rating": 3.9, "food_pairing": "oysters shellfish seafood"},
+    {"name": "Ameztoi Getariako Txakolina", "varietal": "Txakoli", "price": "$18-22", "description": "Spritzy, saline Basque white", "rating": 4.0, "food_pairing": "tapas seafood anchovies"},
+    {"name": "Aveleda Vinho Verde", "varietal": "Vinho Verde", "price": "$8-10", "description": "Light, spritzy Portuguese white", "rating": 3.8, "food_pairing": "seafood salad fish"},
+    {"name": "Domaine Rolet Arbois Savagnin", "varietal": "Savagnin", "price": "$35-40", "description": "Nutty Jura white", "rating": 4.0, "food_pairing": "comte cheese chicken mushroom"},
+    {"name": "Whispering Angel Rosé", "varietal": "Rosé", "price": "$20-25", "description": "Pale Provence rosé with strawberry", "rating": 4.0, "food_pairing": "salad seafood grilled fish"},
+    {"name": "Veuve Clicquot Yellow Label Brut", "varietal": "Champagne", "price": "$55-60", "description": "Toasty, full Champagne", "rating": 4.3, "food_pairing": "oysters caviar fried chicken"},
+    {"name": "La Marca Prosecco", "varietal": "Prosecco", "price": "$12-15", "description": "Fresh Prosecco with green apple", "rating": 3.9, "food_pairing": "appetizers fried food salad"},
+    {"name": "Segura Viudas Brut Reserva Cava", "varietal": "Cava", "price": "$10-12", "description": "Crisp Spanish sparkling wine", "rating": 3.9, "food_pairing": "tapas fried food seafood"},
+    {"name": "Lucien Albrecht Crémant d'Alsace Brut", "varietal": "Crémant", "price": "$18-22", "description": "Champagne-method Alsace sparkling", "rating": 4.0, "food_pairing": "appetizers shellfish fried chicken"},
+    {"name": "Ca' del Bosco Cuvée Prestige", "varietal": "Franciacorta", "price": "$35-40", "description": "Lombardy traditional-method sparkling", "rating": 4.2, "food_pairing": "risotto seafood appetizers"},
+    {"name": "Domaine Carneros Brut", "varietal": "Sparkling Wine", "price": "$30-35", "description": "California traditional-method sparkling", "rating": 4.1, "food_pairing": "oysters appetizers fried food"},
+    {"name": "Graham's Six Grapes Reserve Port", "varietal": "Port", "price": "$22-26", "description": "Rich ruby Port with blackberry", "rating": 4.1, "food_pairing": "chocolate blue cheese dessert"},
+    {"name": "Lustau Papirusa Manzanilla", "varietal": "Sherry", "price": "$15-18", "description": "Saline, nutty dry sherry", "rating": 4.1, "food_pairing": "tapas olives almonds ham"},
+    {"name": "Blandy's 5 Year Malmsey Madeira", "varietal": "Madeira", "price": "$25-30", "description": "Caramel and orange-peel Madeira", "rating": 4.1, "food_pairing": "dessert cheese nuts"},
+    {"name": "Florio Marsala Superiore Dolce", "varietal": "Marsala", "price": "$15-18", "description": "Sweet Sicilian fortified wine", "rating": 3.8, "food_pairing": "dessert tiramisu cheese"},
+    {"name": "Inniskillin Vidal Icewine", "varietal": "Ice Wine", "price": "$50-55", "description": "Luscious Canadian icewine", "rating": 4.3, "food_pairing": "dessert fruit tart blue cheese"},
+    {"name": "Badia a Coltibuono Vin Santo", "varietal": "Vin Santo", "price": "$35-40", "description": "Tuscan dessert wine with dried apricot", "rating": 4.1, "food_pairing": "cantucci biscotti dessert"},
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wines (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    varietal TEXT NOT NULL,
+    varietal_key TEXT NOT NULL,
+    description TEXT,
+    food_pairing TEXT,
+    price_label TEXT,
+    price_low REAL,
+    price_high REAL,
+    rating REAL,
+    region TEXT,
+    link TEXT
+);
+CREATE INDEX IF NOT EXISTS wines_varietal_price ON wines (varietal_key, price_low);
+CREATE INDEX IF NOT EXISTS wines_varietal_rating ON wines (varietal_key, rating DESC);
+CREATE VIRTUAL TABLE IF NOT EXISTS wines_fts USING fts5(
+    name, varietal, description, food_pairing, content='wines', content_rowid='id'
+);
+"""
+
+
+def parse_price(value) -> Tuple[Optional[float], Optional[float], str]:
+    """Turn "$18-22", "18.5" or 18.5 into (low, high, label)."""
+    if value is None or value == "":
+        return None, None, "N/A"
+    if isinstance(value, (int, float)):
+        return float(value), float(value), f"${value:g}"
+    numbers = [float(n) for n in re.findall(r"\d+(?:\.\d+)?", str(value))]
+    if not numbers:
+        return None, None, str(value)
+    return numbers[0], numbers[-1], str(value)
+
+
+def _match_query(text: str) -> Optional[str]:
+    """FTS5 query matching any word of free text (quoted so user text can't inject syntax)."""
+    words = re.findall(r"[^\W_]{3,}", text.lower())
+    if not words:
+        return None
+    return " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+
+
+class WineCatalog:
+    """SQLite-backed bottle catalog with indexed varietal/price/rating filters
+    and full-text food pairing search."""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+        self._varietals: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM wines").fetchone()[0]
+
+    def import_rows(self, rows: Iterable[Dict], batch_size: int = 5000) -> int:
+        """Insert bottles from dicts; returns how many were added."""
+        added = 0
+        batch = []
+        with self._lock:
+            for row in rows:
+                if not row.get("name") or not row.get("varietal"):
+                    continue
+                low, high, label = parse_price(row.get("price"))
+                rating = row.get("rating")
+                batch.append((
+                    row["name"], row["varietal"], row["varietal"].strip().lower(),
+                    row.get("description", ""), row.get("food_pairing", ""),
+                    label, low, high, float(rating) if rating not in (None, "") else None,
+                    row.get("region", ""), row.get("link", ""),
+                ))
+                if len(batch) >= batch_size:
+                    added += self._insert(batch)
+                    batch = []
+            if batch:
+                added += self._insert(batch)
+            self._conn.commit()
+            self._varietals = None
+        return added
+
+    def _insert(self, batch) -> int:
+        cursor = self._conn.cursor()
+        start = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM wines").fetchone()[0]
+        cursor.executemany(
+            "INSERT INTO wines (name, varietal, varietal_key, description, food_pairing, "
+            "price_label, price_low, price_high, rating, region, link) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+        cursor.execute(
+            "INSERT INTO wines_fts (rowid, name, varietal, description, food_pairing) "
+            "SELECT id, name, varietal, description, food_pairing FROM wines WHERE id > ?",
+            (start,)
+        )
+        return len(batch)
+
+    def import_csv(self, path: str) -> int:
+        with open(path, newline="", encoding="utf-8") as f:
+            return self.import_rows(csv.DictReader(f))
+
+    def import_jsonl(self, path: str) -> int:
+        with open(path, encoding="utf-8") as f:
+            return self.import_rows(json.loads(line) for line in f if line.strip())
+
+    def import_file(self, path: str) -> int:
+        if str(path).lower().endswith(".csv"):
+            return self.import_csv(path)
+        return self.import_jsonl(path)
+
+    def varietals(self) -> List[str]:
+        """Distinct varietal keys in the catalog (cached until the next import)."""
+        if self._varietals is None:
+            with self._lock:
+                rows = self._conn.execute("SELECT DISTINCT varietal_key FROM wines").fetchall()
+            # Longest first so "cabernet sauvignon" wins over "sauvignon"
+            self._varietals = sorted((r[0] for r in rows), key=len, reverse=True)
+        return self._varietals
+
+    def resolve_varietal(self, wine_type: str) -> Optional[str]:
+        """Catalog varietal key for a wine type, allowing it to be mentioned in a longer phrase."""
+        key = wine_type.strip().lower()
+        varietals = self.varietals()
+        if key in varietals:
+            return key
+        for varietal in varietals:
+            if varietal in key:
+                return varietal
+        return None
+
+    def search(self, varietal: Optional[str] = None, food: Optional[str] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               min_rating: Optional[float] = None, limit: int = 3) -> List[Dict]:
+        """Best bottles for the filters; food pairing ranks matches, else rating does."""
+        filters, params = [], []
+        key = None
+        if varietal is not None:
+            key = self.resolve_varietal(varietal)
+            if key is None:
+                return []
+            filters.append("w.varietal_key = ?")
+            params.append(key)
+        # Unpriced bottles ("N/A") can't be ruled out by a price bound
+        if max_price is not None:
+            filters.append("(w.price_low IS NULL OR w.price_low <= ?)")
+            params.append(max_price)
+        if min_price is not None:
+            filters.append("(w.price_high IS NULL OR w.price_high >= ?)")
+            params.append(min_price)
+        if min_rating is not None:
+            filters.append("w.rating >= ?")
+            params.append(min_rating)
+        where = " AND ".join(filters) or "1"
+
+        match = _match_query(food) if food else None
+        if match and key is not None:
+            # Let the full-text index intersect varietal and food terms in one pass
+            phrase = key.replace('"', '""')
+            match = f'varietal : "{phrase}" AND ({match})'
+        with self._lock:
+            rows = []
+            if match:
+                rows = self._conn.execute(
+                    f"SELECT w.* FROM wines_fts JOIN wines w ON w.id = wines_fts.rowid "
+                    f"WHERE wines_fts MATCH ? AND {where} "
+                    f"ORDER BY bm25(wines_fts), w.rating DESC LIMIT ?",
+                    [match] + params + [limit]
+                ).fetchall()
+            if len(rows) < limit:
+                # Top up with the best-rated bottles that fit the filters
+                seen = [r["id"] for r in rows]
+                exclude = f" AND w.id NOT IN ({','.join('?' * len(seen))})" if seen else ""
+                rows += self._conn.execute(
+                    f"SELECT w.* FROM wines w WHERE {where}{exclude} "
+                    f"ORDER BY w.rating DESC LIMIT ?",
+                    params + seen + [limit - len(rows)]
+                ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        return {
+            "name": row["name"],
+            "varietal": row["varietal"],
+            "price": row["price_label"],
+            "description": row["description"] or "",
+            "rating": row["rating"] or 0,
+            "region": row["region"] or "",
+            "link": row["link"] or "",
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_catalogs: Dict[str, WineCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: Optional[str] = None) -> WineCatalog:
+    """Process-wide catalog for a file, opened once; the curated bottles if no path."""
+    key = path or ""
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            if path:
+                catalog = WineCatalog(path)
+            else:
+                catalog = WineCatalog()
+                catalog.import_rows(CURATED_WINES)
+            _catalogs[key] = catalog
+        return catalog
+
+
+def main(argv=None) -> int:
+    args = argv if argv is not None else sys.argv[1:]
+    if len(args) < 2:
+        print("Usage: python -m src.wine_catalog CATALOG.sqlite3 FILE.csv|FILE.jsonl ...")
+        return 2
+    catalog = WineCatalog(args[0])
+    for path in args[1:]:
+        print(f"{path}: imported {catalog.import_file(path)} bottles")
+    print(f"{args[0]}: {len(catalog)} bottles")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Shared test doubles (no live LLM needed)."""
+import sys
+from pathlib import Path
+from typing import NamedTuple, Optional
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.fake_client import FakeLLMClient
+from src.personas import PERSONAS
+from src.prompt_builder import Messages
+
+
+class Asked(NamedTuple):
+    """Who a prompt speaks as and what it asks; persona is None for fused prompts."""
+    persona: Optional[str]
+    customer: str
+    dish: str
+
+
+def asked(messages: Messages) -> Asked:
+    system = messages[0]["content"] if messages[0]["role"] == "system" else ""
+    persona = next((key for key, p in PERSONAS.items() if system.startswith(p.role)), None)
+    customer, _, dish = messages[-1]["content"].partition(" asks: ")
+    return Asked(persona, customer.replace("Customer ", "", 1), dish)
+
+
+def _resolve(value, messages: Messages):
+    if isinstance(value, dict):
+        persona = asked(messages).persona
+        value = value[persona] if persona in value else value.get("*")
+    if callable(value):
+        value = value(asked(messages))
+    if isinstance(value, BaseException):
+        raise value
+    return value
+
+
+@pytest.fixture
+def fake_client():
+    """Factory for FakeLLMClients that answer depending on the persona, customer or dish.
+
+    ``reply`` and ``delay`` may be a value, a function of the prompt's Asked,
+    or a dict of either keyed by persona ("*" for the rest). An exception as
+    the reply is raised, like a failing backend. Without ``reply`` the fake
+    generates its usual answer.
+    """
+    def make(*args, reply=None, delay=0.0, **kwargs) -> FakeLLMClient:
+        return FakeLLMClient(
+            *args,
+            reply=None if reply is None else lambda messages: _resolve(reply, messages),
+            delay=lambda messages: _resolve(delay, messages),
+            **kwargs
+        )
+    return make
@@ -0,0 +1,53 @@
+"""Tests for the asyncio recommendation API (no live LLM needed)."""
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.fake_client import FakeLLMClient
+from src.personas import PERSONAS
+from src.sommelier import WineSommelier
+
+
+def test_arecommend_uses_achat():
+    sommelier = WineSommelier(llm_client=FakeLLMClient(reply="Try a Chardonnay.", delay=0.01))
+
+    response = asyncio.run(sommelier.arecommend("Test User", "Roast chicken", "professional"))
+
+    assert response == "Try a Chardonnay."
+    assert len(sommelier.conversation_history) == 1
+
+
+def test_arecommend_falls_back_to_blocking_chat():
+    # A client with only the blocking chat()
+    client = SimpleNamespace(chat=lambda prompt: "Try a Merlot.")
+    sommelier = WineSommelier(llm_client=client)
+
+    response = asyncio.run(sommelier.arecommend("Test User", "Beef stew", "professional"))
+
+    assert response == "Try a Merlot."
+
+
+def test_acompare_personas_runs_concurrently():
+    client = FakeLLMClient(reply="Try a Chardonnay.", delay=0.3)
+    sommelier = WineSommelier(llm_client=client)
+
+    start = time.perf_counter()
+    results = asyncio.run(sommelier.acompare_personas("Test User", "Grilled chicken"))
+    elapsed = time.perf_counter() - start
+
+    assert list(results.keys()) == list(PERSONAS.keys())
+    assert client.peak == len(PERSONAS)
+    assert elapsed < 1.0
+
+
+def test_acompare_personas_bounded_concurrency():
+    client = FakeLLMClient(reply="Try a Chardonnay.", delay=0.05)
+    sommelier = WineSommelier(llm_client=client)
+
+    asyncio.run(sommelier.acompare_personas("Test User", "Tacos", max_concurrency=2))
+
+    assert client.peak == 2
@@ -0,0 +1,111 @@
+"""Offline micro-benchmarks for the recommendation pipeline.
+
+Opt-in, since timings depend on the machine:
+
+    RUN_BENCHMARKS=1 python -m pytest tests/test_benchmarks.py
+    RUN_BENCHMARKS=1 UPDATE_BENCHMARKS=1 python -m pytest tests/test_benchmarks.py  # new baseline
+
+A benchmark fails when it is more than BENCHMARK_THRESHOLD (default 0.25,
+i.e. 25%) and more than BENCHMARK_FLOOR seconds (default 0.00002, 20us)
+slower than tests/benchmark_baseline.json. A slow result is timed again,
+up to BENCHMARK_ATTEMPTS (default 3) times in all, and the fastest counts:
+noise comes in bursts, while a real regression is slow every time.
+Record a baseline on an idle machine.
+"""
+import os
+import sys
+from pathlib import Path
+from typing import Callable
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.benchmark import load_baseline, measure, regressions, save_baseline
+from src.fake_client import FakeLLMClient
+from src.personas import PERSONAS
+from src.prompt_builder import PromptBuilder
+from src.sommelier import WineSommelier
+from src.wine_api import WineDatabase
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks"
+)
+
+BASELINE = Path(__file__).parent / "benchmark_baseline.json"
+THRESHOLD = float(os.getenv("BENCHMARK_THRESHOLD", "0.25"))
+FLOOR = float(os.getenv("BENCHMARK_FLOOR", "0.00002"))
+ATTEMPTS = int(os.getenv("BENCHMARK_ATTEMPTS", "3"))
+DISH = "Pan-seared duck breast with cherry reduction, roasted root vegetables and thyme"
+RESPONSE = (
+    "Darling, for duck with cherry you want something with bright acidity and silky "
+    "tannins. " * 8 + "My pick is a Burgundy Pinot Noir, though a Beaujolais would also sing."
+)
+
+
+class NoSpoonacular:
+    """Keeps benchmarks off the network whatever keys the environment has."""
+
+    def recommend(self, wine_type, max_price):
+        return []
+
+
+def check(name: str, run: Callable[[], float]) -> None:
+    """Compare the seconds ``run`` measures with the baseline (or record them)."""
+    seconds = run()
+    baseline = load_baseline(BASELINE)
+    if os.getenv("UPDATE_BENCHMARKS"):
+        baseline[name] = seconds
+        save_baseline(BASELINE, baseline)
+        return
+    slow = regressions({name: seconds}, baseline, THRESHOLD, FLOOR)
+    for _ in range(ATTEMPTS - 1):
+        if not slow:
+            break
+        seconds = min(seconds, run())
+        slow = regressions({name: seconds}, baseline, THRESHOLD, FLOOR)
+    assert not slow, slow[0]
+
+
+def test_bench_prompt_build():
+    builder = PromptBuilder()
+    persona = PERSONAS["professional"]
+    check("prompt_build", lambda: measure(lambda: builder.build(persona, "Sarah", DISH)))
+
+
+def test_bench_recommend():
+    sommelier = WineSommelier(llm_client=FakeLLMClient())
+    check("recommend", lambda: measure(
+        lambda: sommelier.recommend("Sarah", DISH, "professional", save_response=False)
+    ))
+
+
+def test_bench_compare_personas():
+    # Each persona takes ~22ms on the scaled GPU profile; run concurrently the
+    # whole comparison should cost about one of them
+    sommelier = WineSommelier(llm_client=FakeLLMClient("ollama_gpu", time_scale=0.01))
+    check("compare_personas", lambda: measure(
+        lambda: sommelier.compare_personas("Sarah", DISH), number=3, repeat=5
+    ))
+
+
+def test_bench_compare_personas_fused():
+    # One call carrying all six replies: on this fake (where concurrent
+    # requests overlap for free) it loses to fan-out; run the CLI's
+    # --compare both against a real server to see which wins there
+    sommelier = WineSommelier(llm_client=FakeLLMClient("ollama_gpu", time_scale=0.01))
+    check("compare_personas_fused", lambda: measure(
+        lambda: sommelier.compare_personas("Sarah", DISH, mode="fused"), number=3, repeat=5
+    ))
+
+
+def test_bench_extract_wine_type():
+    sommelier = WineSommelier(llm_client=FakeLLMClient())
+    check("extract_wine_type", lambda: measure(lambda: sommelier._extract_wine_type(RESPONSE)))
+
+
+def test_bench_search_and_format_bottles():
+    db = WineDatabase(spoonacular=NoSpoonacular())
+    check("search_and_format_bottles", lambda: measure(
+        lambda: db.format_bottle_recommendations(db.search_wines("Pinot Noir", DISH, max_price=40))
+    ))
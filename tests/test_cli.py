@@ -0,0 +1,144 @@
+"""Tests for the command line batch mode (no live LLM needed)."""
+import importlib.util
+import json
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.fake_client import FakeLLMClient
+
+spec = importlib.util.spec_from_file_location("cli", Path(__file__).parent.parent / "app" / "cli.py")
+cli = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cli)
+
+
+def pairing(asked):
+    return f"Pair {asked.dish} with a Riesling."
+
+
+def staggered(asked):
+    # Later rows finish first, to exercise reordering
+    return 0.05 if "0" in asked.dish else 0.01
+
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows))
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_batch_writes_results_in_input_order(tmp_path, monkeypatch, fake_client):
+    client = fake_client(reply=pairing, delay=staggered)
+    monkeypatch.setattr(cli, "build_client", lambda args: client)
+    source = tmp_path / "menu.jsonl"
+    write_jsonl(source, [{"name": "Ann", "dish": f"dish {i}"} for i in range(10)])
+    output = tmp_path / "out.jsonl"
+
+    status = cli.main(["--batch", str(source), "--workers", "4", "--output", str(output)])
+
+    results = read_jsonl(output)
+    assert status == 0
+    assert [r["index"] for r in results] == list(range(10))
+    assert results[3]["response"] == "Pair dish 3 with a Riesling."
+
+
+def test_batch_resume_skips_finished_rows(tmp_path, monkeypatch, fake_client):
+    client = fake_client(reply=pairing, delay=staggered)
+    monkeypatch.setattr(cli, "build_client", lambda args: client)
+    source = tmp_path / "menu.csv"
+    source.write_text("name,dish,persona\n" + "".join(f"Ann,dish {i},valley_girl\n" for i in range(6)))
+    output = tmp_path / "out.jsonl"
+    (tmp_path / "out.jsonl.ckpt").write_text("0\n1\n2\n")
+
+    cli.main(["--batch", str(source), "--output", str(output), "--resume", "--order", "completion"])
+
+    results = read_jsonl(output)
+    assert client.calls == 3
+    assert sorted(r["index"] for r in results) == [3, 4, 5]
+    assert all(r["persona"] == "valley_girl" for r in results)
+
+
+def test_batch_resume_retries_failed_rows(tmp_path, monkeypatch, fake_client):
+    down = {"dish 1"}
+
+    def flaky(asked):
+        if asked.dish in down:
+            return "Error: Ollama is not running"
+        return pairing(asked)
+
+    client = fake_client(reply=flaky, delay=staggered)
+    monkeypatch.setattr(cli, "build_client", lambda args: client)
+    source = tmp_path / "menu.jsonl"
+    write_jsonl(source, [{"name": "Ann", "dish": f"dish {i}"} for i in range(3)])
+    output = tmp_path / "out.jsonl"
+
+    assert cli.main(["--batch", str(source), "--output", str(output)]) == 1
+    assert sorted((tmp_path / "out.jsonl.ckpt").read_text().split()) == ["0", "2"]
+
+    down.clear()
+    assert cli.main(["--batch", str(source), "--output", str(output), "--resume"]) == 0
+
+    retried = read_jsonl(output)[3:]
+    assert [(r["index"], r["error"]) for r in retried] == [(1, None)]
+    # Three rows, then only the failed one again
+    assert client.calls == 4
+
+
+def test_batch_records_bad_rows_as_errors(tmp_path, monkeypatch, fake_client):
+    monkeypatch.setattr(cli, "build_client", lambda args: fake_client(reply=pairing, delay=staggered))
+    source = tmp_path / "menu.jsonl"
+    write_jsonl(source, [{"dish": "steak", "persona": "nobody"}, {"name": "Bo"}])
+    output = tmp_path / "out.jsonl"
+
+    status = cli.main(["--batch", str(source), "--output", str(output)])
+
+    results = read_jsonl(output)
+    assert status == 1
+    assert "Unknown persona" in results[0]["error"]
+    assert "no dish" in results[1]["error"]
+
+
+def test_batch_reports_malformed_lines_and_keeps_going(tmp_path, monkeypatch, fake_client):
+    client = fake_client(reply=pairing, delay=staggered)
+    monkeypatch.setattr(cli, "build_client", lambda args: client)
+    source = tmp_path / "menu.jsonl"
+    source.write_text('{"dish": "dish 1"}\n{"dish": \n["dish 2"]\n{"dish": "dish 4"}\n')
+    output = tmp_path / "out.jsonl"
+
+    status = cli.main(["--batch", str(source), "--output", str(output)])
+
+    results = read_jsonl(output)
+    assert status == 1
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert "line 2" in results[1]["error"]
+    assert "JSON object" in results[2]["error"]
+    assert results[3]["response"] == "Pair dish 4 with a Riesling."
+    assert client.calls == 2
+
+
+def test_resume_to_stdout_needs_a_checkpoint(tmp_path, monkeypatch, capsys, fake_client):
+    client = fake_client(reply=pairing, delay=staggered)
+    monkeypatch.setattr(cli, "build_client", lambda args: client)
+    source = tmp_path / "menu.jsonl"
+    write_jsonl(source, [{"dish": "dish 1"}])
+
+    assert cli.main(["--batch", str(source), "--resume"]) == 2
+    assert "--checkpoint" in capsys.readouterr().err
+    assert client.calls == 0
+
+
+def test_compare_both_modes(monkeypatch, capsys):
+    client = FakeLLMClient()
+    monkeypatch.setattr(cli, "build_client", lambda args: client)
+
+    status = cli.main(["--dish", "Roast lamb", "--compare", "both"])
+
+    out, err = capsys.readouterr()
+    assert status == 0
+    assert "===== fanout" in out and "===== fused" in out
+    assert "fanout" in err and "fused" in err
+    # Six fan-out calls plus one fused call
+    assert client.calls == 7
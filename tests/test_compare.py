@@ -0,0 +1,57 @@
+"""Tests for concurrent persona comparison (no live LLM needed)."""
+import sys
+import time
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.personas import PERSONAS
+from src.sommelier import WineSommelier
+
+
+def test_compare_runs_concurrently_in_persona_order(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(reply="Try a Pinot Noir.", delay=0.3))
+
+    start = time.perf_counter()
+    results = sommelier.compare_personas("Test User", "Grilled chicken")
+    elapsed = time.perf_counter() - start
+
+    assert list(results.keys()) == list(PERSONAS.keys())
+    assert all(r == "Try a Pinot Noir." for r in results.values())
+    # Six personas at 0.3s each would take 1.8s serially
+    assert elapsed < 1.0
+
+
+def test_compare_partial_results_on_timeout_and_failure(fake_client):
+    client = fake_client(reply={"valley_girl": RuntimeError("backend exploded"), "*": "Try a Pinot Noir."},
+                         delay={"rick_sanchez": 5.0, "*": 0.05})
+    sommelier = WineSommelier(llm_client=client)
+
+    start = time.perf_counter()
+    results = sommelier.compare_personas("Test User", "Grilled chicken", timeout=0.5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2.0
+    assert results["rick_sanchez"].startswith("Error:")
+    assert "timed out" in results["rick_sanchez"]
+    assert results["valley_girl"] == "Error: backend exploded"
+    assert results["professional"] == "Try a Pinot Noir."
+
+
+def test_iter_compare_yields_as_completed(fake_client):
+    client = fake_client(delay={"professional": 0.4, "*": 0.05})
+    sommelier = WineSommelier(llm_client=client)
+
+    order = [r.persona for r in sommelier.iter_compare_personas("Test User", "Steak")]
+
+    assert sorted(order) == sorted(PERSONAS.keys())
+    assert order[-1] == "professional"
+
+
+def test_fractional_timeout_is_reported_as_given(fake_client):
+    client = fake_client(delay={"professional": 2.0, "*": 0.01})
+    sommelier = WineSommelier(llm_client=client)
+
+    results = {r.persona: r for r in sommelier.iter_compare_personas("Test User", "Steak", timeout=0.25)}
+
+    assert results["professional"].error == f"Error: {PERSONAS['professional'].name} timed out after 0.25s"
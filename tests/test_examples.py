@@ -4,6 +4,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from src.personas import PERSONAS
 from src.sommelier import WineSommelier
 
 def test_basic_recommendation():
@@ -30,7 +31,7 @@ def test_all_personas():
         "Grilled chicken"
     )
     
-    assert len(results) == 3  # professional, valley_girl, rick_sanchez
+    assert len(results) == len(PERSONAS)
     for persona, response in results.items():
         assert response is not None
         print(f"✓ {persona} persona works")
@@ -0,0 +1,66 @@
+"""Tests for the deterministic fake LLM client and benchmark helpers."""
+import asyncio
+import sys
+import time
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.benchmark import regressions
+from src.fake_client import FakeLLMClient, LatencyProfile
+from src.sommelier import WineSommelier
+
+
+def test_replies_are_deterministic_per_prompt_and_seed():
+    prompt = [{"role": "system", "content": "You are a sommelier"},
+              {"role": "user", "content": "Customer Ann asks: roast duck"}]
+    first, second = FakeLLMClient(), FakeLLMClient()
+    assert first.chat(prompt) == second.chat(prompt)
+    assert "roast duck" in first.chat(prompt)
+    assert "".join(first.stream(prompt)) == first.chat(prompt)
+    assert asyncio.run(first.achat(prompt)) == first.chat(prompt)
+    assert first.calls == 6
+    assert first.usage.completion_tokens == 6 * 120
+
+
+def test_latency_profile_is_applied():
+    client = FakeLLMClient(LatencyProfile(first_token=0.02, tokens_per_second=1000, completion_tokens=20))
+    start = time.perf_counter()
+    client.chat("hi")
+    assert 0.04 <= time.perf_counter() - start < 0.5
+
+
+def test_pinned_reply_delay_and_recording():
+    def reply(messages):
+        if "boom" in messages[-1]["content"]:
+            raise ConnectionError("backend down")
+        return "Try a Rioja."
+
+    client = FakeLLMClient(reply=reply, delay=lambda messages: 0.05)
+    assert list(client.stream("paella")) == ["Try ", "a ", "Rioja."]
+
+    async def together():
+        return await asyncio.gather(*(client.achat("paella") for _ in range(3)))
+
+    assert asyncio.run(together()) == ["Try a Rioja."] * 3
+    with pytest.raises(ConnectionError):
+        client.chat("boom")
+    assert client.calls == 5
+    assert client.peak == 3 and client.in_flight == 0
+    assert client.prompts[-1] == [{"role": "user", "content": "boom"}]
+
+
+def test_sommelier_runs_offline_on_fake_client():
+    sommelier = WineSommelier(llm_client=FakeLLMClient())
+    response = sommelier.recommend("Ann", "grilled salmon", "professional")
+    assert sommelier._extract_wine_type(response) is not None
+
+
+def test_regressions_threshold():
+    baseline = {"a": 1.0, "b": 1.0}
+    assert regressions({"a": 1.2, "b": 0.5, "c": 9.0}, baseline, threshold=0.25) == []
+    assert regressions({"a": 1.3}, baseline, threshold=0.25) == ["a: 1300000.0us vs baseline 1000000.0us (+30%)"]
+    # Within the absolute floor: jitter on a microsecond-scale step
+    assert regressions({"a": 1.3}, baseline, threshold=0.25, floor=0.5) == []
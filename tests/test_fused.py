@@ -0,0 +1,109 @@
+"""Tests for the fused single-call persona comparison."""
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.fake_client import FakeLLMClient
+from src.fused import END_MARKER, fused_prompt, listed_personas, parse_fused_response
+from src.generation import DEFAULT_NUM_CTX, estimate_tokens
+from src.personas import PERSONAS
+from src.sommelier import WineSommelier
+
+KEYS = list(PERSONAS.keys())
+# Single-persona calls answer with the persona's key; fused ones (persona None) are scripted per test
+SINGLE = {key: f"single {key}" for key in KEYS}
+
+
+def test_parse_delimited_reply():
+    text = (
+        "Sure! Here you go.\n"
+        "=== professional ===\nGood evening, Ann. A Barolo.\n\n"
+        "**=== [valley_girl] ===**\nOMG, like, rosé!\n"
+        "=== rick_sanchez ===\n\n"
+        "=== not_a_persona ===\nignored\n"
+        "=== END ===\n"
+    )
+    assert parse_fused_response(text, KEYS) == {
+        "professional": "Good evening, Ann. A Barolo.",
+        "valley_girl": "OMG, like, rosé!",
+    }
+
+
+def test_parse_leaves_out_unclosed_last_reply():
+    text = "=== professional ===\nA Barolo.\n=== valley_girl ===\nOMG, like, a ro"
+    assert parse_fused_response(text, KEYS) == {"professional": "A Barolo."}
+
+
+def test_parse_json_reply():
+    text = 'Here:\n{"professional": "A Barolo.", "yoga_teacher": "", "other": "x"}'
+    assert parse_fused_response(text, KEYS) == {"professional": "A Barolo."}
+    assert parse_fused_response("no structure at all", KEYS) == {}
+
+
+def test_fused_prompt_fits_shared_context():
+    messages, profile = fused_prompt(PERSONAS, "Ann", "Duck confit")
+    assert listed_personas(messages) == KEYS
+    assert profile.num_ctx == DEFAULT_NUM_CTX
+    prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+    assert prompt_tokens + profile.max_tokens <= DEFAULT_NUM_CTX
+
+
+def test_fused_compare_uses_one_call(fake_client):
+    reply = "".join(f"=== {key} ===\nfused {key}\n\n" for key in KEYS) + END_MARKER
+    client = fake_client(reply={None: reply, **SINGLE})
+    sommelier = WineSommelier(llm_client=client)
+
+    results = sommelier.compare_personas("Ann", "Duck confit", mode="fused")
+
+    assert list(results) == KEYS
+    assert results == {key: f"fused {key}" for key in KEYS}
+    assert len(client.prompts) == 1
+    assert client.profiles[0].max_tokens > PERSONAS["professional"].generation.max_tokens
+
+
+def test_missing_personas_fall_back_to_own_calls(fake_client):
+    fused = "=== professional ===\nfused professional\n=== rick_sanchez ===\nfused rick\n" + END_MARKER
+    client = fake_client(reply={None: fused, **SINGLE})
+    sommelier = WineSommelier(llm_client=client)
+
+    results = sommelier.compare_personas("Ann", "Duck confit", mode="fused")
+
+    assert results["professional"] == "fused professional"
+    assert results["rick_sanchez"] == "fused rick"
+    assert results["valley_girl"] == "single valley_girl"
+    assert len(client.prompts) == 1 + len(KEYS) - 2
+
+
+def test_truncated_last_persona_falls_back(fake_client):
+    # max_tokens ran out inside the last reply, before the end marker
+    fused = "=== professional ===\nfused professional\n\n=== valley_girl ===\nOMG, like, totally try a"
+    client = fake_client(reply={None: fused, **SINGLE})
+    sommelier = WineSommelier(llm_client=client)
+
+    results = sommelier.compare_personas("Ann", "Duck confit", ["professional", "valley_girl"],
+                                         mode="fused")
+
+    assert results == {"professional": "fused professional", "valley_girl": "single valley_girl"}
+    assert len(client.prompts) == 2
+
+
+def test_failed_fused_call_falls_back_entirely(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(reply={None: "Error: connection refused", **SINGLE}))
+    results = sommelier.compare_personas("Ann", "Duck confit", ["professional", "valley_girl"],
+                                         mode="fused")
+    assert results == {"professional": "single professional", "valley_girl": "single valley_girl"}
+
+
+def test_fake_client_answers_fused_prompts():
+    sommelier = WineSommelier(llm_client=FakeLLMClient())
+    results = sommelier.compare_personas("Ann", "Duck confit", mode="fused")
+    assert sommelier.llm.calls == 1
+    assert all("Duck confit" in response for response in results.values())
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        WineSommelier(llm_client=FakeLLMClient()).compare_personas("Ann", "Duck", mode="batched")
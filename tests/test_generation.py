@@ -0,0 +1,73 @@
+"""Tests for per-persona generation profiles and prompt trimming."""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.fake_client import FakeLLMClient
+from src.generation import (
+    DEFAULT_NUM_CTX, GenerationProfile, estimate_tokens, groq_params, ollama_options, trim_to_tokens
+)
+from src.personas import PERSONAS
+from src.response_cache import LRUCache
+from src.sommelier import WineSommelier
+
+
+def test_backend_parameters():
+    profile = GenerationProfile(max_tokens=300, temperature=0.9, stop=("\nCustomer ",))
+    assert ollama_options(profile) == {
+        "temperature": 0.9, "num_predict": 300, "num_ctx": DEFAULT_NUM_CTX, "stop": ["\nCustomer "],
+    }
+    assert ollama_options(profile, temperature=0.2)["temperature"] == 0.2
+    assert groq_params(profile) == {"temperature": 0.9, "max_tokens": 300, "stop": ["\nCustomer "]}
+    assert "stop" not in groq_params()
+
+
+def test_personas_share_one_context_size():
+    # A different num_ctx would make Ollama reload the model between personas
+    assert {p.generation.num_ctx for p in PERSONAS.values()} == {DEFAULT_NUM_CTX}
+
+
+def test_trim_to_tokens():
+    dish = " ".join(["braised short ribs"] * 200)
+    trimmed = trim_to_tokens(dish, 50)
+    assert estimate_tokens(trimmed) <= 50
+    assert trimmed.endswith(" …")
+    assert dish.startswith(trimmed[:-2])
+    assert trim_to_tokens("Grilled salmon", 50) == "Grilled salmon"
+
+
+def test_sommelier_passes_persona_profile():
+    client = FakeLLMClient()
+    WineSommelier(llm_client=client).recommend("Ann", "Tacos", "valley_girl", save_response=False)
+    assert client.profiles[0] == PERSONAS["valley_girl"].generation
+
+    # Clients without profile support are called as before
+    plain = SimpleNamespace(chat=lambda prompt: "A crisp Riesling.")
+    response = WineSommelier(llm_client=plain).recommend("Ann", "Tacos", "rick_sanchez",
+                                                         save_response=False)
+    assert response == "A crisp Riesling."
+
+
+def test_long_dish_is_trimmed_before_the_model():
+    client = FakeLLMClient()
+    dish = "Lasagna with " + "extra cheese, " * 500
+    WineSommelier(llm_client=client).recommend("Ann", dish, "professional", save_response=False)
+    user_turn = client.prompts[0][-1]["content"]
+    assert len(user_turn) < len(dish)
+    assert user_turn.startswith("Customer Ann asks: Lasagna with extra cheese,")
+
+
+def test_fake_client_honours_max_tokens():
+    client = FakeLLMClient()
+    client.chat("hi", profile=GenerationProfile(max_tokens=30))
+    assert client.usage.completion_tokens == 30
+
+
+def test_profile_is_part_of_the_cache_key():
+    sommelier = WineSommelier(llm_client=FakeLLMClient(), cache=LRUCache())
+    persona = PERSONAS["professional"]
+    key = sommelier._cache_key("Ann", "Tacos", persona)
+    longer = persona.__class__(**dict(vars(persona), generation=GenerationProfile(max_tokens=900)))
+    assert sommelier._cache_key("Ann", "Tacos", longer) != key
@@ -0,0 +1,39 @@
+"""Tests for the cached backend health probe."""
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.health import HealthProbe, ollama_check
+
+
+def test_probe_result_is_cached_until_interval():
+    now = [0.0]
+    calls = []
+    probe = HealthProbe(lambda: calls.append(1), interval=30, clock=lambda: now[0])
+
+    assert probe.is_healthy()
+    now[0] = 29
+    assert probe.is_healthy()
+    assert len(calls) == 1
+
+    now[0] = 30
+    probe.status()
+    assert len(calls) == 2
+    probe.status(refresh=True)
+    assert probe.probes == 3
+
+
+def test_probe_reports_failures():
+    def down():
+        raise ConnectionError("refused")
+
+    status = HealthProbe(down).status()
+    assert not status.ok
+    assert status.error == "ConnectionError: refused"
+    assert "unavailable" in str(status)
+
+
+def test_ollama_check_against_unreachable_host():
+    # Nothing listens on port 9 locally, so the check fails fast
+    assert not HealthProbe(ollama_check("http://127.0.0.1:9", timeout=0.5)).is_healthy()
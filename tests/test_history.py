@@ -0,0 +1,60 @@
+"""Tests for bounded and persisted interaction history."""
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.fake_client import FakeLLMClient
+from src.history import JSONLHistorySink, get_history_sink
+from src.sommelier import WineSommelier
+
+
+def test_history_is_bounded_and_persisted(tmp_path):
+    sink = JSONLHistorySink(str(tmp_path))
+    sommelier = WineSommelier(llm_client=FakeLLMClient(), history_size=3, history_sink=sink)
+
+    for i in range(5):
+        sommelier.recommend("Ann", f"dish {i}", "professional")
+
+    assert [h["dish"] for h in sommelier.conversation_history] == ["dish 2", "dish 3", "dish 4"]
+    sink.flush()
+    assert [r["dish"] for r in sink.iter_records()] == [f"dish {i}" for i in range(5)]
+    sink.close()
+
+
+def test_sink_rotates_by_size_and_streams_in_order(tmp_path):
+    sink = JSONLHistorySink(str(tmp_path), max_bytes=200)
+    for i in range(20):
+        sink.write({"timestamp": f"2024-01-01T00:00:{i:02d}", "i": i, "pad": "x" * 40})
+        sink.flush()
+
+    assert sink.stats()["rotations"] > 0
+    assert len(sink.files()) > 1
+    assert [r["i"] for r in sink.iter_records()] == list(range(20))
+    assert [r["i"] for r in sink.iter_records(since="2024-01-01T00:00:15")] == list(range(15, 20))
+    sink.close()
+    assert not sink.write({"i": 99})
+
+
+def test_sink_rotates_by_age(tmp_path):
+    sink = JSONLHistorySink(str(tmp_path), max_age=0)
+    sink.write({"i": 1})
+    sink.flush()
+    sink.write({"i": 2})
+    sink.close()
+    assert sink.stats()["rotations"] == 1
+    assert [r["i"] for r in JSONLHistorySink(str(tmp_path)).iter_records()] == [1, 2]
+
+
+def test_sommeliers_share_one_sink_per_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOMMELIER_HISTORY_DIR", str(tmp_path))
+    first = WineSommelier(llm_client=FakeLLMClient())
+    second = WineSommelier(llm_client=FakeLLMClient())
+    assert first.history_sink is second.history_sink is get_history_sink(str(tmp_path))
+
+    first.recommend("Ann", "dish 1", "professional")
+    second.recommend("Bob", "dish 2", "professional")
+    first.history_sink.close()
+    assert sorted(r["dish"] for r in JSONLHistorySink(str(tmp_path)).iter_records()) == ["dish 1", "dish 2"]
+    # A closed sink is replaced on the next request for it
+    assert get_history_sink(str(tmp_path)) is not first.history_sink
@@ -0,0 +1,42 @@
+"""Import-time budget for the core package (runs in a fresh interpreter)."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Cold import of the whole core library must stay under this (seconds)
+IMPORT_BUDGET = 0.5
+
+HEAVY_MODULES = ("streamlit", "requests", "ollama", "groq", "httpx", "numpy")
+
+SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import src.sommelier, src.prompt_builder, src.personas
+import src.llm_client, src.simple_client, src.cloud_client, src.wine_api
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_import():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_core_import_skips_heavy_dependencies():
+    result = measure_import()
+    assert result["loaded"] == []
+
+
+def test_core_import_within_budget():
+    # Best of three so one slow cold start on a busy machine doesn't fail the run
+    elapsed = min(measure_import()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET, f"core import took {elapsed:.3f}s (budget {IMPORT_BUDGET}s)"
@@ -0,0 +1,87 @@
+"""Tests for the metrics registry and scrape endpoint."""
+import sys
+import urllib.request
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.fake_client import FakeLLMClient
+from src.metrics import LLM_ERRORS, PHASE_SECONDS, REQUEST_ERRORS, REQUESTS, MetricsRegistry, serve_metrics
+from src.response_cache import LRUCache
+from src.sommelier import WineSommelier
+from src.usage import TokenUsage
+
+
+def test_counters_and_histograms_render_prometheus_text():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total", "Hits", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+    hits.inc(route="a")
+    hits.inc(2, route="a")
+    latency.observe(0.1, route="a")
+    latency.observe(5, route="a")
+
+    text = registry.render()
+    assert 'hits_total{route="a"} 3' in text
+    assert 'latency_seconds_bucket{route="a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="a"} 2' in text
+    assert registry.snapshot()["latency_seconds"]["route=a"]["sum"] == pytest.approx(5.1)
+    with pytest.raises(ValueError):
+        hits.inc(path="a")
+
+
+def test_bound_series_share_the_labelled_values():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total", "Hits", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",))
+    hits.labels(route="a").inc(2)
+    hits.inc(route="a")
+    with latency.labels(route="a").time():
+        pass
+
+    assert hits.value(route="a") == 3
+    assert latency.summary(route="a")["count"] == 1
+    with pytest.raises(ValueError):
+        hits.labels(path="a")
+
+
+def test_recommend_records_phases_and_sources():
+    client = FakeLLMClient(model="metrics-model")
+    sommelier = WineSommelier(llm_client=client, cache=LRUCache())
+    labels = {"persona": "professional", "model": "metrics-model"}
+
+    sommelier.recommend("Ann", "grilled salmon", "professional", include_bottles=True)
+    sommelier.recommend("Ann", "grilled salmon", "professional")
+
+    assert REQUESTS.value(source="llm", **labels) == 1
+    assert REQUESTS.value(source="cache", **labels) == 1
+    for phase in ("prompt_build", "llm_call", "varietal_extraction", "bottle_lookup"):
+        assert PHASE_SECONDS.summary(phase=phase, **labels)["count"] >= 1
+    assert "sommelier_phase_seconds" in sommelier.metrics()
+
+
+def test_friendly_error_messages_still_count_as_errors():
+    client = FakeLLMClient(model="sorry-model",
+                           reply="Sorry, I'm having trouble connecting. Please try again.")
+    WineSommelier(llm_client=client).recommend("Ann", "tacos", "professional")
+    assert REQUEST_ERRORS.value(persona="professional", model="sorry-model") == 1
+
+    usage = TokenUsage("groq", "err-model")
+    usage.record_error(TimeoutError())
+    assert LLM_ERRORS.value(backend="groq", model="err-model", error="TimeoutError") == 1
+    assert usage.snapshot()["errors"] == 1
+
+
+def test_scrape_endpoint():
+    registry = MetricsRegistry()
+    registry.counter("up_total", "Up").inc()
+    server = serve_metrics(port=0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+    assert "# TYPE up_total counter\nup_total 1" in body
@@ -0,0 +1,180 @@
+"""Tests for the multi-host Ollama client (uses several local stub servers)."""
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.ollama_pool import MultiHostLLMClient, keep_alive_seconds
+from src.sommelier import WineSommelier
+
+
+class StubHost:
+    """A fake Ollama server; ``status`` makes it fail, ``delay`` slows chats down."""
+
+    def __init__(self, name, delay=0.0, status=200, has_model=True):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.has_model = has_model
+        self.chats = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path == "/api/generate":
+                    if stub.has_model:
+                        self._reply(200, {"model": body["model"], "response": "H", "done": True})
+                    else:
+                        self._reply(404, {"error": "model not found"})
+                    return
+                with stub.lock:
+                    stub.chats += 1
+                    stub.in_flight += 1
+                    stub.peak = max(stub.peak, stub.in_flight)
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                if not stub.has_model:
+                    self._reply(404, {"error": f'model "{body["model"]}" not found, try pulling it first'})
+                elif stub.status != 200:
+                    self._reply(stub.status, {"error": "overloaded"})
+                else:
+                    self._reply(200, {"model": body["model"], "done": True,
+                                      "message": {"role": "assistant", "content": f"Try a Rioja from {stub.name}."}})
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    created = []
+
+    def make(*args, **kwargs):
+        stub = StubHost(*args, **kwargs)
+        created.append(stub)
+        return stub
+
+    yield make
+    for stub in created:
+        stub.close()
+
+
+def test_least_outstanding_spreads_concurrent_requests(stubs):
+    a, b = stubs("a", delay=0.2), stubs("b", delay=0.2)
+    client = MultiHostLLMClient([a.url, b.url])
+
+    with ThreadPoolExecutor(4) as pool:
+        replies = list(pool.map(client.chat, ["hi"] * 4))
+
+    assert all(r.startswith("Try a Rioja") for r in replies)
+    assert (a.chats, b.chats) == (2, 2)
+    assert a.peak == b.peak == 2
+
+
+def test_failing_host_fails_over_then_is_ejected(stubs):
+    bad, good = stubs("bad", status=500), stubs("good")
+    # No loaded-model preference, so only the breaker keeps traffic off the bad host
+    client = MultiHostLLMClient([bad.url, good.url], failure_threshold=2, cooldown=60, cold_penalty=0)
+
+    replies = [client.chat("hi") for _ in range(6)]
+
+    assert all(r == "Try a Rioja from good." for r in replies)
+    assert bad.chats == 2
+    stats = client.stats()
+    assert stats[bad.url]["state"] == "open"
+    assert stats[good.url]["requests"] == 6
+
+
+def test_all_hosts_down_returns_error(stubs):
+    down = stubs("down", status=503)
+    client = MultiHostLLMClient([down.url, "http://127.0.0.1:9"])
+    assert client.chat("hi").startswith("Error:")
+    assert client.usage.snapshot()["errors"] == 1
+
+
+def test_missing_model_fails_over_to_a_host_that_has_it(stubs):
+    bare, stocked = stubs("bare", has_model=False), stubs("stocked")
+    client = MultiHostLLMClient([bare.url, stocked.url], cold_penalty=0)
+
+    replies = [client.chat("hi") for _ in range(4)]
+
+    assert all(r == "Try a Rioja from stocked." for r in replies)
+    # Asked once, then passed over while the host is known not to have the model
+    assert bare.chats == 1
+    stats = client.stats()
+    assert stats[bare.url]["state"] == "closed"
+    assert stats[bare.url]["loaded"] == []
+
+
+def test_no_request_while_every_host_is_ejected_or_probing(stubs):
+    a, b = stubs("a"), stubs("b")
+    client = MultiHostLLMClient([a.url, b.url], failure_threshold=1, cooldown=60)
+    ejected, probing = client.hosts
+    ejected.breaker.record_failure()
+    probing.breaker.record_failure()
+    # Cooled down, with its single trial request still running
+    probing.breaker._opened_at -= 60
+    assert probing.breaker.allow()
+
+    reply = client.chat("hi")
+
+    assert reply.startswith("Error:") and "ejected" in reply
+    assert a.chats == b.chats == 0
+    assert client.usage.snapshot()["errors"] == 1
+
+
+def test_prefers_host_with_model_loaded(stubs):
+    cold, warm = stubs("cold", has_model=False), stubs("warm")
+    client = MultiHostLLMClient([cold.url, warm.url])
+
+    assert client.warm_up().ok
+    for _ in range(5):
+        client.chat("hi")
+
+    assert (cold.chats, warm.chats) == (0, 5)
+    assert client.stats()[warm.url]["loaded"] == ["llama3.2"]
+
+
+def test_works_behind_sommelier_with_streaming(stubs):
+    a, b = stubs("a"), stubs("b")
+    sommelier = WineSommelier(llm_client=MultiHostLLMClient([a.url, b.url]))
+
+    assert sommelier.recommend("Ann", "paella", "professional").startswith("Try a Rioja")
+    stream = sommelier.recommend_stream("Ann", "tapas", "professional")
+    assert "".join(stream).startswith("Try a Rioja")
+    assert a.chats + b.chats == 2
+
+
+def test_keep_alive_seconds():
+    assert keep_alive_seconds("30m") == 1800
+    assert keep_alive_seconds("1h") == 3600
+    assert keep_alive_seconds(90) == 90
+    assert keep_alive_seconds(None) == 300
@@ -0,0 +1,150 @@
+"""Tests for the file-based persona registry."""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.fake_client import FakeLLMClient
+from src.personas import BUILTIN_PERSONAS, PersonaLoadError, PersonaRegistry
+from src.prompt_builder import PromptBuilder
+from src.sommelier import WineSommelier
+
+BISTRO = {
+    "name": "Bistro Sommelier",
+    "role": "You are the sommelier of a small Lyon bistro.",
+    "instruction": "Recommend one affordable French wine.",
+    "output_format": "1. Greeting\n2. One wine\n3. Farewell",
+    "context": "The list is all Rhône and Beaujolais.",
+    "generation": {"max_tokens": 200, "stop": ["\nCustomer "]},
+}
+
+
+def write(path: Path, data) -> None:
+    path.write_text(json.dumps(data))
+    # Make sure the change is visible even on coarse-mtime filesystems
+    stamp = time.time_ns() + len(path.read_text())
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_builtin_personas_only_without_directory():
+    registry = PersonaRegistry(BUILTIN_PERSONAS)
+    assert list(registry) == list(BUILTIN_PERSONAS)
+    assert registry["professional"] is BUILTIN_PERSONAS["professional"]
+    assert "missing" not in registry
+    with pytest.raises(KeyError):
+        registry["missing"]
+
+
+def test_files_are_indexed_up_front_and_parsed_on_first_lookup(tmp_path):
+    write(tmp_path / "bistro.json", BISTRO)
+    registry = PersonaRegistry(BUILTIN_PERSONAS, tmp_path)
+
+    assert "bistro" in registry
+    assert registry._entries["bistro"].config is None
+    persona = registry["bistro"]
+    assert persona.name == "Bistro Sommelier"
+    assert persona.generation.max_tokens == 200
+    assert persona.generation.stop == ("\nCustomer ",)
+    assert registry["bistro"] is persona
+    assert "Lyon bistro" in PromptBuilder.system_prompt(persona)
+
+
+def test_yaml_file_extends_another_persona(tmp_path):
+    pytest.importorskip("yaml")
+    (tmp_path / "professional_harbor.yaml").write_text(
+        "extends: professional\n"
+        "context: You run the cellar of a harbour-side seafood restaurant.\n"
+        "generation:\n  max_tokens: 250\n"
+    )
+    registry = PersonaRegistry(BUILTIN_PERSONAS, tmp_path)
+
+    variant = registry["professional_harbor"]
+    assert variant.role == BUILTIN_PERSONAS["professional"].role
+    assert "seafood" in variant.context
+    assert variant.generation.max_tokens == 250
+    assert variant.generation.temperature == BUILTIN_PERSONAS["professional"].generation.temperature
+
+
+def test_refresh_swaps_in_changes(tmp_path):
+    path = tmp_path / "bistro.json"
+    write(path, BISTRO)
+    registry = PersonaRegistry(BUILTIN_PERSONAS, tmp_path)
+    before = registry["bistro"]
+
+    assert not registry.refresh()
+    write(path, dict(BISTRO, name="Bistro Sommelier v2"))
+    assert registry.refresh()
+
+    assert registry["bistro"].name == "Bistro Sommelier v2"
+    # A request that already holds the old config keeps it intact
+    assert before.name == "Bistro Sommelier"
+
+    path.unlink()
+    assert registry.refresh()
+    assert "bistro" not in registry
+
+
+def test_broken_edit_keeps_previous_version(tmp_path):
+    path = tmp_path / "bistro.json"
+    write(path, BISTRO)
+    registry = PersonaRegistry(BUILTIN_PERSONAS, tmp_path)
+    registry["bistro"]
+
+    path.write_text('{"name": "half-written')
+    registry.refresh()
+    assert registry["bistro"].name == "Bistro Sommelier"
+    assert "bistro" in registry.errors
+
+    write(tmp_path / "broken.json", {"name": "No role"})
+    registry.refresh()
+    with pytest.raises(PersonaLoadError):
+        registry["broken"]
+
+
+def test_iteration_skips_files_that_never_loaded(tmp_path):
+    write(tmp_path / "bistro.json", BISTRO)
+    (tmp_path / "venue.json").write_text('{"name": "half-written')
+    registry = PersonaRegistry(BUILTIN_PERSONAS, tmp_path)
+
+    names = [registry[key].name for key in registry]
+
+    assert names == [p.name for p in BUILTIN_PERSONAS.values()] + ["Bistro Sommelier"]
+    assert len(registry) == len(BUILTIN_PERSONAS) + 1
+    assert "venue" in registry.errors
+
+
+def test_extends_cycle_is_reported(tmp_path):
+    write(tmp_path / "a.json", {"extends": "b"})
+    write(tmp_path / "b.json", {"extends": "a"})
+    registry = PersonaRegistry(BUILTIN_PERSONAS, tmp_path)
+    with pytest.raises(PersonaLoadError):
+        registry["a"]
+
+
+def test_watch_picks_up_new_files(tmp_path):
+    registry = PersonaRegistry(BUILTIN_PERSONAS, tmp_path).watch(interval=0.02)
+    try:
+        write(tmp_path / "bistro.json", BISTRO)
+        deadline = time.monotonic() + 5
+        while "bistro" not in registry and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert registry["bistro"].name == "Bistro Sommelier"
+    finally:
+        registry.stop()
+
+
+def test_sommelier_uses_file_persona(tmp_path, monkeypatch):
+    import src.sommelier
+    write(tmp_path / "bistro.json", BISTRO)
+    monkeypatch.setattr(src.sommelier, "PERSONAS", PersonaRegistry(BUILTIN_PERSONAS, tmp_path))
+
+    client = FakeLLMClient()
+    response = WineSommelier(llm_client=client).recommend("Ann", "Coq au vin", "bistro",
+                                                          save_response=False)
+    assert "Coq au vin" in response
+    assert client.usage.completion_tokens <= 200
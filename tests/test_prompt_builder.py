@@ -0,0 +1,75 @@
+"""Tests for prompt construction."""
+import dataclasses
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.personas import PERSONAS
+from src.prompt_builder import (
+    PROMPT_CACHE_SIZE, PromptBuilder, _render_system, _template_digest, _token_count,
+    compact_text, to_messages
+)
+
+
+def test_system_prompt_is_byte_stable_and_cached():
+    persona = PERSONAS["professional"]
+
+    first = PromptBuilder.system_prompt(persona)
+    second = PromptBuilder.system_prompt(persona)
+
+    assert first is second
+    assert persona.role in first
+    assert "Customer" not in first
+
+
+def test_reloaded_persona_versions_do_not_grow_the_caches():
+    persona = PERSONAS["professional"]
+    for version in range(PROMPT_CACHE_SIZE + 50):
+        reloaded = dataclasses.replace(persona, context=f"{persona.context} v{version}")
+        PromptBuilder.template_hash(reloaded)
+        PromptBuilder.system_tokens(reloaded)
+
+    for cache in (_render_system, _template_digest, _token_count):
+        assert cache.cache_info().currsize <= PROMPT_CACHE_SIZE
+    # The current version is rendered again, not lost
+    assert PromptBuilder.system_prompt(persona).startswith(compact_text(persona.role))
+
+
+def test_build_messages_puts_only_request_in_user_turn():
+    messages = PromptBuilder.build_messages(PERSONAS["valley_girl"], "Sarah", "Tacos")
+
+    assert [m["role"] for m in messages] == ["system", "user"]
+    assert messages[0]["content"] == PromptBuilder.system_prompt(PERSONAS["valley_girl"])
+    assert messages[1]["content"] == "Customer Sarah asks: Tacos"
+
+
+def test_personas_get_distinct_system_prompts():
+    prompts = {PromptBuilder.system_prompt(p) for p in PERSONAS.values()}
+    assert len(prompts) == len(PERSONAS)
+
+
+def test_to_messages_wraps_plain_prompts():
+    assert to_messages("hello") == [{"role": "user", "content": "hello"}]
+
+
+def test_system_prompt_is_compacted():
+    for persona in PERSONAS.values():
+        system = PromptBuilder.system_prompt(persona)
+        lines = system.splitlines()
+        assert all(line == line.strip() for line in lines)
+        assert "  " not in system and "\n\n\n" not in system
+    grandma = PromptBuilder.system_prompt(PERSONAS["wine_loving_grandma"])
+    # Hard-wrapped prose is rejoined, numbered items keep their own lines
+    assert "bottles back from 'the war'" in grandma
+    assert "\n2. Comment on their meal" in grandma
+
+
+def test_compact_text():
+    assert compact_text("""
+        1. First
+        2. Second
+           continued
+        """) == "1. First\n2. Second continued"
+    assert compact_text("one\n\n\n   two") == "one\n\ntwo"
+    assert compact_text(None) == ""
@@ -0,0 +1,214 @@
+"""Tests for the Groq rate limiter (uses a local stub Groq server)."""
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.fake_client import FakeLLMClient
+from src.rate_limit import (
+    BULK, INTERACTIVE, RateLimiter, RateLimitTimeout, TokenBucket, current_priority, priority
+)
+from src.sommelier import WineSommelier
+
+
+class StubGroq(BaseHTTPRequestHandler):
+    """Answers chat completions, after ``limited`` 429s carrying a retry-after hint."""
+    requests = []
+    limited = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubGroq.requests.append((self.path, body))
+        if StubGroq.limited:
+            StubGroq.limited -= 1
+            self._reply(429, {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                        {"retry-after-ms": "50"})
+            return
+        self._reply(200, {
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "Try a Rioja."}}],
+            "usage": {"prompt_tokens": 40, "completion_tokens": 5, "total_tokens": 45},
+        })
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def groq_stub(monkeypatch):
+    pytest.importorskip("groq")
+    StubGroq.requests = []
+    StubGroq.limited = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGroq)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("GROQ_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    yield StubGroq
+    server.shutdown()
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(per_minute=60, clock=lambda: now[0])
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    now[0] = 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    # More than the bucket holds only waits for a full bucket
+    assert bucket.wait_time(1000) == pytest.approx(59.5)
+
+
+def test_settle_returns_unused_tokens():
+    now = [0.0]
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=1000, clock=lambda: now[0])
+    limiter.acquire(600)
+    limiter.settle(600, 100)
+    assert limiter.tokens.level == pytest.approx(900)
+    limiter.settle(100, 400)
+    assert limiter.tokens.level == pytest.approx(600)
+
+
+def test_interactive_requests_jump_ahead_of_bulk():
+    # 20 requests a second, with the bucket already empty
+    limiter = RateLimiter(requests_per_minute=1200, tokens_per_minute=None)
+    limiter.requests.level = 0
+    order = []
+
+    def request(name, level):
+        limiter.acquire(1, level)
+        order.append(name)
+
+    threads = []
+    for name, level in (("bulk-1", BULK), ("bulk-2", BULK), ("interactive", INTERACTIVE)):
+        thread = threading.Thread(target=request, args=(name, level))
+        thread.start()
+        threads.append(thread)
+        while len(limiter._queue) + len(order) < len(threads):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(5)
+    assert order[0] == "interactive" or order[:2] == ["bulk-1", "interactive"]
+    assert order[-1] == "bulk-2"
+
+
+def test_wait_longer_than_max_wait_raises():
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=None, max_wait=0.05)
+    limiter.acquire(1)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(1)
+    assert limiter._queue == []
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    # One request a second, with the bucket already empty
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=None)
+    limiter.requests.level = 0
+    threads = threading.active_count()
+
+    async def scenario():
+        waiters = [asyncio.create_task(limiter.aacquire(1, BULK)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert len(limiter._queue) == 3
+        assert threading.active_count() == threads
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        assert limiter._queue == [] and limiter._waiters == {}
+
+        # The cancelled waiters don't take the next refill ahead of a new request
+        return await limiter.aacquire(1, INTERACTIVE)
+
+    waited = asyncio.run(scenario())
+    assert waited < 1.2
+    time.sleep(0.2)
+    assert limiter.requests.level < 0.5
+
+
+def test_async_waiter_wakes_when_budget_returns():
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=60)
+    limiter.acquire(60)
+
+    async def scenario():
+        waiter = asyncio.create_task(limiter.aacquire(30))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        # Settling a reservation wakes the waiter well before the refill would
+        limiter.settle(60, 10)
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(scenario()) < 0.5
+
+
+def test_client_honours_retry_after(groq_stub):
+    from src.cloud_client import CloudLLMClient
+    limiter = RateLimiter()
+    client = CloudLLMClient(rate_limiter=limiter)
+    groq_stub.limited = 2
+
+    start = time.perf_counter()
+    assert client.chat("Pair a wine with paella") == "Try a Rioja."
+    assert time.perf_counter() - start >= 0.1
+    assert len(groq_stub.requests) == 3
+    assert groq_stub.requests[0][0] == "/openai/v1/chat/completions"
+    assert limiter.retries == 2
+    assert client.usage.errors == 0
+    # The ~500 token reservation was settled against the 45 tokens reported
+    assert limiter.tokens.level > limiter.tokens.capacity - 100
+
+
+def test_client_gives_up_after_max_retries(groq_stub):
+    from src.cloud_client import CloudLLMClient
+    client = CloudLLMClient(rate_limiter=RateLimiter(max_retries=1))
+    groq_stub.limited = 5
+
+    response = client.chat("Pair a wine with paella")
+    assert "trouble connecting" in response
+    assert len(groq_stub.requests) == 2
+    assert client.usage.errors == 1
+
+
+def test_compare_and_batch_run_at_bulk_priority():
+    priorities = []
+
+    def reply(messages):
+        priorities.append(current_priority())
+        return "Try a Rioja."
+
+    sommelier = WineSommelier(llm_client=FakeLLMClient(reply=reply))
+    sommelier.recommend("Ann", "Paella", "professional", save_response=False)
+    assert priorities == [INTERACTIVE]
+
+    sommelier.compare_personas("Ann", "Paella", ["valley_girl", "rick_sanchez"])
+    sommelier.recommend_many([("Bob", "Brisket", "professional")])
+    assert priorities[1:] == [BULK, BULK, BULK]
+    with priority(BULK):
+        assert current_priority() == BULK
+    assert current_priority() == INTERACTIVE
+
+
+def test_cloud_warm_up_goes_through_the_limiter(groq_stub):
+    from src.cloud_client import CloudLLMClient
+    limiter = RateLimiter(requests_per_minute=60)
+    client = CloudLLMClient(rate_limiter=limiter)
+
+    assert client.warm_up().ok
+    assert groq_stub.requests[0][1]["max_tokens"] == 1
+    assert limiter.requests.level < 60
@@ -0,0 +1,83 @@
+"""Tests for the recommend_many batch API (no live LLM needed)."""
+import itertools
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.sommelier import InvalidRequest, RecommendationRequest, WineSommelier
+
+
+def echo(asked):
+    return "Try a " + asked.dish
+
+
+def test_recommend_many_returns_input_order_with_bounded_concurrency(fake_client):
+    client = fake_client(reply=echo, delay=0.02)
+    sommelier = WineSommelier(llm_client=client)
+    requests = [("Ann", f"dish {i}") for i in range(20)]
+
+    responses = sommelier.recommend_many(requests, max_concurrency=4)
+
+    assert responses == [f"Try a dish {i}" for i in range(20)]
+    assert client.peak == 4
+
+
+def test_recommend_many_accepts_dicts_and_requests(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(reply=echo))
+    responses = sommelier.recommend_many([
+        {"name": "Ann", "dish": "tacos", "persona": "valley_girl"},
+        RecommendationRequest("Bo", "ramen", "rick_sanchez"),
+    ])
+    assert responses == ["Try a tacos", "Try a ramen"]
+
+
+def test_iter_recommend_many_pulls_requests_lazily(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(reply=echo))
+    pulled = []
+
+    def endless():
+        for i in itertools.count():
+            pulled.append(i)
+            yield ("Ann", f"dish {i}")
+
+    results = sommelier.iter_recommend_many(endless(), max_concurrency=3)
+    first = [next(results) for _ in range(5)]
+    results.close()
+
+    assert len(first) == 5
+    # Only a concurrency window beyond what was consumed is ever pulled
+    assert len(pulled) <= 5 + 3
+
+
+def test_iter_recommend_many_ordered(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(reply=echo, delay=0.01))
+    indices = [r.index for r in sommelier.iter_recommend_many(
+        (("Ann", f"dish {i}") for i in range(10)), max_concurrency=4, ordered=True
+    )]
+    assert indices == list(range(10))
+
+
+def test_recommend_many_exceptions(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(reply=echo))
+    requests = [("Ann", "tacos"), ("Bo", "ramen", "nobody")]
+
+    with pytest.raises(KeyError):
+        sommelier.recommend_many(requests)
+
+    responses = sommelier.recommend_many(requests, return_exceptions=True)
+    assert responses[0] == "Try a tacos"
+    assert isinstance(responses[1], KeyError)
+
+
+def test_iter_recommend_many_reports_unusable_items_in_place(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(reply=echo))
+    results = list(sommelier.iter_recommend_many(
+        [("Ann", "tacos"), 42, ("Bo", "ramen")], ordered=True, return_exceptions=True
+    ))
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert isinstance(results[1].error, InvalidRequest)
+    assert results[2].response == "Try a ramen"
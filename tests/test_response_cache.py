@@ -0,0 +1,99 @@
+"""Tests for the recommendation response cache (no live LLM needed)."""
+import sys
+import time
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.fake_client import FakeLLMClient
+from src.response_cache import LRUCache, SQLiteCache, TieredCache, make_cache_key
+from src.sommelier import WineSommelier
+
+
+def test_cache_key_normalizes_dish_and_customer():
+    a = make_cache_key("professional", "llama3.2", 0.7, "abc", "Sarah", "Grilled  Salmon!")
+    b = make_cache_key("professional", "llama3.2", 0.7, "abc", " sarah", "grilled salmon")
+    c = make_cache_key("valley_girl", "llama3.2", 0.7, "abc", "Sarah", "grilled salmon")
+    assert a == b
+    assert a != c
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_ttl_and_size_eviction(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=0.05, max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+    cache.ttl = None
+    for key in "bcd":
+        cache.set(key, key)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+
+
+def test_sqlite_prunes_only_over_capacity(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, ttl=0.05, max_entries=3)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    time.sleep(0.1)
+    # Expired rows stay put until a write takes the cache over capacity
+    cache.set("b", "3")
+    cache.set("c", "4")
+    assert len(cache) == 3
+    cache.set("d", "5")
+    assert len(cache) == 3
+    assert cache.stats()["evictions"] == 1
+
+    reopened = SQLiteCache(path, ttl=None, max_entries=3)
+    reopened.set("e", "6")
+    assert len(reopened) == 3
+    assert reopened.get("b") is None
+
+
+def test_tiered_cache_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    TieredCache(disk=SQLiteCache(path)).set("k", "v")
+
+    fresh = TieredCache(disk=SQLiteCache(path))
+    assert fresh.get("k") == "v"
+    assert fresh.memory.get("k") == "v"
+
+
+def test_recommend_hits_cache_and_honours_flags():
+    client = FakeLLMClient(model="fake-model", reply="Try a Sauvignon Blanc.")
+    sommelier = WineSommelier(llm_client=client, cache=LRUCache())
+
+    first = sommelier.recommend("Sarah", "Grilled salmon", "professional")
+    second = sommelier.recommend("sarah", "grilled   salmon", "professional")
+    assert first == second
+    assert client.calls == 1
+
+    sommelier.recommend("Sarah", "Grilled salmon", "professional", use_cache=False)
+    assert client.calls == 2
+    sommelier.recommend("Sarah", "Grilled salmon", "professional", refresh_cache=True)
+    assert client.calls == 3
+
+    stats = sommelier.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_recommend_does_not_cache_errors():
+    client = FakeLLMClient(model="fake-model", reply="Error: connection refused")
+    sommelier = WineSommelier(llm_client=client, cache=LRUCache())
+
+    sommelier.recommend("Sarah", "Grilled salmon", "professional")
+    sommelier.recommend("Sarah", "Grilled salmon", "professional")
+    assert client.calls == 2
@@ -0,0 +1,93 @@
+"""Tests for near-duplicate dish reuse (no live LLM needed)."""
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.semantic_cache import SemanticIndex
+from src.sommelier import WineSommelier
+
+
+def greeting(asked):
+    return f"Good evening, {asked.customer}. Try a Sancerre."
+
+
+def test_near_duplicate_dishes_match():
+    index = SemanticIndex(threshold=0.85)
+    index.add("professional", "pan seared salmon w/ asparagus", "Try a Pinot Noir.")
+
+    match = index.lookup("professional", "seared salmon and asparagus")
+
+    assert match is not None
+    assert match.dish == "pan seared salmon w/ asparagus"
+    assert match.score >= 0.85
+    assert index.reuse_log[-1] is match
+
+
+def test_different_dish_or_persona_does_not_match():
+    index = SemanticIndex(threshold=0.85)
+    index.add("professional", "grilled salmon", "Try a Pinot Noir.")
+
+    assert index.lookup("professional", "grilled chicken") is None
+    assert index.lookup("valley_girl", "grilled salmon") is None
+    assert index.stats()["misses"] == 2
+
+
+def test_recommend_reuses_similar_dish_with_new_customer_name(fake_client):
+    client = fake_client(model="fake-model", reply=greeting)
+    sommelier = WineSommelier(llm_client=client, semantic_index=SemanticIndex())
+
+    first = sommelier.recommend("Sarah", "pan seared salmon w/ asparagus", "professional")
+    second = sommelier.recommend("Tom", "seared salmon and asparagus", "professional")
+
+    assert client.calls == 1
+    assert first == "Good evening, Sarah. Try a Sancerre."
+    assert second == "Good evening, Tom. Try a Sancerre."
+    assert sommelier.cache_stats()["semantic"]["hits"] == 1
+
+
+def test_short_name_only_replaced_as_a_whole_word(fake_client):
+    client = fake_client(reply=lambda asked: (
+        f"Hello {asked.customer}! An Alsace Riesling from Alto Adige, {asked.customer}."
+    ))
+    sommelier = WineSommelier(llm_client=client, semantic_index=SemanticIndex())
+
+    sommelier.recommend("Al", "pan seared salmon w/ asparagus", "professional")
+    second = sommelier.recommend("Bob", "seared salmon and asparagus", "professional")
+
+    assert client.calls == 1
+    assert second == "Hello Bob! An Alsace Riesling from Alto Adige, Bob."
+
+
+def test_answers_are_not_reused_across_models(fake_client):
+    index = SemanticIndex()
+    first = WineSommelier(llm_client=fake_client(model="fake-model", reply=greeting), semantic_index=index)
+    other_client = fake_client(model="other-model", reply=greeting)
+    second = WineSommelier(llm_client=other_client, semantic_index=index)
+
+    first.recommend("Sarah", "grilled salmon", "professional")
+    second.recommend("Sarah", "grilled salmon", "professional")
+
+    assert other_client.calls == 1
+    assert len(index) == 2
+
+
+def test_index_skips_duplicates_and_evicts_oldest_persona():
+    index = SemanticIndex(max_entries=4)
+    index.add("old", "grilled salmon", "Try a Pinot Noir.")
+    index.add("old", "Grilled salmon!", "Try a Chablis.")
+    assert len(index) == 1
+    assert index.lookup("old", "grilled salmon").response == "Try a Pinot Noir."
+
+    for dish in ("beef stew", "lamb chops", "duck confit", "pork belly"):
+        index.add("new", dish, "Try a Syrah.")
+    assert len(index) == 4
+    assert index.lookup("old", "grilled salmon") is None
+    assert index.lookup("new", "duck confit") is not None
+
+    # One persona left: its oldest entries make room
+    index.add("new", "veal piccata", "Try a Soave.")
+    assert len(index) <= 4
+    assert index.lookup("new", "veal piccata") is not None
+    assert index.lookup("new", "beef stew") is None
+    assert index.stats()["evictions"] >= 2
@@ -0,0 +1,100 @@
+"""Tests for coalescing identical in-flight recommendation requests."""
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.fake_client import LatencyProfile
+from src.metrics import COALESCED
+from src.sommelier import WineSommelier
+
+
+# Each generation takes 0.05s per word of the reply
+WORD_BY_WORD = LatencyProfile(tokens_per_second=20)
+
+
+def txakoli(asked):
+    return "Try a Txakoli with " + asked.dish
+
+
+def backend_down(asked):
+    # Fail only after a while, so concurrent callers pile up behind the call
+    time.sleep(0.2)
+    raise ConnectionError("backend down")
+
+
+def test_concurrent_identical_requests_share_one_generation(fake_client):
+    client = fake_client(WORD_BY_WORD, model="coalesce-model", reply=txakoli)
+    sommelier = WineSommelier(llm_client=client)
+    before = COALESCED.value(persona="professional", model="coalesce-model")
+
+    with ThreadPoolExecutor(5) as pool:
+        replies = list(pool.map(
+            lambda _: sommelier.recommend("Ann", "pintxos", "professional"), range(5)
+        ))
+
+    assert client.calls == 1
+    assert replies == ["Try a Txakoli with pintxos"] * 5
+    assert sommelier.single_flight.stats()["coalesced"] == 4
+    assert COALESCED.value(persona="professional", model="coalesce-model") - before == 4
+    # Different customers get their own (personalised) generations
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(lambda name: sommelier.recommend(name, "pintxos", "professional"), ["Bo", "Cy"]))
+    assert client.calls == 3
+
+
+def test_errors_reach_every_waiter_and_are_not_sticky(fake_client):
+    down = [True]
+    client = fake_client(WORD_BY_WORD, model="coalesce-model",
+                         reply=lambda asked: backend_down(asked) if down else txakoli(asked))
+    sommelier = WineSommelier(llm_client=client)
+
+    def attempt(_):
+        try:
+            sommelier.recommend("Ann", "pintxos", "professional")
+        except ConnectionError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(3) as pool:
+        assert list(pool.map(attempt, range(3))) == ["backend down"] * 3
+    assert client.calls == 1
+
+    down.clear()
+    assert sommelier.recommend("Ann", "pintxos", "professional").startswith("Try a Txakoli")
+    assert client.calls == 2
+
+
+def test_stream_survives_one_waiter_closing_early(fake_client):
+    client = fake_client(LatencyProfile(tokens_per_second=10), model="coalesce-model", reply=txakoli)
+    sommelier = WineSommelier(llm_client=client)
+
+    first = iter(sommelier.recommend_stream("Ann", "pintxos", "professional"))
+    second = sommelier.recommend_stream("Ann", "pintxos", "professional")
+    assert next(first) == "Try "
+    # The second waiter joins mid-stream and still gets every chunk
+    first.close()
+    assert list(second) == ["Try ", "a ", "Txakoli ", "with ", "pintxos"]
+    assert client.calls == 1
+    assert sommelier.conversation_history[-1]["response"] == "Try a Txakoli with pintxos"
+
+
+def test_cancelled_async_waiter_does_not_cancel_shared_call(fake_client):
+    client = fake_client(WORD_BY_WORD, model="coalesce-model", reply=txakoli)
+    sommelier = WineSommelier(llm_client=client)
+
+    async def main():
+        tasks = [asyncio.create_task(sommelier.arecommend("Ann", "pintxos", "professional"))
+                 for _ in range(3)]
+        await asyncio.sleep(0.05)
+        tasks[0].cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+    results = asyncio.run(main())
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == ["Try a Txakoli with pintxos"] * 2
+    assert client.calls == 1
+    assert sommelier.single_flight.stats() == {"leaders": 1, "coalesced": 2, "in_flight": 0}
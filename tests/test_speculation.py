@@ -0,0 +1,132 @@
+"""Tests for speculative background generation."""
+import sys
+import threading
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.fake_client import FakeLLMClient
+from src.sommelier import WineSommelier
+from src.speculation import SpeculationDiscarded, SpeculationPool, Speculator
+
+
+class ManualTimer:
+    """Stands in for threading.Timer; the test decides when the debounce elapses."""
+    created = []
+
+    def __init__(self, interval, function, args=()):
+        self.function = function
+        self.args = args
+        self.cancelled = False
+        self.daemon = False
+        ManualTimer.created.append(self)
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fire(self):
+        if not self.cancelled:
+            self.function(*self.args)
+
+
+class Generator:
+    """Yields two chunks, optionally waiting for ``release`` in between."""
+
+    def __init__(self, block=False):
+        self.calls = []
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+        self.finished = threading.Event()
+
+    def __call__(self, name, dish, persona):
+        self.calls.append((name, dish, persona))
+        yield f"{persona} says: "
+        self.release.wait(5)
+        yield f"Riesling for {dish}."
+        self.finished.set()
+
+
+def make(generate, pool=None):
+    ManualTimer.created = []
+    return Speculator(pool or SpeculationPool(), generate, debounce=1.0, timer=ManualTimer)
+
+
+def test_click_attaches_to_speculation():
+    generate = Generator(block=True)
+    speculator = make(generate)
+    speculator.observe("Ann", "Thai curry", "valley_girl")
+    speculator.observe("Ann", "Thai curry", "valley_girl")  # unchanged: no restart
+    assert len(ManualTimer.created) == 1
+    ManualTimer.created[0].fire()
+
+    flight = speculator.claim("Ann", "Thai curry", "valley_girl")
+    assert flight is not None
+    generate.release.set()
+    assert "".join(flight.stream()) == "valley_girl says: Riesling for Thai curry."
+    assert generate.calls == [("Ann", "Thai curry", "valley_girl")]
+    stats = speculator.pool.stats()
+    assert (stats["started"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0, 1.0)
+
+
+def test_changed_inputs_discard_speculation():
+    generate = Generator(block=True)
+    speculator = make(generate)
+    speculator.observe("Ann", "Thai curry", "valley_girl")
+    ManualTimer.created[0].fire()
+    first = speculator._flight
+
+    speculator.observe("Ann", "Thai curry", "professional")
+    with pytest.raises(SpeculationDiscarded):
+        first.result()
+    # The discarded run still holds its slot until the backend is done with it
+    assert not speculator.pool.try_acquire()
+    generate.release.set()
+    assert generate.finished.wait(5)
+
+    assert speculator.claim("Ann", "Thai curry", "professional") is None
+    stats = speculator.pool.stats()
+    assert (stats["discarded"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.0)
+
+
+def test_click_before_debounce_is_a_miss():
+    generate = Generator()
+    speculator = make(generate)
+    speculator.observe("Ann", "Oysters", "professional")
+    assert speculator.claim("Ann", "Oysters", "professional") is None
+    ManualTimer.created[0].fire()
+    assert generate.calls == []
+
+
+def test_pool_caps_concurrent_speculation():
+    generate = Generator(block=True)
+    pool = SpeculationPool(max_concurrent=1)
+    first = make(generate, pool)
+    first.observe("Ann", "Oysters", "professional")
+    first_timer = ManualTimer.created[0]
+    second = make(generate, pool)
+    second.observe("Bob", "Brisket", "rick_sanchez")
+    first_timer.fire()
+    ManualTimer.created[0].fire()
+
+    assert generate.calls == [("Ann", "Oysters", "professional")]
+    assert pool.stats()["skipped"] == 1
+    assert second.claim("Bob", "Brisket", "rick_sanchez") is None
+    generate.release.set()
+
+
+def test_speculation_through_sommelier():
+    sommelier = WineSommelier(llm_client=FakeLLMClient())
+    speculator = make(lambda n, d, p: sommelier.recommend_stream(n, d, p, save_response=False))
+    speculator.observe("Ann", "Roast chicken", "professional")
+    ManualTimer.created[0].fire()
+
+    flight = speculator.claim("Ann", "Roast chicken", "professional")
+    expected = sommelier.recommend("Ann", "Roast chicken", "professional", save_response=False)
+    assert flight.result() == expected
+    assert len(sommelier.conversation_history) == 0
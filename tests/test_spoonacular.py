@@ -0,0 +1,151 @@
+"""Tests for pooled, cached and circuit-broken Spoonacular lookups (local stub server)."""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src.resilience import CircuitBreaker, retry_call
+from src.wine_api import SpoonacularClient, WineDatabase
+
+
+class StubSpoonacular:
+    """Serves canned wine recommendations, failing with ``status`` when set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.status = 200
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.calls += 1
+                if stub.status != 200:
+                    body = b"{}"
+                    self.send_response(stub.status)
+                else:
+                    body = json.dumps({"recommendedWines": [
+                        {"title": f"Stub Wine {i}", "price": "$10", "averageRating": 0.9}
+                        for i in range(5)
+                    ]}).encode()
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/food/wine/recommendation"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubSpoonacular()
+    yield server
+    server.close()
+
+
+def make_client(stub, **kwargs):
+    return SpoonacularClient(api_key="test", base_url=stub.url, timeout=2, **kwargs)
+
+
+def test_results_are_cached_per_wine_and_price(stub):
+    client = make_client(stub)
+    wines = client.recommend("Merlot", 50)
+    assert [w["name"] for w in wines] == ["Stub Wine 0", "Stub Wine 1", "Stub Wine 2"]
+
+    assert client.recommend("merlot ", 50) == wines
+    client.recommend("Merlot", 20)
+
+    stats = client.stats()
+    assert stub.calls == 2
+    assert (stats["cache_hits"], stats["cache_misses"], stats["requests"]) == (1, 2, 2)
+
+
+def test_server_errors_are_retried_then_open_the_breaker(stub):
+    stub.status = 503
+    client = make_client(stub, retries=1, failure_threshold=2, cooldown=60)
+
+    assert client.recommend("Merlot", 50) == []
+    assert stub.calls == 2
+    assert client.recommend("Syrah", 50) == []
+    assert client.stats()["breaker_state"] == "open"
+
+    # While open, lookups skip the network entirely
+    calls = stub.calls
+    assert client.recommend("Malbec", 50) == []
+    stats = client.stats()
+    assert stub.calls == calls
+    assert (stats["failures"], stats["retries"], stats["breaker_skips"]) == (2, 2, 1)
+    assert stats["last_error"] == "TransientHTTPError: HTTP 503"
+
+
+def test_client_errors_fail_at_once_without_tripping_the_breaker(stub):
+    stub.status = 401
+    client = SpoonacularClient(api_key="s3cret", base_url=stub.url, timeout=2,
+                               retries=2, failure_threshold=1)
+
+    assert client.recommend("Merlot", 50) == []
+    assert stub.calls == 1
+    stats = client.stats()
+    assert stats["breaker_state"] == "closed"
+    assert stats["retries"] == 0
+    assert "401" in stats["last_error"]
+    assert "s3cret" not in stats["last_error"]
+
+
+def test_no_api_key_skips_the_network(stub, monkeypatch):
+    monkeypatch.delenv("SPOONACULAR_API_KEY", raising=False)
+    client = SpoonacularClient(base_url=stub.url)
+    assert client.recommend("Merlot", 50) == []
+    assert stub.calls == 0
+
+
+def test_wine_database_falls_back_to_catalog_when_breaker_open(stub):
+    stub.status = 500
+    client = make_client(stub, retries=0, failure_threshold=1)
+    db = WineDatabase(spoonacular=client)
+
+    wines = db.search_wines("Chardonnay", "lobster")
+    assert wines[0]["name"] == "Rombauer Chardonnay"
+    assert db.stats()["breaker_state"] == "open"
+
+
+def test_breaker_half_open_trial():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 11
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_retry_call_gives_up_after_attempts():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        retry_call(flaky, attempts=3, sleep=lambda s: None)
+    assert len(attempts) == 3
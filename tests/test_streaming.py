@@ -0,0 +1,59 @@
+"""Tests for streamed recommendations (no live LLM needed)."""
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.fake_client import LatencyProfile
+from src.response_cache import LRUCache
+from src.sommelier import WineSommelier
+
+
+# 50 tokens a second, so chunks arrive one after another
+STREAMING = LatencyProfile(tokens_per_second=50)
+POUR = "I'd pour a Pinot Noir tonight."
+
+
+def test_recommend_stream_yields_chunks_and_records_timing(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(STREAMING, model="fake-model", reply=POUR))
+
+    stream = sommelier.recommend_stream("Sarah", "Roast duck", "professional")
+    chunks = list(stream)
+
+    assert chunks == ["I'd ", "pour ", "a ", "Pinot ", "Noir ", "tonight."]
+    assert stream.text == "I'd pour a Pinot Noir tonight."
+    assert 0 < stream.time_to_first_token < stream.total_latency
+    assert sommelier.conversation_history[-1]["response"] == stream.text
+
+
+def test_history_saved_only_after_stream_ends(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(STREAMING, model="fake-model", reply=POUR))
+
+    iterator = iter(sommelier.recommend_stream("Sarah", "Roast duck", "professional"))
+    next(iterator)
+    assert len(sommelier.conversation_history) == 0
+    list(iterator)
+    assert len(sommelier.conversation_history) == 1
+
+
+def test_stream_appends_bottles_at_end(fake_client):
+    sommelier = WineSommelier(llm_client=fake_client(STREAMING, model="fake-model", reply=POUR))
+
+    chunks = list(sommelier.recommend_stream(
+        "Sarah", "Roast duck", "professional", include_bottles=True
+    ))
+
+    assert "Specific Bottle Recommendations" in chunks[-1]
+
+
+def test_stream_uses_and_fills_cache(fake_client):
+    client = fake_client(STREAMING, model="fake-model", reply=POUR)
+    sommelier = WineSommelier(llm_client=client, cache=LRUCache())
+
+    first = sommelier.recommend_stream("Sarah", "Roast duck", "professional")
+    list(first)
+    second = sommelier.recommend_stream("Sarah", "Roast duck", "professional")
+    list(second)
+
+    assert client.calls == 1
+    assert second.text == first.text
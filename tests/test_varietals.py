@@ -0,0 +1,43 @@
+"""Tests for the varietal extractor."""
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.sommelier import WineSommelier
+from src.varietals import VarietalMatcher, get_matcher, load_synonyms
+
+
+def test_regions_and_appellations_map_to_varietals():
+    text = "Start with a Sancerre, then a Barolo or a CHÂTEAUNEUF-DU-PAPE."
+    matches = get_matcher().find_all(text)
+    assert [(m.text, m.varietal) for m in matches] == [
+        ("Sancerre", "Sauvignon Blanc"),
+        ("Barolo", "Nebbiolo"),
+        ("CHÂTEAUNEUF-DU-PAPE", "Rhône Blend"),
+    ]
+    assert all(text[m.start:m.end] == m.text for m in matches)
+
+
+def test_longest_whole_word_matches_only():
+    matcher = get_matcher()
+    assert matcher.varietals("A Cabernet Franc, not a Cabernet Sauvignon") == ["Cabernet Franc", "Cabernet Sauvignon"]
+    # "Muscat" inside "Muscadet", and everyday words, are not wines
+    assert matcher.varietals("Muscadet with notes of rose, shipped from port") == ["Muscadet"]
+    assert matcher.varietals("A dry Rose, er, Rosé") == ["Rosé"]
+    assert matcher.varietals("Cotes du Rhone") == ["Rhône Blend"]
+
+
+def test_first_recommended_wine_wins():
+    sommelier = WineSommelier(llm_client=object())
+    response = "Skip the Chardonnay tonight; a chilled Beaujolais is the move."
+    assert sommelier._extract_wine_type(response) == "Chardonnay"
+    assert [m.varietal for m in sommelier.mentioned_wines(response)] == ["Chardonnay", "Gamay"]
+    assert sommelier._extract_wine_type("Just water, thanks") is None
+
+
+def test_custom_synonyms(tmp_path):
+    path = tmp_path / "extra.csv"
+    path.write_text("alias,varietal\nVin de Pays d'Oc,Languedoc Blend\n")
+    matcher = VarietalMatcher(load_synonyms(str(path)))
+    assert matcher.varietals("A vin de pays d’Oc red") == ["Languedoc Blend"]
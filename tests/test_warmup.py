@@ -0,0 +1,78 @@
+"""Tests for model warm-up and keep-alive (uses a local stub Ollama server)."""
+import json
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.llm_client import LLMClient
+from src.sommelier import WineSommelier
+from src.warmup import KeepWarm
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self._reply({"models": [{"model": "llama3.2:latest", "name": "llama3.2:latest"}]})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubOllama.requests.append((self.path, body))
+        if self.path == "/api/generate":
+            self._reply({"model": body["model"], "response": "H", "done": True,
+                         "load_duration": 2_500_000_000})
+        else:
+            self._reply({"model": body["model"], "done": True,
+                         "message": {"role": "assistant", "content": "Try a Rioja."}})
+
+    def _reply(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_warm_up_reports_load_time_and_passes_keep_alive():
+    server, host = start_stub()
+    StubOllama.requests.clear()
+    try:
+        client = LLMClient(host=host, keep_alive="1h")
+        sommelier = WineSommelier(llm_client=client, warm_up=True)
+        sommelier.recommend("Sarah", "Paella", "professional")
+    finally:
+        server.shutdown()
+
+    assert sommelier.warmup_report.ok
+    assert sommelier.warmup_report.load_seconds == 2.5
+    paths = [path for path, _ in StubOllama.requests]
+    assert paths == ["/api/generate", "/api/chat"]
+    assert all(body["keep_alive"] == "1h" for _, body in StubOllama.requests)
+
+
+def test_warm_up_failure_is_reported_not_raised():
+    client = LLMClient(host="http://127.0.0.1:9")
+    report = client.warm_up()
+    assert not report.ok
+    assert "failed" in str(report)
+
+
+def test_keep_warm_business_hours():
+    pinger = KeepWarm([], start_hour=11, end_hour=23, days=(0, 1, 2, 3, 4))
+    assert pinger.in_business_hours(datetime(2026, 10, 16, 12))  # Friday noon
+    assert not pinger.in_business_hours(datetime(2026, 10, 16, 8))
+    assert not pinger.in_business_hours(datetime(2026, 10, 17, 12))  # Saturday
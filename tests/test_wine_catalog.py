@@ -0,0 +1,74 @@
+"""Tests for the indexed wine catalog."""
+import json
+import sys
+from pathlib import Path
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.wine_api import WineDatabase
+from src.wine_catalog import WineCatalog, get_catalog, parse_price
+
+
+def test_parse_price():
+    assert parse_price("$18-22") == (18.0, 22.0, "$18-22")
+    assert parse_price(12.5) == (12.5, 12.5, "$12.5")
+    assert parse_price("N/A") == (None, None, "N/A")
+
+
+def test_search_filters_by_varietal_food_price_and_rating(tmp_path):
+    source = tmp_path / "wines.jsonl"
+    rows = [
+        {"name": "Salmon Pinot", "varietal": "Pinot Noir", "price": "$20", "rating": 4.0, "food_pairing": "grilled salmon"},
+        {"name": "Steak Pinot", "varietal": "Pinot Noir", "price": "$25", "rating": 4.8, "food_pairing": "steak"},
+        {"name": "Pricey Pinot", "varietal": "Pinot Noir", "price": "$90", "rating": 4.9, "food_pairing": "salmon"},
+        {"name": "Salmon Chard", "varietal": "Chardonnay", "price": "$15", "rating": 4.1, "food_pairing": "salmon"},
+    ]
+    source.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    catalog = WineCatalog(str(tmp_path / "wines.sqlite3"))
+    assert catalog.import_jsonl(str(source)) == 4
+
+    results = catalog.search("Pinot Noir", food="Grilled salmon with asparagus", max_price=50)
+    assert [w["name"] for w in results] == ["Salmon Pinot", "Steak Pinot"]
+
+    assert [w["name"] for w in catalog.search("pinot noir", min_rating=4.85)] == ["Pricey Pinot"]
+    assert catalog.search("Merlot") == []
+
+
+def test_price_bounds_keep_unpriced_bottles(tmp_path):
+    catalog = WineCatalog(str(tmp_path / "wines.sqlite3"))
+    catalog.import_rows([
+        {"name": "Cheap Merlot", "varietal": "Merlot", "price": "$10", "rating": 4.0},
+        {"name": "Mystery Merlot", "varietal": "Merlot", "price": "N/A", "rating": 3.5},
+        {"name": "Grand Merlot", "varietal": "Merlot", "price": "$200", "rating": 4.5},
+    ])
+
+    assert [w["name"] for w in catalog.search("Merlot", max_price=100)] == ["Cheap Merlot", "Mystery Merlot"]
+    assert [w["name"] for w in catalog.search("Merlot", min_price=50)] == ["Grand Merlot", "Mystery Merlot"]
+
+
+def test_catalog_persists_on_disk(tmp_path):
+    path = str(tmp_path / "wines.sqlite3")
+    WineCatalog(path).import_rows([{"name": "A", "varietal": "Merlot", "price": "$10"}])
+    assert len(WineCatalog(path)) == 1
+
+
+def test_wine_database_uses_shared_curated_catalog():
+    first, second = WineDatabase(), WineDatabase()
+    assert first.catalog is second.catalog is get_catalog()
+
+    wines = first.search_wines("Sauvignon Blanc", "thai curry", max_price=20)
+    assert wines[0]["name"] == "Whitehaven Sauvignon Blanc"
+    assert all(float(w["price"].split("-")[0].lstrip("$")) <= 20 for w in wines)
+
+    fallback = first.search_wines("Retsina", "ribs")
+    assert fallback[0]["name"] == "Please consult your local wine shop"
+
+
+def test_curated_catalog_covers_every_canonical_varietal():
+    from src.varietals import VARIETAL_SYNONYMS, get_matcher
+    catalog = get_catalog()
+    assert [v for v in VARIETAL_SYNONYMS if not catalog.search(varietal=v)] == []
+
+    wine_type = get_matcher().first("A Chianti Classico, naturally.").varietal
+    wines = WineDatabase().search_wines(wine_type, "lasagna")
+    assert wines[0]["varietal"] == "Sangiovese"